@@ -0,0 +1,180 @@
+"""
+오디오 내려받기 벤치마크: 기존 방식(한 번에 하나, resp.content) vs 다운로드 엔진(save_audio_files)
+
+연결마다 대역폭을 제한(--mbps)하고 Range 요청을 지원하는 로컬 HTTP 서버에서 파일 N개를 받아
+걸린 시간과 파이썬이 할당한 메모리의 최고치(tracemalloc)를 비교합니다.
+--flaky를 주면 서버가 파일마다 첫 응답을 절반에서 끊어, 엔진이 끊긴 곳부터 이어받는지
+(서버가 보낸 전체 바이트가 파일 크기 합과 얼마나 차이 나는지) 확인합니다.
+
+    python benchmarks/bench_audio_download.py --files 6 --size-mb 8 --mbps 20 --flaky
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.http_transport import get_session
+from src.core.mureka_utils import save_audio_files
+
+_MB = 1024 * 1024
+
+
+class AudioServer:
+    """/audio/<n>.mp3 를 연결당 mbps MB/s로 보내는 서버 (Range/If-Range 지원, flaky면 파일마다 첫 응답을 절반에서 끊음)"""
+
+    def __init__(self, size: int, mbps: float, flaky: bool) -> None:
+        self.size = size
+        self.mbps = mbps
+        self.flaky = flaky
+        self.bytes_sent = 0
+        self.dropped: Dict[str, bool] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def body(self, path: str) -> bytes:
+        # 측정 전에 만들어 둔 본문을 재사용 (서버 쪽 할당이 측정에 섞이지 않게)
+        body = self._bodies.get(path)
+        if body is None:
+            seed = hashlib.sha256(path.encode("utf-8")).digest()
+            body = self._bodies[path] = (seed * (self.size // len(seed) + 1))[: self.size]
+        return body
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                body = memoryview(server.body(self.path))
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                start = 0
+                range_header = self.headers.get("Range", "")
+                if_range = self.headers.get("If-Range")
+                if range_header.startswith("bytes=") and if_range in (None, etag):
+                    start = int(range_header[len("bytes="):].split("-")[0])
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(body)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+
+                with server._lock:
+                    drop = server.flaky and not server.dropped.get(self.path)
+                    server.dropped[self.path] = True
+                stop_at = len(body) // 2 if drop else len(body)
+                chunk = 64 * 1024
+                pos = start
+                while pos < stop_at:
+                    end = min(pos + chunk, stop_at)
+                    self.wfile.write(body[pos:end])
+                    with server._lock:
+                        server.bytes_sent += end - pos
+                    pos = end
+                    time.sleep(chunk / (server.mbps * _MB))
+                if drop:
+                    # 응답 도중 연결 끊김
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+
+        return Handler
+
+
+def download_sequential(urls, output_dir: pathlib.Path) -> list:
+    """기존 save_audio_files: 한 번에 하나씩, 응답 전체를 메모리에 올린 뒤 저장"""
+    paths = []
+    for idx, url in enumerate(urls, start=1):
+        try:
+            resp = get_session().get(url, timeout=120)
+            resp.raise_for_status()
+            dest = output_dir / f"audio_{int(time.time())}_{idx}.mp3"
+            dest.write_bytes(resp.content)
+            paths.append(dest)
+        except Exception as exc:
+            print(f"    실패 ({url}): {exc}")
+    return paths
+
+
+def measure(label: str, fn, server: AudioServer, urls) -> None:
+    output_dir = pathlib.Path(tempfile.mkdtemp(prefix="bench-audio-"))
+    server.dropped.clear()
+    sent_before = server.bytes_sent
+    tracemalloc.start()
+    start = time.perf_counter()
+    paths = fn(urls, output_dir)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    intact = sum(
+        1 for url, path in zip(urls, paths) if pathlib.Path(path).read_bytes() == server.body(url[len(server.base_url):])
+    )
+    sent = server.bytes_sent - sent_before
+    print(
+        f"{label:>6}: {elapsed:5.2f}s, 최고 할당 {peak / _MB:6.1f}MB, 파일 {len(paths)}개(내용 일치 {intact}), "
+        f"서버 전송 {sent / _MB:.1f}MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--mbps", type=float, default=20, help="연결당 전송 속도(MB/s)")
+    parser.add_argument("--flaky", action="store_true", help="파일마다 첫 응답을 절반에서 끊음")
+    args = parser.parse_args()
+
+    server = AudioServer(int(args.size_mb * _MB), args.mbps, args.flaky)
+    urls = [f"{server.base_url}/audio/{i}.mp3" for i in range(args.files)]
+    for url in urls:
+        server.body(url[len(server.base_url):])
+    print(
+        f"{args.files}개 × {args.size_mb:g}MB, 연결당 {args.mbps:g}MB/s"
+        + (", 첫 응답 절반에서 끊김" if args.flaky else "")
+        + f", 동시 {os.getenv('AUDIO_DOWNLOAD_WORKERS', '4')}개"
+    )
+    measure("기존", download_sequential, server, urls)
+    measure("엔진", lambda u, d: save_audio_files(u, d), server, urls)
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+보관된 오디오 전송 부하 벤치마크: 워커 하나가 동시 청취자 여럿에게 /audio/{digest}를 보낼 때
+
+노래 보관함(임시 디렉터리)에 --files개의 --size-mb MB 오디오를 넣고, 서버를 별도 프로세스의 uvicorn 워커 하나로 띄웁니다.
+청취자 --listeners명이 동시에 브라우저 <audio>처럼 요청합니다.
+    처음부터 재생(Range: bytes=0-) → 탐색 --seeks번(임의 위치에서 256KB) → 다시 재생 시 If-None-Match 재검증
+같은 파일을 Starlette FileResponse(이전 구현: 64KB씩 스레드에서 read)로 보내는 서버와 처리량, 지연 시간,
+서버 프로세스의 CPU 사용량(리눅스 /proc 기준)을 비교하고, 응답이 맞는지(전체 내용 해시, 206 범위) 확인합니다.
+부하 클라이언트도 같은 머신에서 돌기 때문에 처리량보다 "서버 CPU 1초로 보낼 수 있는 양"이 워커당 수용 인원의 지표입니다.
+
+    python benchmarks/bench_audio_serving.py --listeners 200 --files 4 --size-mb 4 --seeks 3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.song_library import SongLibrary
+
+# 이전 구현과 같은 방식(FileResponse)으로 보관함 blob을 보내는 최소 서버
+BASELINE_APP = """
+import os
+from starlette.applications import Starlette
+from starlette.responses import FileResponse
+from starlette.routing import Route
+
+blob_root = os.environ["AUDIO_BLOB_ROOT"]
+
+async def audio(request):
+    digest = request.path_params["digest"]
+    return FileResponse(f"{blob_root}/{digest[:2]}/{digest}", media_type="audio/mpeg")
+
+app = Starlette(routes=[Route("/audio/{digest}", audio)])
+"""
+
+SEEK_BYTES = 256 * 1024
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: str, port: int, env: Dict[str, str], app_dir: str) -> subprocess.Popen:
+    """uvicorn 워커 하나를 별도 프로세스로 띄우고 응답할 때까지 기다림"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log", "--timeout-keep-alive", "60", "--app-dir", app_dir],
+        env={**os.environ, **env},
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"서버가 뜨지 않았습니다: {app}")
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """프로세스(모든 스레드 포함)가 지금까지 쓴 CPU 시간(초)"""
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def seed_library(root: Path, files: int, size_mb: float) -> Dict[str, bytes]:
+    """보관함에 임의 내용 오디오를 넣고 digest → 내용을 반환"""
+    library = SongLibrary(root)
+    contents: Dict[str, bytes] = {}
+    for _ in range(files):
+        data = os.urandom(int(size_mb * 1024 * 1024))
+        digest = hashlib.sha256(data).hexdigest()
+        path = library.blobs.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        contents[digest] = data
+    with sqlite3.connect(library.path) as conn:
+        conn.executemany(
+            "INSERT INTO blobs (digest, size, content_type, source_url, created_at) VALUES (?, ?, 'audio/mpeg', '', ?)",
+            [(digest, len(data), time.time()) for digest, data in contents.items()],
+        )
+    return contents
+
+
+async def listener(
+    client: httpx.AsyncClient,
+    digest: str,
+    data: bytes,
+    seeks: int,
+    latencies: List[float],
+    errors: List[str],
+    revalidated: Counter,
+) -> int:
+    """청취자 한 명: 처음부터 재생 → 탐색 → 재검증. 받은 바이트 수를 반환"""
+    received = 0
+    start = time.perf_counter()
+    resp = await client.get(f"/audio/{digest}", headers={"Range": "bytes=0-"})
+    latencies.append(time.perf_counter() - start)
+    received += len(resp.content)
+    if resp.status_code not in (200, 206) or hashlib.sha256(resp.content).hexdigest() != digest:
+        errors.append(f"전체 재생 {resp.status_code}")
+    etag = resp.headers.get("etag")
+
+    for _ in range(seeks):
+        offset = random.randrange(0, len(data) - SEEK_BYTES)
+        start = time.perf_counter()
+        resp = await client.get(f"/audio/{digest}", headers={"Range": f"bytes={offset}-{offset + SEEK_BYTES - 1}"})
+        latencies.append(time.perf_counter() - start)
+        received += len(resp.content)
+        if resp.status_code != 206 or resp.content != data[offset:offset + SEEK_BYTES]:
+            errors.append(f"탐색 {resp.status_code}")
+
+    if etag:
+        start = time.perf_counter()
+        resp = await client.get(f"/audio/{digest}", headers={"If-None-Match": etag})
+        latencies.append(time.perf_counter() - start)
+        received += len(resp.content)
+        revalidated[resp.status_code] += 1
+    return received
+
+
+async def load(base_url: str, contents: Dict[str, bytes], listeners: int, seeks: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    revalidated: Counter = Counter()
+    items = list(contents.items())
+    limits = httpx.Limits(max_connections=listeners, max_keepalive_connections=listeners)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        received = await asyncio.gather(
+            *(listener(client, *items[i % len(items)], seeks, latencies, errors, revalidated) for i in range(listeners))
+        )
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "requests": len(latencies),
+        "mb": sum(received) / 1024 / 1024,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+        "revalidated": dict(revalidated),
+    }
+
+
+def report(label: str, result: Dict[str, Any], cpu: float) -> None:
+    print(
+        f"{label}: {result['requests']}개 요청 {result['elapsed']:.2f}s "
+        f"({result['requests'] / result['elapsed']:.0f} req/s, {result['mb'] / result['elapsed']:.0f}MB/s), "
+        f"지연 p50 {result['p50']:.0f}ms / p99 {result['p99']:.0f}ms"
+    )
+    print(
+        f"    서버 CPU {cpu:.2f}s (요청당 {cpu / result['requests'] * 1000:.2f}ms, "
+        f"CPU 1초당 {result['mb'] / max(cpu, 1e-6):.0f}MB), 재검증 응답 {result['revalidated']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listeners", type=int, default=200, help="동시 청취자 수")
+    parser.add_argument("--files", type=int, default=4, help="보관된 오디오 파일 수")
+    parser.add_argument("--size-mb", type=float, default=4, help="파일당 크기(MB)")
+    parser.add_argument("--seeks", type=int, default=3, help="청취자당 탐색(Range) 횟수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "library"
+        contents = seed_library(root, args.files, args.size_mb)
+        (Path(tmp) / "baseline_app.py").write_text(BASELINE_APP, encoding="utf-8")
+        print(
+            f"청취자 {args.listeners}명, 파일 {args.files}개 × {args.size_mb}MB, "
+            f"청취자당 탐색 {args.seeks}회 (uvicorn 워커 1개)"
+        )
+
+        runs = [
+            ("FileResponse (이전)", "baseline_app:app", tmp, {"AUDIO_BLOB_ROOT": str(root / "blobs")}),
+            ("/audio (현재)", "src.server:app", str(project_root), {
+                "SONG_LIBRARY_DIR": str(root),
+                "JOB_WORKER_ENABLED": "0",
+                "JOB_DB_PATH": str(Path(tmp) / "jobs.sqlite3"),
+            }),
+        ]
+        for label, app, app_dir, env in runs:
+            port = free_port()
+            proc = start_server(app, port, env, app_dir)
+            try:
+                cpu_before = process_cpu_seconds(proc.pid)
+                result = asyncio.run(load(f"http://127.0.0.1:{port}", contents, args.listeners, args.seeks))
+                report(label, result, process_cpu_seconds(proc.pid) - cpu_before)
+                if result["errors"]:
+                    print(f"    잘못된 응답 {result['errors']}개 (예: {result['first_error']})")
+                if app == "src.server:app":
+                    stats = httpx.get(f"http://127.0.0.1:{port}/cache-stats", timeout=30).json()["audio-serving"]
+                    print(f"    응답 {stats['responses']}, 전송 방식 {stats['send_modes']}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
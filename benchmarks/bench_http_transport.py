@@ -0,0 +1,89 @@
+"""
+HTTP 연결 재사용 벤치마크: 곡 하나를 생성할 때 맺는 TCP 연결(핸드셰이크) 수 비교
+
+가짜 Suno 서버에 create_song → record-info 폴링 → 오디오 2개 다운로드를 N곡 반복하고,
+요청마다 새 연결("Connection: close" + requests.get/post)을 쓰는 기존 방식과
+공유 keep-alive 세션(src.core.http_transport)을 비교합니다.
+
+    python benchmarks/bench_http_transport.py --songs 10
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_suno_server import FakeSunoServer
+from src.core.http_transport import reset_session, transport_stats
+from src.core.mureka_utils import collect_track_audio_urls, save_audio_files
+from src.suno_client import SunoClient
+
+
+def run_without_pool(server: FakeSunoServer, songs: int) -> int:
+    """기존 방식: 요청마다 requests.get/post + Connection: close"""
+    headers = {"Authorization": "Bearer fake", "Connection": "close"}
+    before = server.connections
+    start = time.perf_counter()
+    for _ in range(songs):
+        r = requests.post(f"{server.base_url}/generate", headers=headers, json={"prompt": "라라라"})
+        task_id = r.json()["data"]["taskId"]
+        while True:
+            st = requests.get(
+                f"{server.base_url}/generate/record-info", headers=headers, params={"taskId": task_id}
+            ).json()
+            if st["data"]["status"] == "SUCCESS":
+                break
+            time.sleep(0.05)
+        for item in st["data"]["response"]["sunoData"]:
+            requests.get(item["audioUrl"], headers=headers).content
+    elapsed = time.perf_counter() - start
+    handshakes = server.connections - before
+    print(f"[연결 풀 없음] {songs}곡 {elapsed:.2f}s, 연결 {handshakes}개 (곡당 {handshakes / songs:.1f})")
+    return handshakes
+
+
+def run_with_pool(server: FakeSunoServer, songs: int) -> int:
+    """공유 세션: SunoClient + save_audio_files"""
+    reset_session()
+    client = SunoClient("fake", base_url=server.base_url, poll_interval=0.05, verbose=False)
+    before = server.connections
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(songs):
+            result = client.generate_and_wait({"prompt": "라라라"})
+            save_audio_files(collect_track_audio_urls(result), output_dir=tmp)
+    elapsed = time.perf_counter() - start
+    handshakes = server.connections - before
+    stats = transport_stats()
+    print(
+        f"[공유 keep-alive 세션] {songs}곡 {elapsed:.2f}s, 연결 {handshakes}개 (곡당 {handshakes / songs:.1f}), "
+        f"요청 {stats['requests']}개, 재사용 {stats['handshakes_saved']}회"
+    )
+    return handshakes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--songs", type=int, default=10)
+    parser.add_argument("--complete-after", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = FakeSunoServer(complete_after=args.complete_after).start()
+    try:
+        baseline = run_without_pool(server, args.songs)
+        pooled = run_with_pool(server, args.songs)
+        print(f"곡당 절약한 핸드셰이크: {(baseline - pooled) / args.songs:.1f}회")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
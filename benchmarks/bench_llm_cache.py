@@ -0,0 +1,92 @@
+"""
+LLM 응답 캐시 벤치마크: 한 반 학생들이 같은 학습 텍스트로 /mnemonic-plan을 요청할 때
+
+로컬 가짜 OpenAI 서버(benchmarks/fake_openai_server.py)에 호출마다 latency초가 걸리게 하고,
+학생 수만큼 create_lyrics_and_plan을 순서대로 실행해 캐시 없음 / memory / sqlite 백엔드별로
+업스트림 호출 수, 평균/최대 응답 시간, 서로 다른 결과 수(variety)를 비교합니다.
+학생마다 공백만 다른 입력을 보내 정규화 키가 같은 항목으로 묶이는지도 확인합니다.
+
+    python benchmarks/bench_llm_cache.py --students 30 --variety 3 --latency 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+
+def make_responder():
+    """호출마다 다른 가사를 주는 구조화 응답 (temperature가 있는 실제 생성처럼)"""
+    counter = itertools.count(1)
+
+    def responder(body: Dict[str, Any]) -> str:
+        n = next(counter)
+        return json.dumps({
+            "summary_points": ["핵심 개념 1", "핵심 개념 2", "핵심 개념 3"],
+            "rhythm": "4/4, 96BPM",
+            "pitch_guide": "도 레 미 미 레 도",
+            "structure": "벌스 - 후렴 반복",
+            "lyrics": [f"{n}번 버전 가사 {line}줄" for line in range(1, 9)],
+            "memory_tip": "후렴 첫 글자를 이어 읽기",
+        }, ensure_ascii=False)
+
+    return responder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--variety", type=int, default=3, help="LLM_CACHE_VARIETY")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 응답 지연(초)")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency=args.latency, responder=make_responder()).start()
+    os.environ.update({"OPENAI_BASE_URL": server.base_url, "MNEMONIC_PLAN_MODE": "structured"})
+    from src.core import completion_cache
+    from src.core.workflow import create_lyrics_and_plan
+
+    study_text = "광합성은 빛 에너지를 이용해 이산화탄소와 물로 포도당을 만드는 과정이다."
+    print(f"학생 {args.students}명, 같은 학습 텍스트, 응답 지연 {args.latency}s, variety {args.variety}")
+
+    for label, env in (
+        ("캐시 없음", {"LLM_CACHE_ENABLED": "0"}),
+        ("memory", {"LLM_CACHE_ENABLED": "1", "LLM_CACHE_BACKEND": "memory"}),
+        ("sqlite", {
+            "LLM_CACHE_ENABLED": "1",
+            "LLM_CACHE_BACKEND": "sqlite",
+            "LLM_CACHE_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-llm-cache-"), "llm.sqlite3"),
+        }),
+    ):
+        os.environ.update(env, LLM_CACHE_VARIETY=str(args.variety))
+        completion_cache._cache = None  # 설정마다 새 캐시
+        before = server.requests
+        timings, results = [], set()
+        for student in range(args.students):
+            # 학생마다 복사/붙여넣기로 생긴 공백 차이
+            text = study_text.replace(" ", "  " if student % 2 else " ") + "\n" * (student % 3)
+            start = time.perf_counter()
+            _, lyrics = create_lyrics_and_plan(text, "fake")
+            timings.append(time.perf_counter() - start)
+            results.add(lyrics)
+        print(
+            f"{label:>8}: 업스트림 호출 {server.requests - before}회, "
+            f"평균 {sum(timings) / len(timings) * 1000:.0f}ms, 최대 {max(timings) * 1000:.0f}ms, "
+            f"서로 다른 가사 {len(results)}종"
+        )
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
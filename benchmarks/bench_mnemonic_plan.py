@@ -0,0 +1,103 @@
+"""
+가사 + 멜로디 가이드 생성 벤치마크: 두 번 호출(가사 → 가이드) vs 구조화 호출 한 번
+
+로컬 가짜 OpenAI 서버(benchmarks/fake_openai_server.py)가 호출마다 latency초 + 응답 토큰당 token_latency초를
+기다리게 해서, 같은 학습 텍스트로 create_lyrics_and_plan을 두 모드(MNEMONIC_PLAN_MODE)로 실행하고
+걸린 시간, 호출 수, 입력/출력 토큰(추정치)을 비교합니다.
+--broken-json을 주면 구조화 응답을 망가뜨려 두 번 호출로 대체되는 경로를 확인합니다.
+
+    python benchmarks/bench_mnemonic_plan.py --study-chars 1500 --latency 0.5 --token-latency 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+LYRICS = [f"{i}번째 줄 가사, 외우기 쉬운 리듬으로 핵심 용어를 반복해요" for i in range(1, 11)]
+
+
+def make_responder(broken_json: bool):
+    def responder(body: Dict[str, Any]) -> str:
+        messages = body.get("messages", [])
+        system = messages[0]["content"] if messages else ""
+        prompt = messages[-1]["content"] if messages else ""
+        if body.get("response_format"):
+            if broken_json:
+                return '{"summary_points": ["잘린 응답'
+            return json.dumps({
+                "summary_points": ["핵심 개념 1", "핵심 개념 2", "핵심 개념 3"],
+                "rhythm": "4/4, 96BPM, 경쾌한 팝",
+                "pitch_guide": "도 레 미 미 레 도 / 미 파 솔 솔 파 미",
+                "structure": "1~4줄 벌스, 5~6줄 후렴 두 번 반복",
+                "lyrics": LYRICS,
+                "memory_tip": "후렴의 첫 글자를 이어 읽으면 순서가 됩니다",
+            }, ensure_ascii=False)
+        if "작사가" in system:
+            return "\n".join(LYRICS)
+        # 두 번째 호출: 가이드 안에 받은 가사를 그대로 다시 씀
+        match = re.search(r"\[생성된 최종 가사\]\n(.*?)\n\n\[출력 포맷\]", prompt, re.DOTALL)
+        lyrics = match.group(1) if match else "\n".join(LYRICS)
+        return (
+            "1) 요약 포인트\n- 핵심 개념 1\n- 핵심 개념 2\n- 핵심 개념 3\n\n"
+            "2) 추천 리듬/템포/박자\n4/4, 96BPM, 경쾌한 팝\n\n"
+            "3) 음 높이 가이드\n도 레 미 미 레 도 / 미 파 솔 솔 파 미\n\n"
+            "4) 반복 구조와 하이라이트\n1~4줄 벌스, 5~6줄 후렴 두 번 반복\n\n"
+            f"5) 최종 가창 가이드 가사\n{lyrics}\n\n"
+            "6) 보너스 암기 팁\n후렴의 첫 글자를 이어 읽으면 순서가 됩니다"
+        )
+
+    return responder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--study-chars", type=int, default=1500, help="학습 텍스트 길이(글자)")
+    parser.add_argument("--latency", type=float, default=0.5, help="호출당 고정 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="응답 토큰당 지연(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--broken-json", action="store_true", help="구조화 응답을 망가뜨려 대체 경로 확인")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        latency=args.latency, token_latency=args.token_latency, responder=make_responder(args.broken_json)
+    ).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    from src.core.workflow import create_lyrics_and_plan
+    from src.lyrics_extractor import extract_final_lyrics
+
+    sentence = "광합성은 빛 에너지를 이용해 이산화탄소와 물로 포도당을 만드는 과정이다. "
+    study_text = (sentence * (args.study_chars // len(sentence) + 1))[:args.study_chars]
+    print(f"학습 텍스트 {len(study_text):,}자, 호출 지연 {args.latency}s + 응답 토큰당 {args.token_latency}s")
+
+    for mode in ("two-call", "structured"):
+        os.environ["MNEMONIC_PLAN_MODE"] = mode
+        requests, prompt_tokens, completion_tokens = server.requests, server.prompt_tokens, server.completion_tokens
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            plan, lyrics = create_lyrics_and_plan(study_text, "fake")
+            assert extract_final_lyrics(plan) == lyrics, "가이드의 5번 항목과 가사가 다릅니다"
+        elapsed = (time.perf_counter() - start) / args.repeat
+        calls = (server.requests - requests) / args.repeat
+        tokens_in = (server.prompt_tokens - prompt_tokens) / args.repeat
+        tokens_out = (server.completion_tokens - completion_tokens) / args.repeat
+        print(
+            f"{mode:>10}: {elapsed:.2f}s, 호출 {calls:.0f}회, "
+            f"입력 {tokens_in:,.0f}토큰, 출력 {tokens_out:,.0f}토큰"
+        )
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
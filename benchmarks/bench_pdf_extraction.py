@@ -0,0 +1,106 @@
+"""
+PDF 페이지 병렬 추출 벤치마크: PDF 크기 × 워커 수별 추출 시간
+
+같은 PDF를 워커 하나에서 순차 추출(PDF_WORKERS=1)과 여러 워커에서 병렬 추출(워커 2, 4, ...)로 처리해
+페이지 수가 늘어날수록 코어 수에 따라 얼마나 빨라지는지 비교합니다.
+첫 호출의 워커 기동(spawn + pdfplumber import) 시간은 워밍업으로 따로 측정합니다.
+--backends로 페이지별 추출기 순서(PDF_BACKENDS)를 바꿔 PyPDF2를 먼저 쓸 때와 비교할 수 있습니다.
+--budget을 주면 /extract-from-files처럼 글자 수 예산(max_chars)을 걸었을 때의 시간과 실제로 추출한 페이지 수도
+함께 보여 줍니다 (예산이 있으면 앞에서부터 묶음 단위로 병렬 추출하고 예산이 차면 멈춤).
+마지막으로 --small쪽짜리 작은 PDF를 요청 스레드에서 바로 추출할 때와 (이미 떠 있는) 프로세스 풀로 보낼 때를
+비교합니다 (PDF_POOL_MIN_PAGES 기준을 정하는 근거).
+
+    python benchmarks/bench_pdf_extraction.py --pages 10 50 200 --workers 1 2 4
+    python benchmarks/bench_pdf_extraction.py --backends pypdf2,pdfplumber
+    python benchmarks/bench_pdf_extraction.py --pages 50 200 --workers 1 4 --budget 20000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.sample_pdf import build_sample_pdf
+from src import pdf_processor
+
+
+def measure(
+    pdf_bytes: bytes, workers: int, repeat: int, budget: Optional[int] = None, pool_min_pages: int = 1
+) -> Tuple[float, int]:
+    """같은 설정으로 repeat번 추출한 중앙값(초)과 추출한 페이지 수 (기본은 페이지 수와 관계없이 풀 사용)"""
+    # 추출 캐시가 켜져 있으면 두 번째부터는 추출하지 않으므로 끔
+    os.environ["PDF_CACHE_ENABLED"] = "0"
+    os.environ["PDF_WORKERS"] = str(workers)
+    os.environ["PDF_PARALLEL_MIN_PAGES"] = "2"
+    os.environ["PDF_POOL_MIN_PAGES"] = str(pool_min_pages)
+    timings = []
+    for _ in range(repeat):
+        report = pdf_processor.PdfExtractionReport()
+        start = time.perf_counter()
+        pdf_processor.extract_text_from_pdf(pdf_bytes, max_chars=budget, report=report)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], sum(report.backend_pages.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default=None, help='PDF_BACKENDS 값 (예: "pypdf2,pdfplumber")')
+    parser.add_argument("--budget", type=int, default=None, help="글자 수 예산 (주면 예산 추출도 측정)")
+    parser.add_argument("--small", type=int, default=2, help="바로 추출 vs 풀을 비교할 작은 PDF 페이지 수")
+    args = parser.parse_args()
+    if args.backends:
+        os.environ["PDF_BACKENDS"] = args.backends
+
+    print(f"CPU 수: {os.cpu_count()}, 추출기 순서: {pdf_processor.pdf_backends()}")
+    pdfs = {pages: build_sample_pdf(pages) for pages in args.pages}
+    tiny = build_sample_pdf(1)
+
+    header = "페이지".rjust(6) + "".join(f"{f'워커 {w}':>12}" for w in args.workers) + f"{'최대 가속':>10}"
+    if args.budget:
+        header += "".join(f"{f'예산 워커 {w}':>16}" for w in args.workers)
+    print(header)
+    for pages, pdf_bytes in pdfs.items():
+        row = []
+        budgeted: List[Tuple[float, int]] = []
+        for workers in args.workers:
+            # 풀 크기가 바뀌므로 새로 만들고, 워커 기동 시간은 측정에서 제외 (워커 1개도 풀 프로세스에서 추출)
+            pdf_processor.shutdown_pdf_process_pool(wait=True)
+            os.environ["PDF_WORKERS"] = str(workers)
+            warmup = time.perf_counter()
+            pool = pdf_processor.get_pdf_process_pool()
+            # 모든 워커가 뜨고 pdfplumber를 import할 때까지 작은 작업을 돌림
+            warm = [pool.submit(pdf_processor._extract_pages, tiny, [0]) for _ in range(workers * 2)]
+            for future in warm:
+                future.result()
+            if pages == args.pages[0]:
+                print(f"  (워커 {workers}개 기동 {time.perf_counter() - warmup:.2f}s)")
+            row.append(measure(pdf_bytes, workers, args.repeat)[0])
+            if args.budget:
+                budgeted.append(measure(pdf_bytes, workers, args.repeat, args.budget))
+        speedup = row[0] / min(row) if min(row) else 0.0
+        line = f"{pages:>6}" + "".join(f"{t:>11.2f}s" for t in row) + f"{speedup:>9.1f}x"
+        line += "".join(f"{f'{t:.2f}s/{n}쪽':>16}" for t, n in budgeted)
+        print(line)
+
+    # 작은 PDF: 풀이 이미 떠 있어도 파일 전달/IPC 비용이 추출 시간보다 큰지
+    small = build_sample_pdf(args.small)
+    workers = args.workers[-1]
+    pooled = measure(small, workers, args.repeat * 3, pool_min_pages=1)[0]
+    inline = measure(small, workers, args.repeat * 3, pool_min_pages=args.small + 1)[0]
+    print(f"작은 PDF {args.small}쪽: 바로 추출 {inline * 1000:.1f}ms, 프로세스 풀 {pooled * 1000:.1f}ms (워커 기동 제외)")
+    pdf_processor.shutdown_pdf_process_pool(wait=True)
+
+
+if __name__ == "__main__":
+    main()
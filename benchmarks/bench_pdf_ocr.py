@@ -0,0 +1,67 @@
+"""
+스캔본 PDF OCR 폴백 벤치마크: 이미지 전용 페이지를 Vision 분석으로 읽는 데 걸리는 시간
+
+로컬 가짜 OpenAI 서버(benchmarks/fake_openai_server.py)에 페이지마다 latency초가 걸리는 분석을 맡기고,
+- 첫 업로드: 렌더링 + 동시 분석 ("vision" 단계 한도 STAGE_LIMIT_VISION), 페이지/픽셀 한도 적용
+- 같은 PDF 재업로드: 이미지 분석 캐시 적중으로 Vision 호출 0회
+를 측정합니다. 순차 호출이었다면 걸렸을 시간(페이지 수 × latency)과 비교합니다.
+
+    python benchmarks/bench_pdf_ocr.py --pages 12 --latency 1.0 --concurrency 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.sample_pdf import build_sample_pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=12, help="이미지 전용 페이지 수")
+    parser.add_argument("--latency", type=float, default=1.0, help="가짜 Vision 응답 지연(초)")
+    parser.add_argument("--concurrency", type=int, default=4, help="STAGE_LIMIT_VISION")
+    parser.add_argument("--max-pages", type=int, default=10, help="PDF_OCR_MAX_PAGES")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency=args.latency).start()
+    cache_dir = tempfile.mkdtemp(prefix="bench-pdf-ocr-")
+    os.environ.update({
+        "OPENAI_BASE_URL": server.base_url,
+        "STAGE_LIMIT_VISION": str(args.concurrency),
+        "PDF_OCR_MAX_PAGES": str(args.max_pages),
+        "RESULT_CACHE_DIR": cache_dir,
+        "PDF_WORKERS": "1",
+    })
+    from src.pdf_processor import PdfExtractionReport, extract_text_from_pdf
+
+    pdf_bytes = build_sample_pdf(args.pages, image_pages=range(1, args.pages + 1))
+    print(f"이미지 전용 {args.pages}쪽 PDF ({len(pdf_bytes):,}B), 응답 지연 {args.latency}s, 동시 {args.concurrency}")
+
+    for label in ("첫 업로드", "재업로드"):
+        before = server.image_requests
+        report = PdfExtractionReport()
+        start = time.perf_counter()
+        text = extract_text_from_pdf(pdf_bytes, report=report, ocr_api_key="fake")
+        elapsed = time.perf_counter() - start
+        calls = server.image_requests - before
+        print(
+            f"{label}: {elapsed:.2f}s, Vision 호출 {calls}회, OCR {len(report.ocr_pages)}쪽 "
+            f"(한도로 생략 {len(report.ocr_skipped_pages)}쪽), 텍스트 {len(text):,}자"
+        )
+    sequential = min(args.pages, args.max_pages) * args.latency
+    print(f"순차 호출 추정: {sequential:.1f}s, 최대 동시 요청 {server.max_in_flight}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
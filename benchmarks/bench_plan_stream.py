@@ -0,0 +1,98 @@
+"""
+멜로디 가이드 스트리밍 벤치마크: /mnemonic-plan vs /mnemonic-plan/stream (SSE)
+
+로컬 가짜 OpenAI 서버(benchmarks/fake_openai_server.py)가 응답 토큰마다 token_latency초씩 걸려 생성하도록 하고,
+실제 uvicorn 서버에 두 엔드포인트를 요청해
+- 일반 호출: 응답을 받기까지의 시간
+- 스트리밍: 첫 바이트/첫 항목(section)까지의 시간, 완료(done)까지의 시간
+을 비교합니다. 스트리밍 완료 결과가 일반 호출 결과와 같은지도 확인합니다.
+
+    python benchmarks/bench_plan_stream.py --latency 0.5 --token-latency 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import httpx
+import uvicorn
+
+from benchmarks.bench_mnemonic_plan import make_responder
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+
+def start_api_server() -> tuple:
+    """src.server 앱을 빈 포트의 uvicorn으로 띄우고 (server, base_url) 반환"""
+    from src.server import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="첫 토큰까지의 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="응답 토큰당 지연(초)")
+    args = parser.parse_args()
+
+    fake = FakeOpenAIServer(latency=args.latency, token_latency=args.token_latency, responder=make_responder(False))
+    fake.start()
+    os.environ.update({"OPENAI_BASE_URL": fake.base_url, "OPENAI_API_KEY": "fake", "MNEMONIC_PLAN_MODE": "structured"})
+    api, base_url = start_api_server()
+    body = {"study_text": "광합성은 빛 에너지를 이용해 이산화탄소와 물로 포도당을 만드는 과정이다."}
+
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        start = time.perf_counter()
+        plain = client.post("/mnemonic-plan", json=body).json()
+        plain_s = time.perf_counter() - start
+        print(f"    일반 호출: 응답까지 {plain_s:.2f}s")
+
+        start = time.perf_counter()
+        first_byte = first_section = None
+        sections = []
+        done = None
+        with client.stream("POST", "/mnemonic-plan/stream", json=body) as resp:
+            event = None
+            for line in resp.iter_lines():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "section":
+                        if first_section is None:
+                            first_section = time.perf_counter() - start
+                        sections.append((data["key"], round(time.perf_counter() - start, 2)))
+                    elif event in ("done", "error"):
+                        done = (event, data, time.perf_counter() - start)
+        print(
+            f"    스트리밍: 첫 바이트 {first_byte:.2f}s, 첫 항목 {first_section:.2f}s, "
+            f"완료 {done[2]:.2f}s ({done[0]})"
+        )
+        print("    항목 도착: " + ", ".join(f"{key} {t}s" for key, t in sections))
+        same = done[0] == "done" and done[1]["mnemonic_plan"] == plain["mnemonic_plan"]
+        print(f"    완료 결과가 일반 호출과 같음: {same}")
+
+    api.should_exit = True
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
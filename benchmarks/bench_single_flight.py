@@ -0,0 +1,114 @@
+"""
+동시 요청 합치기(single-flight) 벤치마크: 한 반이 같은 학습지로 동시에 요청할 때
+
+로컬 가짜 OpenAI 서버(benchmarks/fake_openai_server.py)에 호출마다 latency초가 걸리게 하고,
+학생 수만큼 /extract-text/raw(같은 이미지)와 /mnemonic-plan(공백만 다른 같은 텍스트)을 동시에 보내
+SINGLE_FLIGHT_ENABLED 0/1별로 업스트림 호출 수와 전체 소요 시간, 응답 종류 수를 비교합니다.
+마지막에 요청 절반이 중간에 끊겨도 나머지가 같은 호출의 결과를 받는지 확인합니다.
+
+    python benchmarks/bench_single_flight.py --students 30 --latency 1.0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import httpx
+from PIL import Image
+
+from benchmarks.bench_mnemonic_plan import make_responder
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+STUDY_TEXT = "광합성은 빛 에너지를 이용해 이산화탄소와 물로 포도당을 만드는 과정이다."
+
+
+def make_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def burst(client: httpx.AsyncClient, students: int, image: bytes) -> None:
+    def extract(_: int):
+        return client.post("/extract-text/raw", content=image, headers={"Content-Type": "image/png"})
+
+    def plan(i: int):
+        # 복사/붙여넣기로 생긴 공백 차이는 같은 요청으로 취급
+        return client.post("/mnemonic-plan", json={"study_text": STUDY_TEXT.replace(" ", "  " if i % 2 else " ")})
+
+    for path, send in (("/extract-text/raw", extract), ("/mnemonic-plan", plan)):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(send(i) for i in range(students)))
+        elapsed = time.perf_counter() - start
+        statuses = sorted({r.status_code for r in responses})
+        print(f"    {path:<18} {elapsed:5.2f}s, 상태 {statuses}, 응답 {len({r.text for r in responses})}종")
+
+
+async def run(students: int, image: bytes, server: FakeOpenAIServer) -> None:
+    from src.server import app
+    from src.core.single_flight import single_flight_stats
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for enabled in ("0", "1"):
+            os.environ["SINGLE_FLIGHT_ENABLED"] = enabled
+            before = server.requests
+            print(f"SINGLE_FLIGHT_ENABLED={enabled}")
+            await burst(client, students, image)
+            print(f"    업스트림 호출 {server.requests - before}회")
+
+        # 절반은 응답 전에 끊김 (요청 태스크 취소)
+        before = server.requests
+        tasks = [
+            asyncio.create_task(client.post("/mnemonic-plan", json={"study_text": STUDY_TEXT + " 끊김"}))
+            for _ in range(students)
+        ]
+        await asyncio.sleep(0.1)
+        for task in tasks[: students // 2]:
+            task.cancel()
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        ok = [r for r in done if isinstance(r, httpx.Response) and r.status_code == 200]
+        print(f"중간에 {students // 2}명 끊김: 나머지 {len(ok)}명 응답, 업스트림 호출 {server.requests - before}회")
+
+    for stage, stats in single_flight_stats().items():
+        print(f"    {stage}: {stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=1.0, help="가짜 응답 지연(초)")
+    args = parser.parse_args()
+
+    responder = make_responder(False)
+
+    def study_text_or_plan(body):
+        # Vision 요청(이미지 포함)에는 학습 텍스트로 응답
+        if "image_url" in str(body.get("messages", "")):
+            return STUDY_TEXT
+        return responder(body)
+
+    server = FakeOpenAIServer(latency=args.latency, responder=study_text_or_plan).start()
+    os.environ.update({
+        "OPENAI_BASE_URL": server.base_url,
+        "OPENAI_API_KEY": "fake",
+        "MNEMONIC_PLAN_MODE": "structured",
+        "RESULT_CACHE_ENABLED": "0",
+        "LLM_CACHE_ENABLED": "0",
+    })
+    print(f"학생 {args.students}명 동시 요청, 응답 지연 {args.latency}s")
+    asyncio.run(run(args.students, make_image(), server))
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+노래 보관함 벤치마크: 같은(또는 공백/문장부호/구간 표시만 다른) 가사로 /generate-song을 반복할 때
+
+로컬 가짜 Suno 서버(benchmarks/fake_suno_server.py)가 생성에 complete_after초 걸리게 하고,
+같은 가사의 변형으로 /generate-song(wait_for_audio)을 requests번 보내
+SONG_LIBRARY_ENABLED 0/1별로 응답 시간과 create_song(POST /generate) 호출 수를 비교합니다.
+마지막에 가짜 Suno 서버를 내려(업스트림 URL 만료) 보관된 /audio/{digest}의 내용이 주소의 해시와 같은지 확인합니다.
+
+    python benchmarks/bench_song_library.py --requests 5 --complete-after 3
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_suno_server import FakeSunoServer
+
+LYRICS = "[Verse]\n빛을 받아 잎에서, 포도당을 만들어요!\n이산화탄소 더하기 물\n\n[Chorus]\n광합성, 광합성"
+
+# 학생마다 조금씩 다르게 복사된 같은 가사
+VARIANTS = [
+    LYRICS,
+    LYRICS.replace(", ", " ").replace("!", ""),
+    LYRICS.replace("[Verse]\n", "").replace("[Chorus]\n", "(Chorus)\n"),
+    "  " + LYRICS.replace("\n", "\n\n") + "  ",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--complete-after", type=float, default=3.0, help="가짜 Suno 생성 시간(초)")
+    args = parser.parse_args()
+
+    suno = FakeSunoServer(complete_after=args.complete_after).start()
+    os.environ.update({
+        "SUNO_BASE_URL": suno.base_url,
+        "SUNO_API_KEY": "fake",
+        "OPENAI_API_KEY": "fake",
+        "SUNO_POLL_INTERVAL": "0.5",
+        "JOB_WORKER_ENABLED": "0",
+        "JOB_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-jobs-"), "jobs.sqlite3"),
+    })
+    from fastapi.testclient import TestClient
+
+    print(f"같은 가사 변형 {len(VARIANTS)}종으로 {args.requests}번 요청, Suno 생성 {args.complete_after}s")
+    last = None
+    for enabled in ("0", "1"):
+        os.environ.update({
+            "SONG_LIBRARY_ENABLED": enabled,
+            "SONG_LIBRARY_DIR": tempfile.mkdtemp(prefix="bench-library-"),
+        })
+        from src.server import app
+
+        with TestClient(app) as client:
+            before = suno.requests["POST /api/v1/generate"]
+            timings = []
+            for i in range(args.requests):
+                body = {"study_text": "광합성", "mnemonic_plan": "", "final_lyrics": VARIANTS[i % len(VARIANTS)]}
+                start = time.perf_counter()
+                resp = client.post("/generate-song", json=body)
+                timings.append(time.perf_counter() - start)
+                resp.raise_for_status()
+                last = resp.json()
+                if i == 0 and enabled == "1":
+                    # 새로 만든 곡도 보관이 끝난 뒤 로컬 주소로 응답
+                    assert all("/audio/" in url for url in last["audio_urls"]), last["audio_urls"]
+            calls = suno.requests["POST /api/v1/generate"] - before
+            rest = timings[1:] or timings
+            print(
+                f"SONG_LIBRARY_ENABLED={enabled}: create_song {calls}회, 첫 요청 {timings[0]:.2f}s, "
+                f"이후 평균 {sum(rest) / len(rest) * 1000:.0f}ms"
+            )
+            if enabled == "1":
+                suno.stop()
+                served = {url.rsplit("/", 1)[1]: client.get(url).content for url in last["audio_urls"]}
+                intact = all(hashlib.sha256(data).hexdigest() == digest for digest, data in served.items())
+                print(
+                    f"    업스트림 중지 후 /audio 응답 {len(served)}개, 크기 {[len(b) for b in served.values()]}, "
+                    f"내용 해시 일치 {intact}"
+                )
+                print(f"    {client.get('/cache-stats').json()['song-library']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Suno 폴링 벤치마크: 곡별 poll_result 스레드 vs 통합 SunoPoller
+
+가짜 Suno 서버에 N곡을 동시에 요청하고, 완료까지 걸린 시간과 곡당 조회 요청 수를 비교합니다.
+
+    python benchmarks/bench_suno_poller.py --songs 50 --complete-after 6
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.fake_suno_server import FakeSunoServer
+from src.core.suno_poller import SunoPoller
+from src.suno_client import SunoClient
+
+
+def _record_info_requests(server: FakeSunoServer) -> int:
+    return sum(count for key, count in server.requests.items() if key.endswith("/generate/record-info"))
+
+
+def bench_threads(server: FakeSunoServer, songs: int, poll_interval: float) -> None:
+    client = SunoClient("fake", base_url=server.base_url, poll_interval=poll_interval, verbose=False)
+    task_ids = [client.create_song({"prompt": "라라라"}) for _ in range(songs)]
+    before = _record_info_requests(server)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=songs) as pool:
+        list(pool.map(client.poll_result, task_ids))
+    elapsed = time.perf_counter() - start
+    polls = _record_info_requests(server) - before
+    print(f"[스레드별 poll_result] {songs}곡 {elapsed:.2f}s, 스레드 {songs}개, 곡당 조회 {polls / songs:.2f}회")
+
+
+async def bench_poller(server: FakeSunoServer, songs: int, poll_interval: float) -> None:
+    client = SunoClient("fake", base_url=server.base_url, verbose=False)
+
+    async def check(task_id: str):
+        return await asyncio.to_thread(client.check_status, task_id)
+
+    poller = SunoPoller(check, poll_interval=poll_interval)
+    task_ids = [client.create_song({"prompt": "라라라"}) for _ in range(songs)]
+    before = _record_info_requests(server)
+    start = time.perf_counter()
+    await asyncio.gather(*(poller.wait(task_id) for task_id in task_ids))
+    elapsed = time.perf_counter() - start
+    polls = _record_info_requests(server) - before
+    await poller.close()
+    print(
+        f"[SunoPoller] {songs}곡 {elapsed:.2f}s, 폴링 루프 1개, 곡당 조회 {polls / songs:.2f}회 "
+        f"(stats={poller.stats()})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--songs", type=int, default=50)
+    parser.add_argument("--complete-after", type=float, default=6.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeSunoServer(complete_after=args.complete_after).start()
+    try:
+        bench_threads(server, args.songs, args.poll_interval)
+        asyncio.run(bench_poller(server, args.songs, args.poll_interval))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
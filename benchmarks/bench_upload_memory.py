@@ -0,0 +1,81 @@
+"""
+업로드 수신 메모리 벤치마크: UploadFile.read()로 통째로 읽기 vs 임시 파일 스풀링
+
+동시에 들어온 큰 업로드 N개를 두 방식으로 받아 SHA-256까지 계산하는 동안
+파이썬이 할당한 메모리의 최고치(tracemalloc)를 비교합니다.
+스풀링은 청크(UPLOAD_CHUNK_KB) 크기만큼만 메모리에 올리고, 이후 처리는 mmap으로 읽습니다.
+
+    python benchmarks/bench_upload_memory.py --files 4 --size-mb 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from starlette.datastructures import UploadFile
+
+from src.core.upload_spool import spool_upload
+
+
+def make_upload(size: int) -> UploadFile:
+    """Starlette가 멀티파트를 파싱한 뒤와 같은 상태(디스크로 넘어간 SpooledTemporaryFile)의 업로드"""
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    block = os.urandom(1024 * 1024)
+    for _ in range(size // len(block)):
+        file.write(block)
+    file.seek(0)
+    return UploadFile(file, size=size, filename="material.pdf")
+
+
+async def receive_with_read(upload: UploadFile) -> str:
+    data = await upload.read()
+    return hashlib.sha256(data).hexdigest()
+
+
+async def receive_with_spool(upload: UploadFile) -> str:
+    spooled = await spool_upload(upload, max_bytes=upload.size + 1)
+    try:
+        # 후속 처리와 같이 mmap 버퍼를 읽음
+        return hashlib.sha256(spooled.buffer()).hexdigest()
+    finally:
+        spooled.close()
+
+
+async def measure(label: str, receive, files: int, size: int) -> None:
+    uploads = [make_upload(size) for _ in range(files)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    digests = await asyncio.gather(*(receive(upload) for upload in uploads))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for upload in uploads:
+        await upload.close()
+    print(f"{label:>8}: 최고 할당 {peak / 1024 / 1024:7.1f}MB, {elapsed:.2f}s ({len(set(digests))}종 해시)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=4, help="동시 업로드 수")
+    parser.add_argument("--size-mb", type=int, default=50, help="파일 하나 크기(MB)")
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    print(f"{args.files}개 × {args.size_mb}MB 동시 수신")
+    asyncio.run(measure("read()", receive_with_read, args.files, size))
+    asyncio.run(measure("스풀링", receive_with_spool, args.files, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+로컬 가짜 OpenAI Chat Completions 서버 (벤치마크/수동 테스트용)
+
+POST /v1/chat/completions 에 latency 초 뒤 응답합니다. 응답 본문은 responder(요청 JSON) → 문자열로
+바꿀 수 있고, 기본값은 이미지가 포함된 요청이면 이미지 크기를, 아니면 마지막 메시지 길이를 적은 짧은 텍스트입니다.
+요청 수(requests), 이미지가 포함된 요청 수(image_requests), 동시에 처리 중이던 최대 요청 수(max_in_flight)와
+추정 토큰 합계(prompt_tokens, completion_tokens)를 기록합니다. token_latency를 주면 응답 토큰마다
+그만큼 더 기다려 생성 시간이 출력 길이에 비례하는 실제 모델을 흉내 냅니다.
+"stream": true 요청에는 latency 뒤 응답을 조각(chat.completion.chunk)으로 나눠 SSE로 보냅니다.
+
+단독 실행:
+    python benchmarks/fake_openai_server.py --port 8766 --latency 1.0
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=fake uvicorn src.server:app
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.text_budget import estimate_tokens
+
+
+def default_responder(body: Dict[str, Any]) -> str:
+    last = body.get("messages", [{}])[-1].get("content", "")
+    if isinstance(last, list):
+        images = [part["image_url"]["url"] for part in last if part.get("type") == "image_url"]
+        return "\n".join(f"이미지 내용 요약 ({len(url)}자 data URL)" for url in images)
+    return f"요약된 학습 자료 ({len(last)}자 입력)"
+
+
+class FakeOpenAIServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.5,
+        responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+        token_latency: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.token_latency = token_latency
+        self.responder = responder or default_responder
+        self.requests = 0
+        self.image_requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        content = self.responder(body)
+        prompt_tokens = sum(
+            estimate_tokens(m["content"]) for m in body.get("messages", []) if isinstance(m.get("content"), str)
+        )
+        completion_tokens = estimate_tokens(content)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _send_stream(self, response: Dict[str, Any], piece_chars: int = 8) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                content = response["choices"][0]["message"]["content"]
+                base = {k: response[k] for k in ("id", "created", "model")}
+
+                def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> None:
+                    body = {
+                        **base,
+                        "object": "chat.completion.chunk",
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                time.sleep(server.latency)
+                chunk({"role": "assistant", "content": ""})
+                for i in range(0, len(content), piece_chars):
+                    piece = content[i:i + piece_chars]
+                    time.sleep(estimate_tokens(piece) * server.token_latency)
+                    chunk({"content": piece})
+                chunk({}, "stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                has_image = '"image_url"' in json.dumps(body.get("messages", []))
+                with server._lock:
+                    server.requests += 1
+                    server.image_requests += int(has_image)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    response = server.complete(body)
+                    if body.get("stream"):
+                        self._send_stream(response)
+                        return
+                    tokens = response["usage"]["completion_tokens"]
+                    time.sleep(server.latency + tokens * server.token_latency)
+                    self._send_json(200, response)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="로컬 가짜 OpenAI Chat Completions 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency).start()
+    print(f"[FakeOpenAI] {server.base_url} (응답 지연 {args.latency}초)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
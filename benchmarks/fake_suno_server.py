@@ -0,0 +1,159 @@
+"""
+로컬 가짜 Suno API 서버 (벤치마크/수동 테스트용)
+
+/generate 로 작업을 만들면 complete_after 초 뒤에 SUCCESS 상태와 트랙을 돌려줍니다.
+/generate/record-info 는 GET(쿼리)과 POST(JSON) 모두 지원하며, 경로별 요청 수와
+새로 맺어진 TCP 연결 수(connections)를 기록합니다. /audio/<id>.mp3 는 audio_size 바이트의 더미 오디오를 돌려줍니다.
+
+단독 실행:
+    python benchmarks/fake_suno_server.py --port 8765 --complete-after 5
+    SUNO_BASE_URL=http://127.0.0.1:8765/api/v1 uvicorn src.server:app
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeSunoServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        complete_after: float = 3.0,
+        audio_size: int = 256 * 1024,
+    ) -> None:
+        self.complete_after = complete_after
+        self.audio_size = audio_size
+        self.tasks: Dict[str, float] = {}
+        self.requests: Counter[str] = Counter()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self) -> "FakeSunoServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def record_info(self, task_id: str) -> Dict[str, Any]:
+        created = self.tasks.get(task_id)
+        if created is None:
+            return {"code": 404, "msg": f"unknown task {task_id}"}
+        if time.monotonic() - created < self.complete_after:
+            return {"code": 200, "data": {"taskId": task_id, "status": "PENDING"}}
+        return {
+            "code": 200,
+            "data": {
+                "taskId": task_id,
+                "status": "SUCCESS",
+                "response": {
+                    "sunoData": [
+                        {"id": f"{task_id}-1", "audioUrl": f"{self.base_url}/audio/{task_id}-1.mp3"},
+                        {"id": f"{task_id}-2", "audioUrl": f"{self.base_url}/audio/{task_id}-2.mp3"},
+                    ]
+                },
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send_json(self, body: Dict[str, Any]) -> None:
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _send_audio(self, path: str) -> None:
+                # 경로마다 다른 내용이 나오도록 경로 바이트를 반복
+                seed = path.encode("utf-8")
+                body = (seed * (server.audio_size // len(seed) + 1))[: server.audio_size]
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                with server._lock:
+                    server.requests[f"GET {parsed.path}"] += 1
+                if parsed.path.endswith("/generate/record-info"):
+                    task_id = parse_qs(parsed.query).get("taskId", [""])[0]
+                    self._send_json(server.record_info(task_id))
+                elif "/audio/" in parsed.path:
+                    self._send_audio(parsed.path)
+                else:
+                    self._send_json({"code": 404, "msg": "not found"})
+
+            def do_POST(self) -> None:
+                parsed = urlparse(self.path)
+                with server._lock:
+                    server.requests[f"POST {parsed.path}"] += 1
+                body = self._read_json()
+                if parsed.path.endswith("/generate/record-info"):
+                    self._send_json(server.record_info(body.get("taskId", "")))
+                elif parsed.path.endswith("/generate"):
+                    task_id = uuid.uuid4().hex
+                    with server._lock:
+                        server.tasks[task_id] = time.monotonic()
+                    self._send_json({"code": 200, "data": {"taskId": task_id}})
+                else:
+                    self._send_json({"code": 404, "msg": "not found"})
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="로컬 가짜 Suno API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--complete-after", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = FakeSunoServer(args.host, args.port, args.complete_after).start()
+    print(f"[FakeSuno] {server.base_url} (완료까지 {args.complete_after}초)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
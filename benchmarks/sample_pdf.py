@@ -0,0 +1,100 @@
+"""
+벤치마크용 PDF 생성기 (PDF 1.4를 직접 작성)
+
+    from benchmarks.sample_pdf import build_sample_pdf
+    pdf_bytes = build_sample_pdf(pages=200)
+    scanned = build_sample_pdf(pages=10, image_pages=range(1, 11))  # 스캔본처럼 이미지만 있는 PDF
+
+image_pages의 페이지는 같은 문장을 Pillow로 그린 JPEG 한 장으로만 구성됩니다.
+"""
+from __future__ import annotations
+
+import io
+import random
+from typing import Iterable, List
+
+_WORDS = (
+    "photosynthesis chlorophyll glucose oxygen carbon dioxide light energy leaf stomata "
+    "mitochondria respiration cell membrane nucleus enzyme protein gene chromosome "
+    "Goryeo Joseon dynasty 1392 1446 Hangul Sejong capital Hanyang Silla Baekje Goguryeo "
+    "equation variable slope intercept triangle angle radius circle area volume"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _sentences(rng: random.Random, lines: int) -> List[str]:
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14))) for _ in range(lines)]
+
+
+def _page_stream(sentences: List[str]) -> bytes:
+    rows = ["BT", "/F1 11 Tf", "14 TL", "50 780 Td"]
+    rows.extend(f"({_escape(sentence)}) Tj T*" for sentence in sentences)
+    rows.append("ET")
+    return "\n".join(rows).encode("latin-1")
+
+
+def _page_image(sentences: List[str]) -> bytes:
+    """문장을 A4 비율 회색조 이미지에 그려 JPEG로 (150dpi 상당)"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new("L", (1240, 1754), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=22)
+    for i, sentence in enumerate(sentences):
+        draw.text((100, 100 + i * 29), sentence, fill=0, font=font)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=70)
+    return buffer.getvalue()
+
+
+def build_sample_pdf(pages: int, lines_per_page: int = 50, seed: int = 0, image_pages: Iterable[int] = ()) -> bytes:
+    """pages쪽짜리 PDF (페이지마다 lines_per_page줄의 무작위 학습 문장, image_pages는 이미지로만)"""
+    rng = random.Random(seed)
+    image_pages = set(image_pages)
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # 나중에 채움
+    page_tree = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    kids = []
+    for number in range(1, pages + 1):
+        sentences = _sentences(rng, lines_per_page)
+        if number in image_pages:
+            jpeg = _page_image(sentences)
+            image = add(
+                b"<< /Type /XObject /Subtype /Image /Width 1240 /Height 1754 /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % len(jpeg) + jpeg + b"\nendstream"
+            )
+            stream = b"q 595 0 0 842 0 0 cm /Im1 Do Q"
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % image
+        else:
+            stream = _page_stream(sentences)
+            resources = b"<< /Font << /F1 %d 0 R >> >>" % font
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources %s /Contents %d 0 R >>" % (page_tree, resources, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % page_tree
+    objects[page_tree - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
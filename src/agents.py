@@ -1,4 +1,12 @@
 # src/agents.py
+import json
+
+from src.core.completion_cache import cached_completion
+
+# 프롬프트를 바꾸면 올려서 이전 캐시 결과를 무효화
+PLAN_PROMPT_VERSION = "plan-v1"
+STRUCTURED_PLAN_VERSION = "plan-structured-v1"
+
 SYSTEM_CORE = (
     "너는 학습자를 위한 기억 보조 작곡가다. "
     "입력된 학습 텍스트를 쉽고 경쾌하게 외울 수 있도록 리듬, 멜로디, 반복 구조를 설계해라. "
@@ -63,12 +71,260 @@ def build_mnemonic_plan(client, study_text, final_lyrics: str = None, model="gpt
 - 다른 설명은 하지 말고 위 포맷만 채워서 출력.
 """.strip()
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
+    def _request() -> str:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_CORE},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.5,
+        )
+        return resp.choices[0].message.content.strip()
+
+    return cached_completion(
+        "mnemonic-plan", PLAN_PROMPT_VERSION, model, {"temperature": 0.5}, [study_text, final_lyrics or ""], _request
+    )
+
+# 한 번의 호출로 가사와 멜로디 가이드를 함께 받는 구조화 출력 스키마
+PLAN_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["summary_points", "rhythm", "pitch_guide", "structure", "lyrics", "memory_tip"],
+    "properties": {
+        "summary_points": {"type": "array", "items": {"type": "string"}},
+        "rhythm": {"type": "string"},
+        "pitch_guide": {"type": "string"},
+        "structure": {"type": "string"},
+        "lyrics": {"type": "array", "items": {"type": "string"}},
+        "memory_tip": {"type": "string"},
+    },
+}
+
+
+def _clean_field(key: str, value):
+    """항목 하나의 타입을 검사하고 공백을 정리 (타입이 다르면 ValueError)"""
+    if PLAN_SCHEMA["properties"][key]["type"] == "array":
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"멜로디 가이드 응답의 {key} 항목은 문자열 목록이어야 합니다.")
+        return [item.strip() for item in value if item.strip()]
+    if not isinstance(value, str):
+        raise ValueError(f"멜로디 가이드 응답의 {key} 항목은 문자열이어야 합니다.")
+    return value.strip()
+
+
+def validate_plan(data) -> dict:
+    """
+    구조화 응답을 PLAN_SCHEMA 기준으로 검사하고 공백을 정리한 dict를 반환합니다.
+    형식이 맞지 않으면 ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("멜로디 가이드 응답이 JSON 객체가 아닙니다.")
+    missing = [key for key in PLAN_SCHEMA["required"] if key not in data]
+    if missing:
+        raise ValueError(f"멜로디 가이드 응답에 항목이 없습니다: {', '.join(missing)}")
+    plan = {key: _clean_field(key, data[key]) for key in PLAN_SCHEMA["properties"]}
+    if not plan["lyrics"]:
+        raise ValueError("멜로디 가이드 응답에 가사가 비어 있습니다.")
+    if not plan["summary_points"]:
+        raise ValueError("멜로디 가이드 응답에 요약 포인트가 비어 있습니다.")
+    return plan
+
+
+# (키, 제목) 순서 = 기존 텍스트 가이드의 1)~6) 항목 순서
+PLAN_SECTIONS = [
+    ("summary_points", "요약 포인트"),
+    ("rhythm", "추천 리듬/템포/박자"),
+    ("pitch_guide", "음 높이 가이드"),
+    ("structure", "반복 구조와 하이라이트"),
+    ("lyrics", "최종 가창 가이드 가사"),
+    ("memory_tip", "보너스 암기 팁"),
+]
+
+
+def render_section(key: str, value) -> str:
+    """항목 하나를 "N) 제목\n내용" 텍스트로"""
+    number, title = next((i + 1, t) for i, (k, t) in enumerate(PLAN_SECTIONS) if k == key)
+    if key == "summary_points":
+        body = "\n".join(f"- {point}" for point in value)
+    elif key == "lyrics":
+        body = "\n".join(value)
+    else:
+        body = value
+    return f"{number}) {title}\n{body}"
+
+
+def render_plan(plan: dict) -> str:
+    """구조화된 가이드를 기존 6개 항목 텍스트 형식으로 (extract_final_lyrics로도 가사를 꺼낼 수 있음)"""
+    return "\n\n".join(render_section(key, plan[key]) for key, _ in PLAN_SECTIONS)
+
+
+class PlanStreamParser:
+    """
+    구조화 응답 JSON을 조각(delta)째로 받아, 최상위 항목의 값이 끝날 때마다 (키, 값)을 돌려줍니다.
+    문자열/이스케이프와 중첩 깊이만 따라가므로 응답 전체를 기다리지 않고 항목 경계를 알 수 있습니다.
+    새로 받은 조각만 훑고, 조각은 목록에 모아 두었다가 항목이 끝날 때(와 text를 읽을 때)만 이어 붙입니다.
+    """
+
+    def __init__(self) -> None:
+        self._chunks = []
+        # 진행 중인 항목이 시작된 뒤의 조각들과, 그 첫 글자의 전체 응답 기준 위치
+        self._pending = []
+        self._pending_start = 0
+        self._received = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = 0
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 응답 전체"""
+        return "".join(self._chunks)
+
+    def _slice(self, start: int, end: int) -> str:
+        """진행 중인 항목 범위 안의 [start, end) (전체 응답 기준 위치)"""
+        buffer = "".join(self._pending)
+        self._pending = [buffer]
+        return buffer[start - self._pending_start:end - self._pending_start]
+
+    def _drop_before(self, pos: int) -> None:
+        buffer = "".join(self._pending)
+        self._pending = [buffer[pos - self._pending_start:]]
+        self._pending_start = pos
+
+    def feed(self, chunk: str) -> list:
+        self._chunks.append(chunk)
+        self._pending.append(chunk)
+        base = self._received
+        self._received += len(chunk)
+        finished = []
+        for offset, ch in enumerate(chunk):
+            pos = base + offset
+            top_level = self._depth == 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if top_level and self._value_start is None:
+                        self._key = json.loads(self._slice(self._key_start, pos + 1))
+            elif ch == '"':
+                self._in_string = True
+                if top_level and self._value_start is None:
+                    self._key_start = pos
+            elif ch == ":" and top_level and self._value_start is None:
+                self._value_start = pos + 1
+            elif (ch == "," or ch == "}") and top_level and self._value_start is not None:
+                finished.append((self._key, json.loads(self._slice(self._value_start, pos))))
+                self._key, self._value_start = None, None
+                self._drop_before(pos + 1)
+                if ch == "}":
+                    self._depth -= 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+        return finished
+
+
+def _structured_plan_request(study_text, model) -> dict:
+    """구조화 가이드 호출 인자 (스트리밍/일반 호출 공용)"""
+    prompt = f"""
+다음 학습용 텍스트를 노래 가사로 바꾸고, 그 가사를 부르는 멜로디 가이드를 함께 만들어라.
+
+[학습 텍스트]
+{study_text}
+
+[JSON 항목]
+- summary_points: 요약 포인트 3~5개 (암기할 핵심 단위)
+- rhythm: 추천 리듬/템포/박자 (예: 4/4, 90BPM, 스윙 등)
+- pitch_guide: 음 높이 가이드 (계이름 또는 숫자음으로 한 줄, 필요한 경우 두 줄)
+- structure: 반복 구조와 하이라이트 (후렴, 콜앤리스폰스 등)
+- lyrics: 최종 가창 가이드 가사, 한 줄씩 (4~12줄)
+- memory_tip: 보너스 암기 팁 한 줄
+
+가사 조건:
+- 학습 내용의 핵심과 핵심 용어를 모두 포함.
+- 노래로 부르기 쉬운 자연스러운 한국어 문장, 반복되는 후렴구가 있으면 더 좋음.
+- 학습자가 외우기 쉽도록 리듬감 있는 표현을 사용.
+- 음 높이는 초보자가 따라 부르기 쉽게 단계적으로 움직이도록 제안.
+""".strip()
+
+    return {
+        "model": model,
+        "messages": [
             {"role": "system", "content": SYSTEM_CORE},
             {"role": "user", "content": prompt},
         ],
-        temperature=0.5,
+        "temperature": 0.6,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "mnemonic_plan", "strict": True, "schema": PLAN_SCHEMA},
+        },
+    }
+
+
+def build_structured_plan(client, study_text, model="gpt-4o-mini") -> dict:
+    """
+    가사 생성과 멜로디 가이드를 한 번의 호출로 합친 버전.
+    학습 텍스트를 한 번만 보내고, 가사도 한 번만 생성하므로 입력/출력 토큰이 모두 줄어듭니다.
+    응답은 PLAN_SCHEMA JSON으로 받아 validate_plan으로 검사합니다.
+    """
+    def _request() -> str:
+        resp = client.chat.completions.create(**_structured_plan_request(study_text, model))
+        content = resp.choices[0].message.content
+        # 검사를 통과한 응답만 캐시에 남도록 여기서 먼저 검사
+        validate_plan(json.loads(content))
+        return content
+
+    return validate_plan(json.loads(_cached_structured(study_text, model, _request)))
+
+
+def _cached_structured(study_text, model, request) -> str:
+    """구조화 가이드 원본 JSON (스트리밍/일반 호출이 같은 캐시 항목을 씀)"""
+    params = {"temperature": _structured_plan_request(study_text, model)["temperature"]}
+    return cached_completion(
+        "mnemonic-plan-structured", STRUCTURED_PLAN_VERSION, model, params, [study_text], request
     )
-    return resp.choices[0].message.content.strip()
\ No newline at end of file
+
+
+def stream_structured_plan(client, study_text, on_section, model="gpt-4o-mini") -> dict:
+    """
+    build_structured_plan의 스트리밍 버전. 응답 조각을 받는 대로 PlanStreamParser에 넣고,
+    항목 하나가 끝날 때마다 on_section(키, 렌더링된 항목 텍스트)를 호출합니다.
+    다 받은 뒤에는 build_structured_plan과 똑같이 전체 JSON을 검사해 반환합니다.
+    LLM 응답 캐시에 있으면 호출 없이 모든 항목을 바로 통지합니다.
+    """
+    streamed = False
+
+    def _request() -> str:
+        nonlocal streamed
+        streamed = True
+        parser = PlanStreamParser()
+        stream = client.chat.completions.create(stream=True, **_structured_plan_request(study_text, model))
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                for key, value in parser.feed(delta):
+                    if key in PLAN_SCHEMA["properties"]:
+                        # 최종 검사와 같은 정리를 거쳐 완성된 가이드와 같은 텍스트를 보냄
+                        on_section(key, render_section(key, _clean_field(key, value)))
+        finally:
+            stream.close()
+        validate_plan(json.loads(parser.text))
+        return parser.text
+
+    plan = validate_plan(json.loads(_cached_structured(study_text, model, _request)))
+    if not streamed:
+        # 캐시 적중: 항목을 한꺼번에 보냄
+        for key, _ in PLAN_SECTIONS:
+            on_section(key, render_section(key, plan[key]))
+    return plan
+
@@ -1,11 +1,27 @@
 # src/compose_prompt.py
 import os
-from openai import OpenAI
+from src.core.summarizer import summarize_long_text
 from src.lyrics_extractor import get_lyrics_from_mnemonic_plan
 
 # Suno API 가사 길이 제한 (커스텀 모드)
 MAX_LYRICS_LENGTH = 5000
 
+# Suno가 callBackUrl을 필수로 요구하므로, 별도 설정이 없으면 응답을 버리는 주소를 사용
+DEFAULT_CALLBACK_URL = "https://httpbin.org/post"
+
+
+def get_callback_url() -> str:
+    """SUNO_CALLBACK_URL 환경 변수 (없으면 기본 주소)"""
+    return os.getenv("SUNO_CALLBACK_URL", DEFAULT_CALLBACK_URL)
+
+
+def callbacks_enabled() -> bool:
+    """
+    완료 통지를 실제로 받을 콜백 주소(/callbacks/suno 등)와 검증용 SUNO_CALLBACK_TOKEN이 모두 설정되었는지 여부.
+    토큰 없이는 누구나 콜백을 보낼 수 있으므로 콜백을 쓰지 않습니다.
+    """
+    return get_callback_url() != DEFAULT_CALLBACK_URL and bool(os.getenv("SUNO_CALLBACK_TOKEN"))
+
 
 def truncate_lyrics(lyrics: str, max_length: int = MAX_LYRICS_LENGTH) -> str:
     """
@@ -44,31 +60,25 @@ def summarize_for_lyrics(text: str, api_key: str, max_length: int = MAX_LYRICS_L
     if len(text) <= max_length:
         return text
     
-    client = OpenAI(api_key=api_key)
-    
-    prompt = f"""다음 학습 자료를 노래 가사로 만들 수 있도록 핵심 내용만 간결하게 요약해주세요.
+    def build_prompt(material: str) -> str:
+        return f"""다음 학습 자료를 노래 가사로 만들 수 있도록 핵심 내용만 간결하게 요약해주세요.
 요약된 내용은 {max_length}자 이하여야 하며, 노래로 부를 수 있는 자연스러운 문장으로 작성해주세요.
 중요한 정보는 빠뜨리지 말고, 반복되는 내용은 제거해주세요.
 
 [원본 내용]
-{text}
+{material}
 
 [요약된 가사]"""
 
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 학습 자료를 노래 가사로 변환하는 전문가입니다. 핵심 내용만 간결하게 요약하여 노래로 부를 수 있는 형태로 정리해줍니다."
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.5,
+        # 원문이 길면 청크별로 먼저 줄인 뒤 한 번에 요약
+        summarized = summarize_long_text(
+            text,
+            api_key,
+            build_prompt,
+            "너는 학습 자료를 노래 가사로 변환하는 전문가입니다. 핵심 내용만 간결하게 요약하여 노래로 부를 수 있는 형태로 정리해줍니다.",
             max_tokens=2000,  # 충분한 토큰 할당
         )
-        summarized = resp.choices[0].message.content.strip()
         
         # 요약 후에도 길면 잘라내기
         return truncate_lyrics(summarized, max_length)
@@ -113,7 +123,7 @@ def build_suno_payload(mnemonic_plan, study_text, final_lyrics: str = None, api_
     )
     
     # callBackUrl 설정 (환경 변수에서 가져오거나 기본값 사용)
-    callback_url = os.getenv("SUNO_CALLBACK_URL", "https://httpbin.org/post")
+    callback_url = get_callback_url()
     
     payload = {
         "customMode": True,
@@ -0,0 +1,212 @@
+"""
+보관된 오디오 파일 응답 (Range / 조건부 요청 / zero-copy 전송)
+
+브라우저의 <audio>는 재생을 시작할 때, 탐색(seek)할 때, 다시 재생할 때마다 Range 요청을 보내고,
+캐시된 파일은 If-None-Match로 다시 확인합니다. 보관함 오디오는 내용 SHA-256으로 주소를 매기므로
+바뀌지 않으며, 그 digest를 그대로 강한 ETag로 씁니다.
+
+- If-None-Match가 ETag와 맞으면 본문 없이 304
+- Range: bytes=a-b / a- / -n 하나는 206 + Content-Range, 만족할 수 없는 범위는 416
+  (여러 구간 요청은 RFC 9110이 허용하는 대로 무시하고 전체를 200으로 보냄)
+- If-Range가 ETag(또는 Last-Modified)와 다르면 Range를 무시하고 전체
+- HEAD는 헤더만
+
+본문 전송은 ASGI 서버가 지원하는 가장 가벼운 방법을 고릅니다.
+    http.response.zerocopy  열린 파일과 오프셋/길이만 넘김 → 서버가 os.sendfile (범위 응답 포함)
+    http.response.pathsend  파일 경로만 넘김 → 서버가 sendfile (전체 응답만)
+    그 외 (uvicorn 등)       파일을 mmap해 페이지 캐시를 memoryview 조각으로 바로 전송
+                             (청크마다 스레드를 오가거나 read()로 버퍼에 복사하지 않음)
+
+설정 (환경 변수):
+    AUDIO_SEND_CHUNK  mmap 전송 시 한 번에 보내는 크기 (기본 262144)
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import stat
+import threading
+from email.utils import formatdate
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+def send_chunk_size() -> int:
+    return max(4096, int(os.getenv("AUDIO_SEND_CHUNK", str(256 * 1024))))
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range 헤더 하나를 [start, end] (end 포함)로 해석합니다.
+    해석할 수 없거나 여러 구간이면 None(전체 응답), 만족할 수 없으면 ValueError.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # 마지막 n바이트
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 목록에 etag가 있는지 (약한 비교, * 포함)"""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+class AudioServeStats:
+    """/audio 응답 통계 (상태 코드별 응답 수, 전송 방식별 응답 수, 보낸 바이트)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.status: Dict[int, int] = {}
+        self.modes: Dict[str, int] = {}
+        self.bytes_sent = 0
+
+    def record(self, status: int, mode: Optional[str], sent: int) -> None:
+        with self._lock:
+            self.status[status] = self.status.get(status, 0) + 1
+            if mode is not None:
+                self.modes[mode] = self.modes.get(mode, 0) + 1
+            self.bytes_sent += sent
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "responses": {str(code): n for code, n in sorted(self.status.items())},
+                "send_modes": dict(self.modes),
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+_stats = AudioServeStats()
+
+
+def audio_serve_stats() -> Dict[str, Any]:
+    return _stats.as_dict()
+
+
+class AudioFileResponse(Response):
+    """
+    내용 해시로 주소를 매긴 (바뀌지 않는) 오디오 파일의 ASGI 응답
+
+    - path: 파일 경로
+    - digest: 내용 SHA-256 (ETag로 사용)
+    - media_type: Content-Type
+    """
+
+    def __init__(self, path: str, digest: str, media_type: str, cache_control: str) -> None:
+        # Response.__init__은 본문 길이 헤더를 미리 정하므로 부르지 않고, 추가 헤더(raw_headers)만 받음
+        self.status_code = 200
+        self.background = None
+        self.raw_headers = []
+        self.path = path
+        self.etag = f'"{digest}"'
+        self.media_type = media_type
+        self.cache_control = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._respond(scope, send)
+        if self.background is not None:
+            await self.background()
+
+    async def _respond(self, scope: Scope, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        send_body = scope.get("method", "GET") != "HEAD"
+        extensions = scope.get("extensions") or {}
+
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            await self._send_empty(send, 404, [])
+            return
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                await self._send_empty(send, 404, [])
+                return
+            size = st.st_size
+            last_modified = formatdate(st.st_mtime, usegmt=True)
+            headers = [
+                (b"etag", self.etag.encode("latin-1")),
+                (b"last-modified", last_modified.encode("latin-1")),
+                (b"cache-control", self.cache_control.encode("latin-1")),
+                (b"accept-ranges", b"bytes"),
+                *self.raw_headers,
+            ]
+
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match is not None and etag_matches(if_none_match, self.etag):
+                await self._send_empty(send, 304, headers)
+                return
+
+            byte_range: Optional[Tuple[int, int]] = None
+            range_header = request_headers.get("range")
+            if_range = request_headers.get("if-range")
+            if range_header and (if_range is None or if_range in (self.etag, last_modified)):
+                try:
+                    byte_range = parse_range(range_header, size)
+                except ValueError:
+                    await self._send_empty(send, 416, headers + [(b"content-range", f"bytes */{size}".encode())])
+                    return
+
+            start, end = byte_range if byte_range is not None else (0, size - 1)
+            length = end - start + 1 if size else 0
+            status = 206 if byte_range is not None else 200
+            headers += [
+                (b"content-type", self.media_type.encode("latin-1")),
+                (b"content-length", str(length).encode()),
+            ]
+            if byte_range is not None:
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+
+            if not send_body or length == 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                _stats.record(status, None, 0)
+                return
+            if "http.response.zerocopy" in extensions:
+                mode = "zerocopy"
+                with os.fdopen(os.dup(fd), "rb") as file:
+                    await send({"type": "http.response.zerocopy", "file": file, "offset": start, "count": length})
+            elif "http.response.pathsend" in extensions and byte_range is None:
+                mode = "pathsend"
+                await send({"type": "http.response.pathsend", "path": self.path})
+            else:
+                mode = "mmap"
+                await self._send_mmap(send, fd, start, length)
+            _stats.record(status, mode, length)
+        finally:
+            os.close(fd)
+
+    async def _send_mmap(self, send: Send, fd: int, start: int, length: int) -> None:
+        chunk = send_chunk_size()
+        # 전송 버퍼가 조각을 아직 참조하고 있을 수 있어 명시적으로 닫지 않음 (참조가 모두 사라지면 해제)
+        view = memoryview(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+        end = start + length
+        for offset in range(start, end, chunk):
+            stop = min(offset + chunk, end)
+            await send({"type": "http.response.body", "body": view[offset:stop], "more_body": stop < end})
+
+    async def _send_empty(self, send: Send, status: int, headers: list) -> None:
+        if status != 304:
+            headers = headers + [(b"content-length", b"0")]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        _stats.record(status, None, 0)
+
@@ -0,0 +1,267 @@
+"""
+LLM 응답(completion) 캐시 (선택 사용)
+
+한 반 학생들이 같은 문장을 제출하면 /mnemonic-plan이 학생마다 가사/가이드를 새로 생성합니다.
+이 캐시는 정규화한 입력 + 모델 + 프롬프트 템플릿 버전 + 샘플링 파라미터를 키로 응답 텍스트를 저장해
+반복되는 자료에는 업스트림 호출 없이 바로 답합니다.
+
+- 저장소: 프로세스 메모리(dict) 또는 로컬 SQLite 파일 (여러 워커가 공유)
+- 항목마다 TTL, 키 수가 한도를 넘으면 가장 오래 안 쓴 키부터 삭제 (LRU)
+- variety: 키마다 서로 다른 응답을 N개까지 모은 뒤 돌아가며 반환
+  (temperature가 있는 생성에서 모두 같은 노래가 나오지 않게 하면서도 N번째 요청부터는 호출 없음)
+
+설정 (환경 변수):
+    LLM_CACHE_ENABLED    1이면 사용 (기본 0)
+    LLM_CACHE_BACKEND    memory 또는 sqlite (기본 memory)
+    LLM_CACHE_PATH       SQLite 파일 위치 (기본 outputs/cache/llm.sqlite3)
+    LLM_CACHE_TTL        항목 유효 시간(초, 기본 86400, 0이면 무제한)
+    LLM_CACHE_MAX_ITEMS  보관할 최대 키 수 (기본 1000)
+    LLM_CACHE_VARIETY    키마다 모을 응답 수 (기본 1)
+"""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.core.result_cache import make_cache_key
+
+DEFAULT_LLM_CACHE_PATH = "outputs/cache/llm.sqlite3"
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFKC) 후 줄마다 공백을 하나로 줄이고 빈 줄을 없앤 텍스트"""
+    text = unicodedata.normalize("NFKC", text or "")
+    lines = (re.sub(r"\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def completion_key(
+    namespace: str,
+    template_version: str,
+    model: str,
+    params: Dict[str, Any],
+    inputs: Sequence[str],
+) -> str:
+    """캐시 키: 이름 + 템플릿 버전 + 모델 + 샘플링 파라미터 + 정규화한 입력들"""
+    return make_cache_key(
+        namespace,
+        template_version,
+        model,
+        json.dumps(params, sort_keys=True),
+        *(normalize_text(text) for text in inputs),
+    )
+
+
+class MemoryCompletionBackend:
+    """프로세스 메모리 저장소 (키 → [(저장 시각, 응답)], OrderedDict 순서가 LRU)"""
+
+    def __init__(self, max_items: int = 1000) -> None:
+        self.max_items = max_items
+        self._items: "OrderedDict[str, List[tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def variants(self, key: str, now: float, ttl: float) -> List[str]:
+        with self._lock:
+            entries = self._items.get(key)
+            if entries is None:
+                return []
+            if ttl:
+                entries[:] = [(created, value) for created, value in entries if now - created < ttl]
+                if not entries:
+                    del self._items[key]
+                    return []
+            self._items.move_to_end(key)
+            return [value for _, value in entries]
+
+    def add(self, key: str, value: str, now: float) -> None:
+        with self._lock:
+            self._items.setdefault(key, []).append((now, value))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completions_key ON completions (key, created_at);
+CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used);
+"""
+
+
+class SqliteCompletionBackend:
+    """
+    로컬 SQLite 저장소 (여러 uvicorn 워커가 같은 파일을 공유)
+    연결은 호출마다 새로 열고, WAL 모드로 동시 읽기를 허용합니다.
+    """
+
+    def __init__(self, path: Optional[Union[str, os.PathLike[str]]] = None, max_items: int = 1000) -> None:
+        self.path = pathlib.Path(path or os.getenv("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_items = max_items
+        self.evictions = 0
+        with self._session() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """커밋(예외 시 롤백) 후 연결을 닫는 컨텍스트"""
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def variants(self, key: str, now: float, ttl: float) -> List[str]:
+        with self._session() as conn:
+            if ttl:
+                conn.execute("DELETE FROM completions WHERE key = ? AND created_at <= ?", (key, now - ttl))
+            rows = conn.execute(
+                "SELECT value FROM completions WHERE key = ? ORDER BY created_at, rowid", (key,)
+            ).fetchall()
+            if rows:
+                conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        return [row[0] for row in rows]
+
+    def add(self, key: str, value: str, now: float) -> None:
+        with self._session() as conn:
+            conn.execute(
+                "INSERT INTO completions (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            keys = conn.execute("SELECT COUNT(DISTINCT key) FROM completions").fetchone()[0]
+            if keys > self.max_items:
+                # 가장 오래 안 쓴 키부터 (변형 전체를 함께) 삭제
+                stale = conn.execute(
+                    "SELECT key FROM completions GROUP BY key ORDER BY MAX(last_used) LIMIT ?",
+                    (keys - self.max_items,),
+                ).fetchall()
+                conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+                self.evictions += len(stale)
+
+    def size(self) -> int:
+        with self._session() as conn:
+            return conn.execute("SELECT COUNT(DISTINCT key) FROM completions").fetchone()[0]
+
+
+class CompletionCache:
+    """TTL/LRU와 variety 순환을 적용한 LLM 응답 캐시"""
+
+    def __init__(
+        self,
+        backend: Union[MemoryCompletionBackend, SqliteCompletionBackend],
+        ttl: float = 86400.0,
+        variety: int = 1,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.variety = max(1, variety)
+        # 키별 다음에 돌려줄 변형 번호 (프로세스마다 따로, 키 수는 백엔드 한도와 같게 제한)
+        self._rotation: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        저장된 변형이 variety개 모였으면 돌아가며 하나를 반환하고,
+        아니면 compute()로 새 응답을 만들어 변형으로 추가합니다. 빈 응답은 저장하지 않습니다.
+        """
+        now = time.time()
+        variants = self.backend.variants(key, now, self.ttl)
+        if len(variants) >= self.variety:
+            with self._lock:
+                index = self._rotation.pop(key, 0)
+                self._rotation[key] = index + 1
+                while len(self._rotation) > self.backend.max_items:
+                    self._rotation.popitem(last=False)
+                self.hits += 1
+            return variants[index % self.variety]
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        if value:
+            self.backend.add(key, value, now)
+        return value
+
+    def stats(self) -> Dict[str, Union[int, float, str]]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "keys": self.backend.size(),
+                "evictions": self.backend.evictions,
+                "variety": self.variety,
+                "ttl": self.ttl,
+            }
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE_ENABLED", "0") == "1"
+
+
+def get_completion_cache() -> CompletionCache:
+    """환경 변수 설정으로 처음 한 번 만드는 공유 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_items = int(os.getenv("LLM_CACHE_MAX_ITEMS", "1000"))
+            if os.getenv("LLM_CACHE_BACKEND", "memory").strip().lower() == "sqlite":
+                backend = SqliteCompletionBackend(max_items=max_items)
+            else:
+                backend = MemoryCompletionBackend(max_items=max_items)
+            _cache = CompletionCache(
+                backend,
+                ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+                variety=int(os.getenv("LLM_CACHE_VARIETY", "1")),
+            )
+        return _cache
+
+
+def completion_cache_stats() -> Optional[Dict[str, Union[int, float, str]]]:
+    """캐시를 쓰고 있으면 통계, 아니면 None"""
+    return _cache.stats() if _cache is not None else None
+
+
+def cached_completion(
+    namespace: str,
+    template_version: str,
+    model: str,
+    params: Dict[str, Any],
+    inputs: Sequence[str],
+    compute: Callable[[], str],
+) -> str:
+    """LLM_CACHE_ENABLED일 때만 캐시를 거쳐 compute()의 응답을 반환합니다."""
+    if not llm_cache_enabled():
+        return compute()
+    key = completion_key(namespace, template_version, model, params, inputs)
+    return get_completion_cache().get_or_compute(key, compute)
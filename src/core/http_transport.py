@@ -0,0 +1,178 @@
+"""
+공유 HTTP 전송 계층
+
+Suno/Mureka 호출과 오디오 다운로드가 요청마다 새 TCP+TLS 연결을 맺지 않도록
+프로세스 전역의 keep-alive 연결 풀을 제공합니다.
+
+- 동기: requests.Session (urllib3 연결 풀) — SunoClient, MurekaClient, save_audio_files
+- 비동기: httpx.AsyncClient — 서버 경로(SunoPoller 등)
+
+설정 (환경 변수):
+    HTTP_POOL_HOSTS        호스트별 풀을 몇 개까지 유지할지 (기본 16)
+    HTTP_POOL_MAXSIZE      호스트당 최대 연결 수 (기본 16)
+    HTTP_HOST_LIMITS       호스트별 연결 한도 재정의, 예: "api.sunoapi.org=8,cdn1.suno.ai=4"
+    HTTP_KEEPALIVE_EXPIRY  비동기 클라이언트의 유휴 연결 유지 시간(초, 기본 30)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "melody-learning/1.0 (+requests)"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_retired = {"requests": 0, "connections": 0}
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def pool_hosts() -> int:
+    return int(os.getenv("HTTP_POOL_HOSTS", "16"))
+
+
+def pool_maxsize() -> int:
+    return int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+
+
+def host_limits() -> Dict[str, int]:
+    """HTTP_HOST_LIMITS="host=n,host2=m" 형식의 호스트별 연결 한도"""
+    limits: Dict[str, int] = {}
+    for item in os.getenv("HTTP_HOST_LIMITS", "").split(","):
+        host, _, value = item.strip().partition("=")
+        if host and value.strip().isdigit():
+            limits[host.strip().lower()] = max(1, int(value))
+    return limits
+
+
+class _CountingAdapter(HTTPAdapter):
+    """
+    풀 크기를 지정한 HTTPAdapter.
+    pool_block=True로 호스트당 연결 수를 한도 안에 묶고, 풀이 교체될 때 통계를 보존합니다.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def _dispose(pool: Any) -> None:
+            _retired["requests"] += pool.num_requests
+            _retired["connections"] += pool.num_connections
+            if dispose is not None:
+                dispose(pool)
+
+        pools.dispose_func = _dispose
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    default = _CountingAdapter(pool_connections=pool_hosts(), pool_maxsize=pool_maxsize(), pool_block=True)
+    session.mount("https://", default)
+    session.mount("http://", default)
+    # 호스트별 한도: 더 긴 prefix가 우선 적용됨
+    for host, limit in host_limits().items():
+        adapter = _CountingAdapter(pool_connections=1, pool_maxsize=limit, pool_block=True)
+        session.mount(f"https://{host}", adapter)
+        session.mount(f"http://{host}", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """프로세스 전역 keep-alive 세션 (스레드 간 공유)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session() -> None:
+    """세션을 닫고 다음 호출 때 설정을 다시 읽어 새로 만듭니다."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def transport_stats() -> Dict[str, int]:
+    """
+    동기 세션의 누적 요청 수와 새로 연 연결(핸드셰이크) 수.
+    handshakes_saved = 기존 연결을 재사용한 요청 수
+    """
+    total_requests = _retired["requests"]
+    total_connections = _retired["connections"]
+    session = _session
+    if session is not None:
+        adapters = {id(a): a for a in session.adapters.values()}.values()
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total_requests += pool.num_requests
+                    total_connections += pool.num_connections
+    return {
+        "requests": total_requests,
+        "connections": total_connections,
+        "handshakes_saved": max(0, total_requests - total_connections),
+    }
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    현재 이벤트 루프용 공유 httpx.AsyncClient.
+    루프가 바뀌면(테스트, 재시작) 새 클라이언트를 만듭니다.
+    """
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=pool_hosts() * pool_maxsize(),
+                max_keepalive_connections=pool_maxsize(),
+                keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            ),
+            timeout=httpx.Timeout(45.0, connect=10.0),
+        )
+        _async_loop = loop
+        _host_semaphores.clear()
+    return _async_client
+
+
+async def async_request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    공유 비동기 클라이언트로 요청을 보냅니다.
+    httpx에는 호스트별 한도가 없어서 호스트마다 세마포어로 동시 요청 수를 제한합니다.
+    """
+    client = get_async_client()
+    host = (urlsplit(url).hostname or "").lower()
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(host_limits().get(host, pool_maxsize()))
+        _host_semaphores[host] = semaphore
+    async with semaphore:
+        return await client.request(method, url, **kwargs)
+
+
+async def aclose_async_client() -> None:
+    """서버 종료 시 비동기 클라이언트의 연결을 정리합니다."""
+    global _async_client, _async_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = None
+    _async_loop = None
+    _host_semaphores.clear()
@@ -0,0 +1,207 @@
+"""
+노래 생성 작업(Job) 저장소
+
+작업 상태를 로컬 SQLite 파일에 저장해 서버 재시작 후에도 유지되고,
+여러 uvicorn 워커가 같은 파일을 공유할 수 있도록 합니다.
+
+상태 흐름: queued → running → submitted(Suno task_id 확보) → completed / failed
+워커는 임대(lease) 방식으로 작업을 가져가며, 임대가 만료된 작업은 다른 워커가 이어받습니다.
+워커를 죽이거나 임대를 계속 잃는 작업이 Suno에 끝없이 다시 제출되지 않도록, 가져간 횟수가
+JOB_MAX_ATTEMPTS(기본 5)에 이른 작업은 다시 가져가지 않고 실패로 처리합니다.
+(종료 시 임대를 반납한 작업은 횟수에 세지 않음)
+"""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_JOB_DB_PATH = "outputs/jobs.sqlite3"
+
+# 아직 끝나지 않은 상태 (워커가 가져갈 수 있는 상태)
+ACTIVE_STATUSES = ("queued", "running", "submitted")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    study_text TEXT NOT NULL,
+    mnemonic_plan TEXT NOT NULL,
+    payload TEXT,
+    task_id TEXT,
+    result TEXT,
+    audio_urls TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_task_id ON jobs (task_id);
+"""
+
+
+class JobStore:
+    """
+    SQLite 기반 작업 저장소
+
+    연결은 호출마다 새로 열어 스레드 간 공유 문제를 피합니다.
+    WAL 모드와 busy timeout으로 여러 프로세스의 동시 접근을 허용합니다.
+    """
+
+    def __init__(self, path: Optional[str | os.PathLike[str]] = None, max_attempts: Optional[int] = None) -> None:
+        self.path = pathlib.Path(path or os.getenv("JOB_DB_PATH", DEFAULT_JOB_DB_PATH))
+        self.max_attempts = max(1, max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "5")))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._session() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """커밋(예외 시 롤백) 후 연결을 닫는 컨텍스트"""
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, study_text: str, mnemonic_plan: str) -> Dict[str, Any]:
+        """새 작업을 queued 상태로 등록합니다."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._session() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, study_text, mnemonic_plan, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, study_text, mnemonic_plan, now, now),
+            )
+        return self.get_job(job_id)  # type: ignore[return-value]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._session() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def find_by_task_id(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._session() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE task_id = ?", (task_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def claim_next(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        대기 중이거나 임대가 만료된 작업 하나를 원자적으로 가져옵니다.
+        BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡아 두 워커가 같은 작업을 가져가지 않게 합니다.
+        같은 트랜잭션에서, 이미 max_attempts번 가져갔는데 끝나지 않은 작업은 실패로 처리합니다.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            exhausted = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires = 0, updated_at = ? "
+                "WHERE status IN (?, ?, ?) AND lease_expires < ? AND attempts >= ?",
+                (
+                    f"작업을 {self.max_attempts}번 시도했지만 끝내지 못했습니다 (워커 비정상 종료 또는 임대 만료 반복).",
+                    now,
+                    *ACTIVE_STATUSES,
+                    now,
+                    self.max_attempts,
+                ),
+            ).rowcount
+            if exhausted:
+                print(f"[Job] 시도 횟수를 다 쓴 작업 {exhausted}개를 실패로 처리")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?, ?) AND lease_expires < ? "
+                "ORDER BY created_at LIMIT 1",
+                (*ACTIVE_STATUSES, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "status = CASE WHEN status = 'queued' THEN 'running' ELSE status END, updated_at = ? "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return self.get_job(row["id"])
+
+    def renew_leases(self, worker_id: str, job_ids: List[str], lease_seconds: float) -> None:
+        """워커가 처리 중인 작업들의 임대를 연장합니다."""
+        if not job_ids:
+            return
+        expires = time.time() + lease_seconds
+        with self._session() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ?",
+                [(expires, job_id, worker_id) for job_id in job_ids],
+            )
+
+    def save_payload(self, job_id: str, payload: Dict[str, Any]) -> None:
+        self._update(job_id, payload=json.dumps(payload, ensure_ascii=False))
+
+    def mark_submitted(self, job_id: str, task_id: str) -> None:
+        self._update(job_id, status="submitted", task_id=task_id)
+
+    def mark_completed(self, job_id: str, result: Dict[str, Any], audio_urls: List[str]) -> None:
+        self._update(
+            job_id,
+            status="completed",
+            result=json.dumps(result, ensure_ascii=False, default=str),
+            audio_urls=json.dumps(audio_urls),
+            error=None,
+            lease_owner=None,
+            lease_expires=0,
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._update(job_id, status="failed", error=error, lease_owner=None, lease_expires=0)
+
+    def release_leases(self, worker_id: str, job_ids: List[str]) -> None:
+        """
+        처리를 중단한 작업들을 즉시 다른 워커가 가져갈 수 있게 임대를 해제합니다 (상태는 유지).
+        작업 탓이 아닌 중단(서버 종료)이므로 이번 시도는 시도 횟수에서 뺍니다.
+        """
+        if not job_ids:
+            return
+        now = time.time()
+        with self._session() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = 0, attempts = MAX(attempts - 1, 0), "
+                "updated_at = ? WHERE id = ? AND lease_owner = ?",
+                [(now, job_id, worker_id) for job_id in job_ids],
+            )
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._session() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"]) if job["payload"] else None
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["audio_urls"] = json.loads(job["audio_urls"] or "[]")
+    return job
@@ -0,0 +1,172 @@
+"""
+노래 생성 작업 백그라운드 워커
+
+JobStore에서 작업을 임대해 가사 페이로드 구성 → Suno create_song → 완료 대기까지 진행하고,
+결과(오디오 URL)를 저장소에 기록합니다. 서버 프로세스마다 하나씩 실행되며,
+같은 SQLite 파일을 쓰는 다른 워커와 작업을 나눠 가집니다.
+
+노래 보관함이 있으면 같은 가사의 곡은 생성하지 않고 보관된 오디오 경로(/audio/{digest})로 바로 완료하며,
+새로 만든 곡은 보관함에 내려받아 두고 그 경로를 기록합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Dict, Optional
+
+from src.core.job_store import JobStore
+from src.core.mureka_utils import collect_track_audio_urls
+from src.core.song_library import SongLibrary, audio_path, song_key
+from src.core.stage_executor import run_in_stage
+from src.core.suno_poller import SunoPoller
+from src.core.workflow import prepare_suno_payload, request_suno_song_coalesced
+
+
+class JobWorker:
+    """
+    asyncio 기반 작업 워커
+
+    - poller: 완료 대기에 사용할 통합 폴러 (작업마다 스레드를 점유하지 않음)
+    - concurrency: 동시에 처리할 작업 수 (JOB_WORKER_CONCURRENCY)
+    - lease_seconds: 작업 임대 시간. 처리 중에는 주기적으로 연장됩니다 (JOB_LEASE_SECONDS)
+    - idle_interval: 새 작업이 없을 때 저장소를 다시 확인하는 주기 (JOB_IDLE_INTERVAL)
+    - library: 노래 보관함 (None이면 매번 생성)
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        poller: SunoPoller,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        idle_interval: Optional[float] = None,
+        library: Optional[SongLibrary] = None,
+    ) -> None:
+        self.store = store
+        self.poller = poller
+        self.library = library
+        self.concurrency = concurrency or int(os.getenv("JOB_WORKER_CONCURRENCY", "64"))
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.idle_interval = idle_interval or float(os.getenv("JOB_IDLE_INTERVAL", "2.0"))
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._active: Dict[str, asyncio.Task] = {}
+        self._loops: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._loops = [
+            asyncio.create_task(self._claim_loop(), name="job-claim-loop"),
+            asyncio.create_task(self._heartbeat_loop(), name="job-heartbeat-loop"),
+        ]
+
+    async def stop(self) -> None:
+        """루프와 처리 중인 작업을 취소하고, 작업 임대를 해제해 다른 워커가 이어받게 합니다."""
+        job_ids = list(self._active)
+        tasks = self._loops + list(self._active.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops = []
+        # 상태는 유지 (task_id가 있으면 재시작 후 폴링만 이어감)
+        try:
+            await run_in_stage("jobs", self.store.release_leases, self.worker_id, job_ids)
+        except Exception as exc:
+            print(f"[Job] 임대 해제 실패 (만료 후 다른 워커가 가져감): {exc}")
+
+    def notify(self) -> None:
+        """새 작업이 등록되었음을 알려 다음 확인 주기를 기다리지 않고 바로 가져가게 합니다."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim_loop(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            while len(self._active) < self.concurrency:
+                try:
+                    job = await run_in_stage("jobs", self.store.claim_next, self.worker_id, self.lease_seconds)
+                except Exception as exc:
+                    print(f"[Job] 작업 가져오기 실패: {exc}")
+                    break
+                if job is None:
+                    break
+                task = asyncio.create_task(self._process(job), name=f"job-{job['id']}")
+                self._active[job["id"]] = task
+                task.add_done_callback(lambda _t, job_id=job["id"]: self._active.pop(job_id, None))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.idle_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await run_in_stage(
+                    "jobs", self.store.renew_leases, self.worker_id, list(self._active), self.lease_seconds
+                )
+            except Exception as exc:
+                print(f"[Job] 임대 연장 실패: {exc}")
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        task_id = job["task_id"]
+        library_key = None
+        try:
+            suno_key = os.getenv("SUNO_API_KEY")
+            if not suno_key:
+                raise RuntimeError("SUNO_API_KEY가 설정되지 않았습니다.")
+
+            # 재시작 후 이어받은 작업은 저장된 페이로드를 재사용
+            payload = job["payload"]
+            if payload is None:
+                payload = await run_in_stage(
+                    "llm",
+                    prepare_suno_payload,
+                    job["study_text"],
+                    job["mnemonic_plan"],
+                    os.getenv("OPENAI_API_KEY"),
+                )
+                await run_in_stage("jobs", self.store.save_payload, job_id, payload)
+            library_key = song_key(payload) if self.library is not None else None
+
+            if not task_id:
+                entry = None
+                if self.library is not None:
+                    entry = await run_in_stage("library", self.library.lookup, library_key)
+                if entry is not None and entry["status"] == "ready":
+                    result = {"task_id": entry["task_id"], "status": "SUCCESS", "tracks": entry["tracks"]}
+                    # 저장소에는 서버 기준 경로로 두고, GET /jobs/{id}가 요청 호스트 기준 절대 URL로 바꿔 응답
+                    audio_urls = [audio_path(track["digest"]) for track in entry["tracks"]]
+                    await run_in_stage("jobs", self.store.mark_completed, job_id, result, audio_urls)
+                    return
+                if entry is not None:
+                    # 같은 곡을 생성 중인 작업의 완료를 함께 기다림
+                    task_id = entry["task_id"]
+                else:
+                    # /generate-song과 같은 키로 합쳐, 같은 곡의 동시 작업은 Suno 작업 하나를 함께 기다림
+                    created = await request_suno_song_coalesced(payload, suno_key, self.library, library_key)
+                    task_id = created["id"]
+                await run_in_stage("jobs", self.store.mark_submitted, job_id, task_id)
+
+            result = await self.poller.wait(task_id)
+            audio_urls = collect_track_audio_urls(result)
+            if self.library is not None:
+                try:
+                    tracks = await run_in_stage("library", self.library.archive, library_key, payload, result)
+                    audio_urls = [audio_path(track["digest"]) for track in tracks]
+                except Exception as exc:
+                    # 보관에 실패해도 작업은 업스트림 URL로 완료
+                    print(f"[보관함] 보관 실패 (task {task_id}): {exc}")
+                    await run_in_stage("library", self.library.forget, library_key, task_id)
+            await run_in_stage("jobs", self.store.mark_completed, job_id, result, audio_urls)
+        except Exception as exc:
+            if library_key is not None and task_id:
+                await run_in_stage("library", self.library.forget, library_key, task_id)
+            await run_in_stage("jobs", self.store.mark_failed, job_id, str(exc))
+        finally:
+            self.notify()
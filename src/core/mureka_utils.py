@@ -1,10 +1,25 @@
+import hashlib
 import os
 import pathlib
 import time
-from typing import Iterable, List, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import requests
 
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 받음
+    fcntl = None
+
+from src.core.http_transport import get_session
+
+_MB = 1024 * 1024
+
+_AUDIO_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "m4a": "audio/mp4", "aac": "audio/aac"}
+
 
 def find_audio_urls(payload: object) -> List[str]:
     """
@@ -20,34 +35,220 @@ def find_audio_urls(payload: object) -> List[str]:
     return collected
 
 
+def collect_track_audio_urls(result: dict) -> List[str]:
+    """
+    Suno 결과(poll_result 반환값)에서 트랙별 audioUrl을 모읍니다.
+    "tracks"에서 찾지 못하면 find_audio_urls로 전체 응답을 탐색합니다.
+    """
+    audio_urls: List[str] = []
+    for track in result.get("tracks") or []:
+        if isinstance(track, dict) and track.get("audioUrl"):
+            audio_urls.append(track["audioUrl"])
+    if not audio_urls:
+        audio_urls = find_audio_urls(result)
+    return audio_urls
+
+
+@dataclass
+class DownloadResult:
+    """오디오 파일 하나의 내려받기 결과"""
+    url: str
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+    seconds: float
+    resumed_bytes: int = 0  # 전에 받다 만 부분을 이어받아 다시 받지 않은 바이트 수
+
+
+def download_workers() -> int:
+    """동시에 내려받을 파일 수 (AUDIO_DOWNLOAD_WORKERS, 기본 4)"""
+    return max(1, int(os.getenv("AUDIO_DOWNLOAD_WORKERS", "4")))
+
+
+def partial_path(url: str, directory: str | os.PathLike[str]) -> pathlib.Path:
+    """
+    URL별로 고정된 받는 중 파일 경로 (다음 시도에서 이어받을 수 있게 URL 해시로 이름을 정함).
+    옆에 <해시>.validator(이어받을 때 보낼 If-Range 값)와 <해시>.lock(쓰는 중 잠금)을 둡니다.
+    """
+    return pathlib.Path(directory) / ".partial" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}.part"
+
+
+@contextmanager
+def _locked(path: pathlib.Path) -> Iterator[None]:
+    """
+    path에 배타 잠금(fcntl.flock)을 잡습니다. 같은 URL을 받는 다른 스레드/워커 프로세스는 끝날 때까지 기다립니다.
+    잠금 파일은 잡은 채로 지우므로, 기다리던 쪽은 잠금을 얻은 뒤 지워진 파일이 아닌지 확인하고 다시 엽니다.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        lock_file = open(path, "a")
+        if fcntl is None:
+            break
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+    try:
+        yield
+    finally:
+        path.unlink(missing_ok=True)
+        lock_file.close()
+
+
+def stream_download(
+    url: str,
+    part_path: str | os.PathLike[str],
+    timeout: int = 120,
+    chunk_size: int = 256 * 1024,
+    retries: Optional[int] = None,
+) -> Tuple[str, int, str, int]:
+    """
+    url을 part_path에 청크 단위로 이어 쓰며 SHA-256을 계산합니다 (파일 전체를 메모리에 올리지 않음).
+    part_path에 전에 받다 만 내용이 있으면 Range 요청으로 나머지만 받고 (서버가 206으로 응답할 때),
+    도중에 연결이 끊기면 retries번(AUDIO_DOWNLOAD_RETRIES, 기본 3)까지 끊긴 곳부터 이어받습니다.
+    이어받을 때는 처음 응답의 ETag(강한 ETag, 없으면 Last-Modified)를 If-Range로 보내,
+    그 사이 원본이 바뀌었으면 서버가 보내는 전체 응답(200)으로 처음부터 다시 받습니다.
+    검증자가 없는 응답은 이어받지 않습니다 (예전 앞부분과 새 내용이 섞일 수 있음).
+    (sha256, 크기, Content-Type, 이어받은 바이트)를 반환하며, 받은 파일은 part_path에 남습니다.
+    호출하는 쪽이 part_path를 다른 작성자와 함께 쓰지 않도록 잠가야 합니다 (download_audio 참고).
+    """
+    part = pathlib.Path(part_path)
+    part.parent.mkdir(parents=True, exist_ok=True)
+    validator_path = part.with_suffix(".validator")
+    retries = int(os.getenv("AUDIO_DOWNLOAD_RETRIES", "3")) if retries is None else retries
+    attempt = 0
+    resumed = 0
+    while True:
+        offset = part.stat().st_size if part.exists() else 0
+        validator = validator_path.read_text(encoding="utf-8") if offset and validator_path.exists() else ""
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator} if validator else {}
+        try:
+            with get_session().get(url, stream=True, timeout=timeout, headers=headers) as resp:
+                if validator and resp.status_code == 416:
+                    # 받을 나머지가 없음: 이미 끝까지 받은 파일이면 그대로, 아니면 처음부터
+                    total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                    if total.isdigit() and int(total) == offset:
+                        return (*_hash_file(part), _response_type(resp, url), offset)
+                    part.unlink()
+                    raise requests.ConnectionError(f"이어받기 범위 오류 (받은 {offset}B, 전체 {total or '?'})")
+                resp.raise_for_status()
+                digest = hashlib.sha256()
+                if validator and resp.status_code == 206:
+                    if _validator(resp) not in ("", validator):
+                        # If-Range를 무시하고 바뀐 원본의 뒷부분을 보낸 서버: 처음부터
+                        part.unlink()
+                        raise requests.ConnectionError("이어받는 동안 원본이 바뀜")
+                    _hash_into(part, digest)
+                    resumed = max(resumed, offset)
+                    mode = "ab"
+                else:
+                    offset = 0
+                    mode = "wb"
+                    validator_path.write_text(_validator(resp), encoding="utf-8")
+                size = offset
+                with open(part, mode) as out:
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            out.write(chunk)
+                            digest.update(chunk)
+                            size += len(chunk)
+                return digest.hexdigest(), size, _response_type(resp, url), resumed
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exc:
+            attempt += 1
+            if attempt > retries:
+                raise
+            print(f"[오디오] 연결 끊김, 이어받기 {attempt}/{retries} ({url}): {exc}")
+
+
+def download_audio(
+    url: str,
+    output_dir: str | os.PathLike[str] = "outputs/mureka",
+    timeout: int = 120,
+    dest_for: Optional[Callable[[str, str], pathlib.Path]] = None,
+) -> DownloadResult:
+    """
+    오디오 하나를 받는 중 파일(output_dir/.partial/)로 스트리밍한 뒤, 내용 해시 이름으로 원자적으로 옮깁니다.
+    기본 파일명은 <sha256>.<확장자>이고, dest_for(sha256, 확장자)로 바꿀 수 있습니다.
+    같은 내용의 파일이 이미 있으면 덮어써도 내용이 같으므로 병렬 작업끼리 이름이 겹쳐도 안전합니다.
+    """
+    start = time.perf_counter()
+    part = partial_path(url, output_dir)
+    # 같은 URL을 받는 다른 작업(다른 uvicorn 워커 포함)과 받는 중 파일에 번갈아 쓰지 않도록 잠금
+    with _locked(part.with_suffix(".lock")):
+        sha256, size, content_type, resumed = stream_download(url, part, timeout=timeout)
+        file_ext = _infer_extension(url, content_type)
+        dest = dest_for(sha256, file_ext) if dest_for else pathlib.Path(output_dir) / f"{sha256}.{file_ext}"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(part, dest)
+        part.with_suffix(".validator").unlink(missing_ok=True)
+    return DownloadResult(
+        url=url,
+        path=str(dest.resolve()),
+        size=size,
+        sha256=sha256,
+        content_type=content_type,
+        seconds=time.perf_counter() - start,
+        resumed_bytes=resumed,
+    )
+
+
+def download_audio_files(
+    urls: Sequence[str],
+    output_dir: str | os.PathLike[str] = "outputs/mureka",
+    timeout: int = 120,
+    max_workers: Optional[int] = None,
+    dest_for: Optional[Callable[[str, str], pathlib.Path]] = None,
+    strict: bool = False,
+) -> List[DownloadResult]:
+    """
+    여러 오디오를 최대 max_workers개(AUDIO_DOWNLOAD_WORKERS)씩 동시에 download_audio로 받고,
+    전체 처리량을 출력합니다. 결과는 urls 순서(중복 URL은 한 번)이며,
+    실패한 파일은 로그만 남기고 빠집니다 (strict면 예외).
+    """
+    # 같은 URL을 동시에 받으면 받는 중 파일이 겹치므로 한 번만
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return []
+    start = time.perf_counter()
+    workers = min(len(urls), max_workers or download_workers())
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-download") as pool:
+        futures = [pool.submit(download_audio, url, output_dir, timeout, dest_for) for url in urls]
+    results: List[DownloadResult] = []
+    for url, future in zip(urls, futures):
+        try:
+            results.append(future.result())
+        except Exception as exc:
+            if strict:
+                raise
+            print(f"[오디오] 저장 실패 ({url}): {exc}")
+
+    elapsed = time.perf_counter() - start
+    total = sum(r.size for r in results)
+    resumed = sum(r.resumed_bytes for r in results)
+    print(
+        f"[오디오] {len(results)}/{len(urls)}개 {total / _MB:.1f}MB, {elapsed:.2f}s "
+        f"({total / _MB / max(elapsed, 1e-6):.1f}MB/s, 동시 {workers}개"
+        + (f", 이어받기 {resumed / _MB:.1f}MB)" if resumed else ")")
+    )
+    return results
+
+
 def save_audio_files(
     urls: Sequence[str],
     output_dir: str | os.PathLike[str] = "outputs/mureka",
     timeout: int = 120,
+    max_workers: Optional[int] = None,
 ) -> List[str]:
     """
     Download audio files from the provided URLs and persist them to disk.
     Returns the list of file paths written.
+    (download_audio_files로 동시에 스트리밍하며, 파일명은 내용 해시)
     """
-    output_path = pathlib.Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    saved_files: List[str] = []
-    for idx, url in enumerate(urls, start=1):
-        try:
-            file_ext = _infer_extension(url)
-            timestamp = int(time.time())
-            file_name = f"audio_{timestamp}_{idx}.{file_ext}"
-            dest = output_path / file_name
-
-            resp = requests.get(url, timeout=timeout)
-            resp.raise_for_status()
-            dest.write_bytes(resp.content)
-            saved_files.append(str(dest.resolve()))
-        except Exception as exc:  # pragma: no cover - log only
-            print(f"[오디오] 저장 실패 ({url}): {exc}")
-
-    return saved_files
+    return [r.path for r in download_audio_files(urls, output_dir, timeout=timeout, max_workers=max_workers)]
 
 
 def save_mureka_audio(
@@ -92,10 +293,41 @@ def _looks_like_audio(value: object) -> bool:
     return lowered.startswith("http") and any(ext in lowered for ext in (".mp3", ".wav", ".m4a", ".aac"))
 
 
-def _infer_extension(url: str) -> str:
-    lowered = url.lower()
+def _infer_extension(url: str, content_type: str = "") -> str:
+    lowered = url.lower().split("?", 1)[0]
     for ext in ("mp3", "wav", "m4a", "aac"):
         if lowered.endswith(f".{ext}"):
             return ext
+    for ext, audio_type in _AUDIO_TYPES.items():
+        if content_type == audio_type:
+            return ext
     return "mp3"
 
+
+def _response_type(resp: requests.Response, url: str) -> str:
+    """응답의 오디오 Content-Type (없거나 오디오가 아니면 URL 확장자로 추정)"""
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type.startswith("audio/"):
+        return content_type
+    return _AUDIO_TYPES[_infer_extension(url)]
+
+
+def _validator(resp: requests.Response) -> str:
+    """If-Range로 보낼 수 있는 검증자 (강한 ETag, 없으면 Last-Modified, 둘 다 없으면 "")"""
+    etag = resp.headers.get("ETag", "")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return resp.headers.get("Last-Modified", "")
+
+
+def _hash_into(path: pathlib.Path, digest: Any, chunk_size: int = 1024 * 1024) -> None:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+
+def _hash_file(path: pathlib.Path) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    _hash_into(path, digest)
+    return digest.hexdigest(), path.stat().st_size
+
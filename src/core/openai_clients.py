@@ -0,0 +1,107 @@
+"""
+OpenAI 클라이언트 레지스트리
+
+OpenAI(api_key=...)를 호출마다 새로 만들면 그때마다 새 HTTP 연결 풀이 생겨
+매 요청이 TCP+TLS 핸드셰이크부터 다시 시작합니다.
+(API 키, base URL) 조합마다 클라이언트를 하나만 만들어 프로세스 전체에서 재사용합니다.
+스테이지 스레드에서 부르는 동기 클라이언트(get_openai_client)와 async 코드에서 직접 부르는
+비동기 클라이언트(get_async_openai_client)는 같은 키/주소/타임아웃/연결 수 설정을 씁니다.
+
+설정 (환경 변수):
+    OPENAI_BASE_URL         업스트림 주소 (로컬 대역 서버로 바꿔 테스트 가능)
+    OPENAI_TIMEOUT          요청 타임아웃(초, 기본 60)
+    OPENAI_MAX_RETRIES      SDK 자동 재시도 횟수 (기본 2)
+    OPENAI_MAX_CONNECTIONS  클라이언트당 최대 연결 수 (기본 20)
+    OPENAI_MAX_KEEPALIVE    유지할 유휴 연결 수 (기본 10)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+_sync_clients: Dict[Tuple[str, Optional[str]], OpenAI] = {}
+# httpx.AsyncClient는 이벤트 루프에 묶이므로 루프마다 따로 보관 (루프가 사라지면 함께 정리)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def openai_client_settings() -> Dict[str, Any]:
+    """현재 적용되는 연결 풀/타임아웃 설정"""
+    return {
+        "base_url": os.getenv("OPENAI_BASE_URL") or None,
+        "timeout": float(os.getenv("OPENAI_TIMEOUT", "60")),
+        "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+        "max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        "max_keepalive_connections": int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+    }
+
+
+def _limits(settings: Dict[str, Any]) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+    )
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """(api_key, base_url)별 공유 동기 클라이언트 (스레드 간 공유 가능)"""
+    settings = openai_client_settings()
+    base_url = base_url or settings["base_url"]
+    key = (api_key, base_url)
+    client = _sync_clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=settings["timeout"],
+                max_retries=settings["max_retries"],
+                http_client=httpx.Client(limits=_limits(settings), timeout=settings["timeout"]),
+            )
+            _sync_clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """(api_key, base_url)별 공유 비동기 클라이언트 (실행 중인 이벤트 루프마다 하나)"""
+    settings = openai_client_settings()
+    base_url = base_url or settings["base_url"]
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get((api_key, base_url))
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=settings["timeout"],
+            max_retries=settings["max_retries"],
+            http_client=httpx.AsyncClient(limits=_limits(settings), timeout=settings["timeout"]),
+        )
+        clients[(api_key, base_url)] = client
+    return client
+
+
+def close_openai_clients() -> None:
+    """동기 클라이언트를 닫고 레지스트리를 비웁니다 (설정 변경 후 다시 만들 때)."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_openai_clients() -> None:
+    """현재 이벤트 루프의 비동기 클라이언트를 닫습니다 (서버 종료 시)."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
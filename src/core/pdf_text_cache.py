@@ -0,0 +1,196 @@
+"""
+PDF 추출 결과 디스크 캐시
+
+같은 반 학생들이 선생님이 공유한 같은 PDF를 올릴 때마다 전체 추출을 다시 하지 않도록,
+PDF SHA-256 + 추출기 버전을 키로 페이지별 결과를 저장합니다.
+
+파일 형식 (페이지 범위만 필요할 때 전체를 읽지 않도록 mmap으로 엽니다):
+    헤더     magic(8바이트) + 페이지 수(uint32)
+    색인     페이지마다 (텍스트 오프셋 uint64, 길이 uint32, 종류 uint8)
+    본문     페이지 텍스트(UTF-8)를 이어 붙인 것
+
+페이지 종류: 0 아직 추출 안 함, 1 텍스트(추출 결과가 비어 있을 수 있음), 2 이미지 전용, 3 빈 페이지.
+분량 예산 때문에 앞쪽 페이지만 추출한 경우 나머지는 0으로 남고, 다음 요청에서 채워집니다.
+
+설정 (환경 변수):
+    PDF_CACHE_ENABLED  0이면 사용 안 함 (기본 1)
+    PDF_CACHE_DIR      저장 위치 (기본 outputs/cache/pdf-text)
+    PDF_CACHE_MB       전체 크기 한도, 넘으면 오래 안 쓴 파일부터 삭제 (기본 512)
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import struct
+import threading
+from typing import Dict, List, Optional, Union
+
+PAGE_PENDING = 0
+PAGE_TEXT = 1
+PAGE_IMAGE = 2
+PAGE_BLANK = 3
+
+_MAGIC = b"MLPDFTX1"
+_HEADER = struct.Struct("<8sI")
+_ENTRY = struct.Struct("<QIB")
+
+
+class CachedPdf:
+    """캐시 파일 하나의 읽기 전용 뷰. 색인만 읽고 텍스트는 요청한 페이지만 디코딩합니다."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"캐시 파일 형식이 아닙니다: {path}")
+            self.page_count = count
+            self._entries = [
+                _ENTRY.unpack_from(self._mm, _HEADER.size + i * _ENTRY.size) for i in range(count)
+            ]
+        except Exception:
+            self._file.close()
+            raise
+        self.kinds: List[int] = [kind for _, _, kind in self._entries]
+
+    def text(self, page: int) -> str:
+        """1부터 세는 페이지의 텍스트"""
+        offset, length, _ = self._entries[page - 1]
+        return self._mm[offset:offset + length].decode("utf-8")
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "CachedPdf":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def encode_pages(kinds: List[int], texts: Dict[int, str]) -> bytes:
+    """페이지 종류 목록과 {페이지 번호: 텍스트}를 캐시 파일 바이트로 만듭니다."""
+    encoded = [texts.get(page, "").encode("utf-8") for page in range(1, len(kinds) + 1)]
+    offset = _HEADER.size + _ENTRY.size * len(kinds)
+    out = bytearray(_HEADER.pack(_MAGIC, len(kinds)))
+    for kind, data in zip(kinds, encoded):
+        out += _ENTRY.pack(offset, len(data), kind)
+        offset += len(data)
+    for data in encoded:
+        out += data
+    return bytes(out)
+
+
+class PdfTextCache:
+    """디스크에 페이지별 추출 결과를 보관하는 크기 제한 LRU 캐시"""
+
+    def __init__(self, directory: Union[str, os.PathLike[str]], max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.pdftext"))
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.pdftext"
+
+    def open(self, key: str) -> Optional[CachedPdf]:
+        """캐시된 PDF를 열어 반환합니다. 없거나 손상됐으면 None."""
+        path = self._path(key)
+        try:
+            cached = CachedPdf(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[PDF 캐시] 손상된 파일 무시: {path.name} ({e})")
+            with self._lock:
+                self.misses += 1
+            return None
+        # 최근 사용 시각 갱신 (디스크 LRU 기준)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return cached
+
+    def write(self, key: str, kinds: List[int], texts: Dict[int, str]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = encode_pages(kinds, texts)
+        previous = path.stat().st_size if path.exists() else 0
+        # 임시 파일에 쓰고 교체 (이미 열린 mmap은 이전 파일을 계속 봄)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.writes += 1
+            self._bytes += len(data) - previous
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "disk_bytes": self._bytes,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self) -> None:
+        """한도의 90% 아래로 내려갈 때까지 오래 안 쓴 파일부터 삭제"""
+        entries = []
+        for path in self.directory.glob("*/*.pdftext"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+        with self._lock:
+            self._bytes = total
+
+
+_cache: Optional[PdfTextCache] = None
+_cache_lock = threading.Lock()
+
+
+def pdf_cache_enabled() -> bool:
+    return os.getenv("PDF_CACHE_ENABLED", "1") != "0"
+
+
+def get_pdf_text_cache() -> PdfTextCache:
+    """환경 변수 설정으로 처음 한 번 만드는 공유 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfTextCache(
+                os.getenv("PDF_CACHE_DIR", "outputs/cache/pdf-text"),
+                max_bytes=int(float(os.getenv("PDF_CACHE_MB", "512")) * 1024 * 1024),
+            )
+        return _cache
@@ -0,0 +1,210 @@
+"""
+내용 주소 기반(content-addressed) 결과 캐시
+
+같은 교과서 페이지/학습지 캡처가 반복 업로드될 때 Vision 호출을 다시 하지 않도록,
+입력 바이트의 SHA-256 + 모델 + 프롬프트 버전을 키로 결과 텍스트를 저장합니다.
+
+- 1단: 프로세스 메모리 LRU
+- 2단: 디스크 (RESULT_CACHE_DIR/<이름>/), 전체 크기가 한도를 넘으면 오래 안 쓴 파일부터 삭제
+
+설정 (환경 변수):
+    RESULT_CACHE_ENABLED       0이면 캐시 사용 안 함 (기본 1)
+    RESULT_CACHE_DIR           디스크 캐시 위치 (기본 outputs/cache)
+    RESULT_CACHE_MEMORY_ITEMS  메모리 LRU 항목 수 (기본 512)
+    RESULT_CACHE_DISK_MB       캐시별 디스크 사용 한도 (기본 256MB)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+
+def make_cache_key(*parts: Union[bytes, str]) -> str:
+    """여러 조각(바이트/문자열)을 구분자와 함께 이어 SHA-256 키를 만듭니다."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """메모리 LRU + 디스크 2단 캐시 (값은 문자열)"""
+
+    def __init__(
+        self,
+        name: str,
+        memory_items: int = 512,
+        disk_dir: Optional[Union[str, os.PathLike[str]]] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.name = name
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.disk_dir: Optional[pathlib.Path] = None
+        self._disk_bytes = 0
+        if disk_dir is not None:
+            self.disk_dir = pathlib.Path(disk_dir) / name
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*/*") if p.is_file())
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return value
+
+        path = self._path(key)
+        if path is not None:
+            try:
+                value = path.read_text(encoding="utf-8")
+            except (FileNotFoundError, OSError):
+                value = None
+            if value is not None:
+                # 최근 사용 시각 갱신 (디스크 LRU 기준)
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                with self._lock:
+                    self.hits_disk += 1
+                    self._remember(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._remember(key, value)
+
+        path = self._path(key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = value.encode("utf-8")
+        previous = path.stat().st_size if path.exists() else 0
+        # 임시 파일에 쓰고 교체해 다른 프로세스가 반쯤 쓴 파일을 읽지 않게 함
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, Union[int, float, str]]:
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            total = hits + self.misses
+            return {
+                "name": self.name,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "evictions": self.evictions,
+            }
+
+    def _path(self, key: str) -> Optional[pathlib.Path]:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / key[:2] / f"{key}.txt"
+
+    def _remember(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """디스크 사용량이 한도의 90% 아래로 내려갈 때까지 오래 안 쓴 파일부터 삭제"""
+        assert self.disk_dir is not None
+        entries = []
+        for path in self.disk_dir.glob("*/*.txt"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+
+
+def get_result_cache(name: str) -> ResultCache:
+    """이름별 공유 캐시 (환경 변수 설정으로 처음 한 번 생성)"""
+    cache = _caches.get(name)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = ResultCache(
+                name,
+                memory_items=int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "512")),
+                disk_dir=os.getenv("RESULT_CACHE_DIR", "outputs/cache"),
+                disk_max_bytes=int(float(os.getenv("RESULT_CACHE_DISK_MB", "256")) * 1024 * 1024),
+            )
+            _caches[name] = cache
+        return cache
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Union[int, float, str]]]:
+    """생성된 모든 캐시의 적중/실패 통계"""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def cached_call(name: str, key: str, compute: Callable[..., str], *args: Any, **kwargs: Any) -> str:
+    """
+    캐시에 key가 있으면 그 값을, 없으면 compute(*args, **kwargs)를 실행해 저장 후 반환합니다.
+    빈 결과는 저장하지 않습니다.
+    """
+    if not cache_enabled():
+        return compute(*args, **kwargs)
+    cache = get_result_cache(name)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    value = compute(*args, **kwargs)
+    if value:
+        cache.set(key, value)
+    return value
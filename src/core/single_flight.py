@@ -0,0 +1,204 @@
+"""
+동시에 들어온 같은 작업 합치기 (single-flight)
+
+한 반 학생 30명이 같은 학습지로 몇 초 사이에 "멜로디 생성"을 누르면 같은 Vision/가사/Suno 호출이
+30번 나갑니다. run_coalesced는 같은 내용 키로 진행 중인 호출이 있으면 새로 호출하지 않고
+그 결과를 함께 기다립니다. 캐시가 아니라서 호출이 끝나면 키는 바로 사라집니다.
+
+- 기다리는 쪽은 스레드를 점유하지 않고 이벤트 루프에서 같은 Future를 기다립니다.
+- 취소 안전: 기다리던 요청 하나가 취소(클라이언트 연결 끊김)돼도 다른 요청의 호출은 계속됩니다.
+  기다리는 요청이 모두 떠났을 때 호출이 아직 단계 풀 큐에서 대기 중이면 취소하고,
+  이미 스레드에서 실행 중이면 끝까지 실행되게 둡니다 (새 요청은 계속 합류 가능).
+  정리 함수(release)와 결과 처리(on_result)는 실제 실행기 작업이 끝난 뒤에 부릅니다.
+- 단계별로 업스트림 호출 1회가 몇 명에게 응답했는지 집계합니다.
+
+설정 (환경 변수):
+    SINGLE_FLIGHT_ENABLED  0이면 합치지 않음 (기본 1)
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+
+from src.core.stage_executor import get_stage_executor
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """진행 중인 업스트림 호출 하나와 그 결과를 기다리는 요청 수"""
+
+    __slots__ = ("work", "future", "waiters", "callers")
+
+    def __init__(self, work: "concurrent.futures.Future[Any]") -> None:
+        self.work = work  # 단계 풀에 넣은 실제 작업
+        # work가 끝나야(또는 시작 전에 취소돼야) 끝나는 이벤트 루프 쪽 Future
+        self.future = asyncio.wrap_future(work)
+        self.waiters = 0  # 지금 기다리는 요청 수
+        self.callers = 0  # 이 호출에 합류한 전체 요청 수
+
+
+class StageFlightStats:
+    """단계 하나의 합치기 통계"""
+
+    def __init__(self) -> None:
+        self.upstream_calls = 0
+        self.callers = 0
+        self.cancelled = 0
+        self.detached = 0
+        self.max_callers = 0
+        # 호출 1회가 응답한 요청 수 → 호출 횟수
+        self.callers_per_call: Counter = Counter()
+
+    def as_dict(self, in_flight: int) -> Dict[str, Any]:
+        return {
+            "upstream_calls": self.upstream_calls,
+            "callers": self.callers,
+            "coalesced": self.callers - self.upstream_calls,
+            "cancelled": self.cancelled,
+            "detached": self.detached,
+            "in_flight": in_flight,
+            "max_callers_per_call": self.max_callers,
+            "callers_per_call": {str(n): count for n, count in sorted(self.callers_per_call.items())},
+        }
+
+
+class SingleFlight:
+    """키별로 진행 중인 호출을 하나만 두는 합치기 그룹 (이벤트 루프 하나 안에서 사용)"""
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._stats: Dict[str, StageFlightStats] = {}
+
+    async def run(
+        self,
+        stage: str,
+        key: str,
+        submit: Callable[[], "concurrent.futures.Future[T]"],
+        release: Optional[Callable[[], None]] = None,
+        on_result: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        key로 진행 중인 호출이 있으면 합류하고, 없으면 submit()으로 실행기에 새 작업을 넣어 결과를 기다립니다.
+        예외도 합류한 모든 요청에 그대로 전달됩니다.
+
+        release는 이 요청이 호출에 넘긴 자원(임시 파일 등)의 정리 함수입니다. 합류한 요청은 떠날 때 바로,
+        호출을 시작한 요청은 먼저 떠나더라도 실행기 작업이 실제로 끝난 뒤에 부릅니다.
+        on_result는 호출을 시작한 요청의 결과 처리(기록 등)로, 기다리는 요청이 모두 떠났어도
+        작업이 성공하면 이벤트 루프에서 한 번 부릅니다.
+        """
+        flight_key = f"{stage}:{key}"
+        stats = self._stats.setdefault(stage, StageFlightStats())
+        flight = self._flights.get(flight_key)
+        started = flight is None
+        if started:
+            flight = _Flight(submit())
+            self._flights[flight_key] = flight
+            stats.upstream_calls += 1
+            flight.future.add_done_callback(lambda _: self._finish(stage, flight_key, flight))
+            if release is not None:
+                flight.future.add_done_callback(lambda _: release())
+            if on_result is not None:
+                flight.future.add_done_callback(lambda done: _deliver(done, on_result))
+        flight.waiters += 1
+        flight.callers += 1
+        stats.callers += 1
+
+        try:
+            # shield: 이 요청이 취소돼도 공유 호출은 취소되지 않음
+            return await asyncio.shield(flight.future)
+        finally:
+            if not started and release is not None:
+                release()
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.future.done():
+                if flight.work.cancel():
+                    # 풀 큐에서 대기 중이던 작업 → 실행하지 않음. 새 요청이 합류하지 않게 떼어냄
+                    if self._flights.get(flight_key) is flight:
+                        del self._flights[flight_key]
+                else:
+                    # 이미 실행 중 → 스레드를 멈출 수 없으므로 끝까지 실행 (결과 처리/정리는 끝난 뒤)
+                    stats.detached += 1
+
+    def _finish(self, stage: str, flight_key: str, flight: _Flight) -> None:
+        if self._flights.get(flight_key) is flight:
+            del self._flights[flight_key]
+        stats = self._stats[stage]
+        if flight.future.cancelled():
+            stats.cancelled += 1
+            return
+        # 아무도 결과를 꺼내지 않았어도 "exception was never retrieved" 경고가 나지 않게 함
+        flight.future.exception()
+        stats.callers_per_call[flight.callers] += 1
+        stats.max_callers = max(stats.max_callers, flight.callers)
+        if flight.callers > 1:
+            print(f"[합치기] {stage} 호출 1회로 {flight.callers}개 요청에 응답")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        in_flight = Counter(key.split(":", 1)[0] for key in self._flights)
+        return {stage: stats.as_dict(in_flight[stage]) for stage, stats in self._stats.items()}
+
+
+def _deliver(done: "asyncio.Future[T]", on_result: Callable[[T], None]) -> None:
+    if done.cancelled() or done.exception() is not None:
+        return
+    try:
+        on_result(done.result())
+    except Exception as exc:
+        print(f"[합치기] 결과 처리 실패: {exc}")
+
+
+_group: Optional[SingleFlight] = None
+
+
+def single_flight_enabled() -> bool:
+    return os.getenv("SINGLE_FLIGHT_ENABLED", "1") != "0"
+
+
+def get_single_flight() -> SingleFlight:
+    global _group
+    if _group is None:
+        _group = SingleFlight()
+    return _group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Union[int, Dict[str, int]]]]:
+    return get_single_flight().stats()
+
+
+async def run_coalesced(
+    stage: str,
+    key: str,
+    func: Callable[..., T],
+    *args: Any,
+    release: Optional[Callable[[], None]] = None,
+    on_result: Optional[Callable[[T], None]] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    run_in_stage와 같지만, 같은 단계에서 같은 key로 진행 중인 호출이 있으면 그 결과를 함께 받습니다.
+    key는 결과를 결정하는 입력 전체(내용 해시, 모델, API 키 등)로 만들어야 합니다.
+    release: 인자로 넘긴 자원을 더 이상 쓰지 않을 때 부를 정리 함수 (SingleFlight.run 참고)
+    on_result: 작업이 성공하면 (요청이 먼저 떠났더라도) 이벤트 루프에서 부를 결과 처리 함수
+    """
+    call = functools.partial(func, *args, **kwargs)
+    if not single_flight_enabled():
+        # 합치지 않아도 정리/결과 처리는 실제 작업이 끝난 뒤에 (시작 전이면 취소)
+        work = get_stage_executor(stage).submit(call)
+        future = asyncio.wrap_future(work)
+        if release is not None:
+            future.add_done_callback(lambda _: release())
+        if on_result is not None:
+            future.add_done_callback(lambda done: _deliver(done, on_result))
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if not future.done():
+                work.cancel()
+    return await get_single_flight().run(
+        stage, key, lambda: get_stage_executor(stage).submit(call), release=release, on_result=on_result
+    )
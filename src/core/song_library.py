@@ -0,0 +1,378 @@
+"""
+생성한 노래 보관함 (같은 가사는 다시 생성하지 않고 기존 트랙 재사용)
+
+Suno 생성은 곡마다 몇 분이 걸리고 비용도 가장 큽니다. 그런데 build_suno_payload가 만든 가사가
+같거나 공백/문장부호/구간 표시만 다른 경우에도 매번 새로 생성했습니다.
+
+보관함은 정규화한 가사의 지문(fingerprint) + 스타일 + 모델을 키로 생성 결과를 기록하고,
+트랙 오디오는 내용 해시(SHA-256)로 주소를 매기는 로컬 저장소(blob store)에 내려받아 둡니다.
+업스트림 오디오 URL이 만료돼도 /audio/{digest}로 계속 들을 수 있습니다.
+
+- ready: 오디오까지 보관된 곡 → create_song 없이 바로 반환
+- pending: 생성 요청은 보냈고 아직 완료 전인 곡 → 같은 task_id의 완료를 함께 기다림
+  (서버 재시작 등으로 pending_ttl이 지나도록 완료되지 않은 기록은 무시)
+
+설정 (환경 변수):
+    SONG_LIBRARY_ENABLED      0이면 사용 안 함 (기본 1)
+    SONG_LIBRARY_DIR          보관함 위치 (기본 outputs/library, library.sqlite3 + blobs/)
+    SONG_LIBRARY_PENDING_TTL  완료 전 기록을 재사용할 최대 시간(초, 기본 900)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.core.mureka_utils import download_audio_files, find_audio_urls
+from src.core.result_cache import make_cache_key
+from src.core.stage_executor import run_in_stage
+
+DEFAULT_SONG_LIBRARY_DIR = "outputs/library"
+
+# 정규화 규칙을 바꾸면 올려서 기존 키와 섞이지 않게 함
+SONG_FINGERPRINT_VERSION = "lyrics-fp-v1"
+
+# 메모리에 기억해 둘 blob 정보 수
+_BLOB_INFO_CACHE_SIZE = 4096
+
+# [Verse 1], (Chorus) 처럼 구간 표시만 있는 줄
+_SECTION_TAG = re.compile(r"^[\[(][^\])]*[\])]$")
+
+
+def normalize_lyrics(lyrics: str) -> str:
+    """유니코드 정규화(NFKC) + 대소문자 통일 후 구간 표시 줄, 문장부호, 중복 공백, 빈 줄을 없앤 가사"""
+    text = unicodedata.normalize("NFKC", lyrics or "").casefold()
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or _SECTION_TAG.match(line):
+            continue
+        line = " ".join(re.sub(r"[^\w\s]", " ", line).split())
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def lyrics_fingerprint(lyrics: str) -> str:
+    return hashlib.sha256(normalize_lyrics(lyrics).encode("utf-8")).hexdigest()
+
+
+def song_key(payload: Dict[str, Any]) -> str:
+    """Suno 페이로드의 보관함 키: 가사 지문 + 스타일 + 모델 (+ 반주 전용 여부)"""
+    return make_cache_key(
+        "song",
+        SONG_FINGERPRINT_VERSION,
+        lyrics_fingerprint(payload.get("prompt", "")),
+        " ".join(str(payload.get("style", "")).casefold().split()),
+        str(payload.get("model", "")),
+        str(bool(payload.get("instrumental", False))),
+    )
+
+
+def audio_path(digest: str) -> str:
+    """보관된 오디오를 제공하는 서버 경로 (/audio/{digest})"""
+    return f"/audio/{digest}"
+
+
+def audio_digest(url: str) -> Optional[str]:
+    """audio_path로 만든 경로면 digest를, 그 밖의 URL(Suno CDN 등)이면 None"""
+    prefix = audio_path("")
+    if url.startswith(prefix) and "/" not in url[len(prefix):]:
+        return url[len(prefix):] or None
+    return None
+
+
+class BlobStore:
+    """
+    내용 SHA-256으로 주소를 매기는 파일 저장소 (root/ab/abcdef...)
+    파일은 mureka_utils.download_audio_files가 root/.partial/에 받은 뒤 해시 경로로 옮겨 넣습니다.
+    """
+
+    def __init__(self, root: Union[str, os.PathLike[str]]) -> None:
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> pathlib.Path:
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    style TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    task_id TEXT,
+    tracks TEXT NOT NULL DEFAULT '[]',
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    source_url TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class SongLibrary:
+    """
+    SQLite 기록(library.sqlite3) + 오디오 blob 저장소(blobs/)
+    JobStore와 같이 연결은 호출마다 새로 열고, WAL 모드로 여러 워커가 같은 파일을 공유합니다.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, os.PathLike[str]]] = None,
+        pending_ttl: Optional[float] = None,
+        download_timeout: float = 120.0,
+    ) -> None:
+        self.root = pathlib.Path(root or os.getenv("SONG_LIBRARY_DIR", DEFAULT_SONG_LIBRARY_DIR))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.blobs = BlobStore(self.root / "blobs")
+        self.path = self.root / "library.sqlite3"
+        self.pending_ttl = pending_ttl or float(os.getenv("SONG_LIBRARY_PENDING_TTL", "900"))
+        self.download_timeout = download_timeout
+        self._lock = threading.Lock()
+        # 키별 보관 직렬화 (키 해시로 나눈 잠금 묶음)
+        self._archive_locks = [threading.Lock() for _ in range(16)]
+        # digest → blob 정보 (내용 주소라 바뀌지 않으므로 /audio 요청마다 SQLite를 읽지 않게 기억)
+        self._blob_info: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+        with self._session() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """커밋(예외 시 롤백) 후 연결을 닫는 컨텍스트"""
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        보관된 곡({"status": "ready", "task_id", "tracks"}) 또는 완료 대기 중인 곡({"status": "pending", "task_id"}).
+        ready 곡의 tracks에는 트랙마다 보관된 오디오의 digest가 들어 있습니다. 없으면 None.
+        """
+        now = time.time()
+        with self._session() as conn:
+            row = conn.execute("SELECT * FROM songs WHERE key = ?", (key,)).fetchone()
+            if row is not None and row["status"] == "ready":
+                tracks = json.loads(row["tracks"])
+                if all(self.blobs.exists(track["digest"]) for track in tracks):
+                    conn.execute("UPDATE songs SET hits = hits + 1, updated_at = ? WHERE key = ?", (now, key))
+                    self._count("hits")
+                    return {"status": "ready", "task_id": row["task_id"], "tracks": tracks}
+                # 오디오 파일이 지워진 기록은 없는 것으로 취급
+                conn.execute("DELETE FROM songs WHERE key = ?", (key,))
+            elif row is not None and row["status"] == "pending" and now - row["updated_at"] < self.pending_ttl:
+                self._count("joined")
+                return {"status": "pending", "task_id": row["task_id"]}
+        self._count("misses")
+        return None
+
+    def mark_pending(self, key: str, payload: Dict[str, Any], task_id: str) -> None:
+        """생성 요청을 보낸 곡을 기록합니다 (이미 ready인 곡은 그대로 둠)."""
+        now = time.time()
+        with self._session() as conn:
+            conn.execute(
+                "INSERT INTO songs (key, fingerprint, style, model, status, task_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = 'pending', task_id = excluded.task_id, "
+                "updated_at = excluded.updated_at WHERE songs.status != 'ready'",
+                (
+                    key,
+                    lyrics_fingerprint(payload.get("prompt", "")),
+                    str(payload.get("style", "")),
+                    str(payload.get("model", "")),
+                    task_id,
+                    now,
+                    now,
+                ),
+            )
+
+    def forget(self, key: str, task_id: str) -> None:
+        """실패한 생성 요청의 pending 기록을 지웁니다 (다른 요청이 덮어쓴 기록은 그대로 둠)."""
+        with self._session() as conn:
+            conn.execute(
+                "DELETE FROM songs WHERE key = ? AND status = 'pending' AND task_id = ?", (key, task_id)
+            )
+
+    def archive(self, key: str, payload: Dict[str, Any], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        완료된 Suno 결과의 트랙 오디오를 모두 blob 저장소에 내려받고 곡을 ready로 기록합니다.
+        트랙 하나라도 받지 못하면 예외 (기록하지 않음). 보관한 트랙 목록을 반환합니다.
+        같은 곡을 동시에 보관하려는 요청(서버 요청 + 작업 워커 등)은 하나씩 처리해 두 번 받지 않습니다.
+        """
+        with self._archive_locks[int(key[:8], 16) % len(self._archive_locks)]:
+            return self._archive(key, payload, result)
+
+    def _archive(self, key: str, payload: Dict[str, Any], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        task_id = result.get("task_id") or result.get("id")
+        with self._session() as conn:
+            row = conn.execute("SELECT status, task_id, tracks FROM songs WHERE key = ?", (key,)).fetchone()
+        if row is not None and row["status"] == "ready" and row["task_id"] == task_id:
+            # 같은 작업을 기다린 다른 요청이 이미 보관함
+            tracks = json.loads(row["tracks"])
+            if all(self.blobs.exists(track["digest"]) for track in tracks):
+                return tracks
+
+        # 트랙 오디오를 동시에 스트리밍으로 받아 blob 경로(내용 해시)로 옮김
+        source = _result_tracks(result)
+        downloads = {
+            d.url: d
+            for d in download_audio_files(
+                [track["audioUrl"] for track in source],
+                self.blobs.root,
+                timeout=self.download_timeout,
+                dest_for=lambda digest, _ext: self.blobs.path(digest),
+                strict=True,
+            )
+        }
+        tracks = []
+        for index, track in enumerate(source):
+            download = downloads[track["audioUrl"]]
+            tracks.append({
+                "id": track.get("id") or f"track-{index + 1}",
+                "title": track.get("title") or payload.get("title") or "Learning Song",
+                "audioUrl": track["audioUrl"],
+                "digest": download.sha256,
+                "size": download.size,
+                "content_type": download.content_type,
+            })
+        if not tracks:
+            raise ValueError("보관할 트랙 오디오가 없습니다.")
+
+        now = time.time()
+        with self._session() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO blobs (digest, size, content_type, source_url, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(t["digest"], t["size"], t["content_type"], t["audioUrl"], now) for t in tracks],
+            )
+            conn.execute(
+                "INSERT INTO songs (key, fingerprint, style, model, status, task_id, tracks, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'ready', ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = 'ready', task_id = excluded.task_id, "
+                "tracks = excluded.tracks, updated_at = excluded.updated_at",
+                (
+                    key,
+                    lyrics_fingerprint(payload.get("prompt", "")),
+                    str(payload.get("style", "")),
+                    str(payload.get("model", "")),
+                    task_id,
+                    json.dumps(tracks, ensure_ascii=False),
+                    now,
+                    now,
+                ),
+            )
+        print(f"[보관함] {len(tracks)}개 트랙 보관 (task {task_id})")
+        return tracks
+
+    def blob(self, digest: str) -> Optional[Dict[str, Any]]:
+        """보관된 오디오 하나의 {"path", "size", "content_type"} (없으면 None)"""
+        if not re.fullmatch(r"[0-9a-f]{64}", digest):
+            return None
+        with self._session() as conn:
+            row = conn.execute("SELECT size, content_type FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        path = self.blobs.path(digest)
+        if row is None or not path.is_file():
+            return None
+        info = {"path": str(path), "size": row["size"], "content_type": row["content_type"]}
+        with self._lock:
+            self._blob_info[digest] = info
+            if len(self._blob_info) > _BLOB_INFO_CACHE_SIZE:
+                self._blob_info.popitem(last=False)
+        return info
+
+    def cached_blob(self, digest: str) -> Optional[Dict[str, Any]]:
+        """blob()으로 한 번 찾은 오디오 정보 (I/O 없이 이벤트 루프에서 바로 호출 가능, 없으면 None)"""
+        with self._lock:
+            info = self._blob_info.get(digest)
+            if info is not None:
+                self._blob_info.move_to_end(digest)
+            return info
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._session() as conn:
+            songs = conn.execute("SELECT COUNT(*) FROM songs WHERE status = 'ready'").fetchone()[0]
+            pending = conn.execute("SELECT COUNT(*) FROM songs WHERE status = 'pending'").fetchone()[0]
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        total = self.hits + self.joined + self.misses
+        return {
+            "hits": self.hits,
+            "joined_pending": self.joined,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.joined) / total, 3) if total else 0.0,
+            "songs": songs,
+            "pending": pending,
+            "blobs": blobs,
+            "blob_bytes": size,
+        }
+
+
+def _result_tracks(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Suno 결과의 트랙 목록 (tracks가 없으면 찾은 오디오 URL마다 트랙 하나)"""
+    tracks = [t for t in result.get("tracks") or [] if isinstance(t, dict) and t.get("audioUrl")]
+    if tracks:
+        return tracks
+    return [{"audioUrl": url} for url in find_audio_urls(result)]
+
+
+def song_library_enabled() -> bool:
+    return os.getenv("SONG_LIBRARY_ENABLED", "1") != "0"
+
+
+def open_song_library() -> Optional[SongLibrary]:
+    """SONG_LIBRARY_ENABLED면 환경 변수 설정으로 보관함을 열고, 아니면 None"""
+    return SongLibrary() if song_library_enabled() else None
+
+
+async def archive_when_done(
+    library: SongLibrary,
+    poller: Any,
+    key: str,
+    payload: Dict[str, Any],
+    task_id: str,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    task_id의 완료를 (요청과 함께 또는 대신) 기다렸다가 트랙 오디오를 보관하고, 보관한 트랙 목록을 반환합니다.
+    생성이나 보관에 실패하면 pending 기록을 지워 다음 요청이 새로 생성하게 하고 None을 반환합니다.
+    """
+    try:
+        result = await poller.wait(task_id)
+        return await run_in_stage("library", library.archive, key, payload, result)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        print(f"[보관함] 보관 실패 (task {task_id}): {exc}")
+        await run_in_stage("library", library.forget, key, task_id)
+        return None
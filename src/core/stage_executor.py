@@ -0,0 +1,78 @@
+"""
+파이프라인 단계별 블로킹 호출 실행기
+
+OpenAI/Suno/PDF 호출은 동기 코드라서 async 핸들러에서 그대로 부르면 이벤트 루프 전체가 멈춥니다.
+단계(stage)마다 별도의 스레드 풀을 두고 그 안에서 실행해, 느린 업스트림 하나가
+다른 엔드포인트(/health 포함)를 막지 못하도록 합니다.
+
+단계별 동시 실행 수는 환경 변수 STAGE_LIMIT_<STAGE> (예: STAGE_LIMIT_SUNO=2)로 조정합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# 기본 단계별 동시 실행 한도
+DEFAULT_STAGE_LIMITS: Dict[str, int] = {
+    "vision": 4,  # 이미지 OCR/분석 (OpenAI Vision)
+    "pdf": 2,     # PDF 텍스트 추출 (CPU 사용량 큼)
+    "llm": 8,     # 가사/멜로디 가이드/요약 (OpenAI Chat)
+    "suno": 4,    # Suno 생성 요청 및 폴링
+    "jobs": 2,    # 작업 저장소(SQLite) 읽기/쓰기
+    "library": 4, # 노래 보관함 조회/오디오 내려받기
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def stage_limit(stage: str) -> int:
+    """단계별 동시 실행 한도 (환경 변수 > 기본값 > 4)"""
+    raw = os.getenv(f"STAGE_LIMIT_{stage.upper()}")
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return DEFAULT_STAGE_LIMITS.get(stage, 4)
+
+
+def get_stage_executor(stage: str) -> ThreadPoolExecutor:
+    """단계 전용 스레드 풀을 반환합니다. 처음 요청될 때 생성됩니다."""
+    executor = _executors.get(stage)
+    if executor is not None:
+        return executor
+    with _lock:
+        executor = _executors.get(stage)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=stage_limit(stage),
+                thread_name_prefix=f"stage-{stage}",
+            )
+            _executors[stage] = executor
+        return executor
+
+
+async def run_in_stage(stage: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    블로킹 함수를 해당 단계의 스레드 풀에서 실행하고 결과를 기다립니다.
+    한도를 넘는 호출은 스레드를 점유하지 않고 풀 큐에서 대기합니다.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(get_stage_executor(stage), call)
+
+
+def shutdown_stage_executors(wait: bool = False) -> None:
+    """서버 종료 시 모든 단계 스레드 풀을 정리합니다."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,138 @@
+"""
+긴 학습 자료용 계층(map-reduce) 요약
+
+추출한 텍스트 전체를 요약 프롬프트 하나에 넣으면 긴 PDF + 이미지 여러 장일 때
+컨텍스트 한도를 넘거나 한 번의 호출이 매우 느려집니다.
+
+1. map: 토큰 예산(SUMMARY_CHUNK_TOKENS)으로 나눈 청크를 동시에 요약
+2. 합친 요약이 아직 예산보다 길면 같은 방식으로 한 단계 더 (트리)
+3. reduce: 예산 안에 들어온 자료로 호출자가 정한 최종 프롬프트를 한 번 실행
+
+청크 요약은 청크 내용 + 모델 + 프롬프트 버전으로 결과 캐시("summary-chunk")에 저장되므로,
+일부만 바뀐 자료를 다시 올리면 바뀐 청크만 다시 요약합니다.
+
+설정 (환경 변수):
+    SUMMARY_CHUNK_TOKENS  청크 하나(와 최종 프롬프트 자료)의 최대 추정 토큰 (기본 3000)
+    SUMMARY_CONCURRENCY   청크 요약 동시 호출 수 (기본 4)
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from openai import OpenAI
+
+from src.core.openai_clients import get_openai_client
+from src.core.result_cache import cached_call, make_cache_key
+from src.core.text_budget import chunk_text, estimate_tokens
+
+# 청크 요약 프롬프트를 바꾸면 올려서 이전 캐시 결과를 무효화
+MAP_PROMPT_VERSION = "summary-map-v1"
+
+# 요약이 더 줄어들지 않을 때를 대비한 최대 단계 수
+MAX_LEVELS = 4
+
+
+def summary_chunk_tokens() -> int:
+    return int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+
+
+def summarize_chunk(chunk: str, client: OpenAI, model: str = "gpt-4o-mini") -> str:
+    """청크 하나의 핵심 정리 (청크 내용 기준 캐시)"""
+    key = make_cache_key(chunk, model, MAP_PROMPT_VERSION)
+    return cached_call("summary-chunk", key, _request_chunk_summary, chunk, client, model)
+
+
+def _request_chunk_summary(chunk: str, client: OpenAI, model: str) -> str:
+    prompt = f"""다음은 긴 학습 자료의 일부입니다.
+이 부분의 핵심 개념, 용어, 연도와 숫자, 인과 관계를 빠짐없이 간결하게 정리해주세요.
+원문에 없는 내용은 추가하지 말고, 짧은 문장으로 작성해주세요.
+
+[자료 일부]
+{chunk}
+
+[핵심 정리]"""
+    resp = client.chat.completions.create(
+        model=model,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 교육 자료 요약 전문가입니다. 긴 자료의 일부를 나중에 합쳐 쓸 수 있도록 핵심만 정리해줍니다."
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+    )
+    return resp.choices[0].message.content.strip()
+
+
+def reduce_material(
+    text: str,
+    client: OpenAI,
+    model: str = "gpt-4o-mini",
+    chunk_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> str:
+    """
+    text가 chunk_tokens 이하가 될 때까지 청크별 요약을 단계적으로 반복합니다.
+    청크 요약이 실패하면 그 청크 원문을 그대로 다음 단계로 넘깁니다.
+    """
+    chunk_tokens = chunk_tokens or summary_chunk_tokens()
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+
+    level = 0
+    while estimate_tokens(text) > chunk_tokens and level < MAX_LEVELS:
+        start = time.perf_counter()
+        chunks = chunk_text(text, chunk_tokens)
+        summaries: List[str] = []
+        workers = max(1, min(max_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-map") as pool:
+            futures = [pool.submit(summarize_chunk, chunk, client, model) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    summaries.append(future.result() or chunk)
+                except Exception as e:
+                    print(f"[요약] 청크 요약 실패, 원문 유지: {e}")
+                    summaries.append(chunk)
+        reduced = "\n\n".join(summaries)
+        level += 1
+        print(
+            f"[요약] {level}단계: 청크 {len(chunks)}개, "
+            f"{estimate_tokens(text):,} → {estimate_tokens(reduced):,}토큰 ({time.perf_counter() - start:.1f}s)"
+        )
+        if estimate_tokens(reduced) >= estimate_tokens(text):
+            break
+        text = reduced
+    return text
+
+
+def summarize_long_text(
+    text: str,
+    api_key: str,
+    build_prompt: Callable[[str], str],
+    system_prompt: str,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.5,
+    max_tokens: Optional[int] = None,
+    chunk_tokens: Optional[int] = None,
+) -> str:
+    """
+    자료를 예산 안으로 줄인 뒤(reduce_material) build_prompt(자료)로 최종 요약을 한 번 요청합니다.
+    자료가 처음부터 예산 안이면 기존처럼 호출 한 번으로 끝납니다.
+    """
+    client = get_openai_client(api_key)
+    material = reduce_material(text, client, model, chunk_tokens)
+    kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+    resp = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": build_prompt(material)},
+        ],
+        temperature=temperature,
+        **kwargs,
+    )
+    return resp.choices[0].message.content.strip()
@@ -0,0 +1,244 @@
+"""
+Suno 작업 통합 폴러
+
+곡마다 poll_result 루프(스레드 + time.sleep)를 돌리는 대신, 진행 중인 모든 task_id를
+다음 조회 시각 순의 우선순위 큐에 넣고 하나의 asyncio 루프에서 조회합니다.
+완료 결과는 Future로 대기자들에게 전달되며, 같은 task_id를 기다리는 대기자는 조회를 공유합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.compose_prompt import callbacks_enabled
+from src.suno_client import SUCCESS_STATUSES, SunoClient, poll_delay
+
+# task_id → 상태 dict (또는 응답 없음 None). 실패 상태면 예외를 발생시켜야 합니다.
+StatusChecker = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass
+class _PendingTask:
+    task_id: str
+    future: "asyncio.Future[Dict[str, Any]]"
+    deadline: float
+    attempt: int = 0
+    polls: int = 0
+    last_status: Optional[str] = None
+    # 큐에 넣은 다음 조회 시각 (poll_now로 앞당기면 예전 항목은 건너뜀)
+    due: float = 0.0
+
+
+class SunoPoller:
+    """
+    진행 중인 Suno 작업을 하나의 루프에서 조회하는 폴러
+
+    - poll_interval / max_interval: 작업별 점진적 백오프 (SunoClient.poll_result와 동일한 규칙)
+    - timeout_seconds: 작업별 최대 대기 시간
+    - max_in_flight: 한 번에 보낼 수 있는 조회 요청 수
+    """
+
+    def __init__(
+        self,
+        check_status: StatusChecker,
+        poll_interval: float = 2.5,
+        max_interval: float = 8.0,
+        timeout_seconds: float = 600.0,
+        max_in_flight: int = 8,
+    ) -> None:
+        self._check_status = check_status
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._pending: Dict[str, _PendingTask] = {}
+        self._queue: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._inflight: set[asyncio.Task] = set()
+        # 통계
+        self.polls = 0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None) -> "SunoPoller":
+        """
+        환경 변수(SUNO_API_KEY, SUNO_BASE_URL, SUNO_POLL_*)로 기본 폴러를 만듭니다.
+        SUNO_CALLBACK_URL로 완료 통지를 받는 경우 폴링은 느린 폴백 주기
+        (SUNO_CALLBACK_FALLBACK_INTERVAL, 기본 30초)로만 동작합니다.
+        """
+        client = SunoClient(api_key=api_key or os.getenv("SUNO_API_KEY", ""), verbose=False)
+
+        if callbacks_enabled():
+            poll_interval = max_interval = float(os.getenv("SUNO_CALLBACK_FALLBACK_INTERVAL", "30"))
+        else:
+            poll_interval = float(os.getenv("SUNO_POLL_INTERVAL", str(client.poll_interval)))
+            max_interval = float(os.getenv("SUNO_POLL_MAX_INTERVAL", "8.0"))
+
+        return cls(
+            client.acheck_status,
+            poll_interval=poll_interval,
+            max_interval=max_interval,
+            timeout_seconds=float(os.getenv("SUNO_POLL_TIMEOUT", str(client.timeout_seconds))),
+            max_in_flight=int(os.getenv("SUNO_POLL_MAX_IN_FLIGHT", "8")),
+        )
+
+    async def wait(self, task_id: str) -> Dict[str, Any]:
+        """
+        task_id가 완료될 때까지 기다려 결과({"task_id", "status", "tracks"})를 반환합니다.
+        대기자가 취소되어도 조회는 계속되어 다른 대기자에게 결과가 전달됩니다.
+        """
+        entry = self.track(task_id)
+        return await asyncio.shield(entry.future)
+
+    def track(self, task_id: str) -> _PendingTask:
+        """task_id를 조회 대상에 등록합니다 (이미 등록되어 있으면 기존 항목 반환)."""
+        entry = self._pending.get(task_id)
+        if entry is not None:
+            return entry
+        loop = asyncio.get_running_loop()
+        entry = _PendingTask(
+            task_id=task_id,
+            future=loop.create_future(),
+            deadline=time.monotonic() + self.timeout_seconds,
+        )
+        self._pending[task_id] = entry
+        # 제출 직후에는 아직 결과가 없으므로 첫 조회는 한 주기 뒤에
+        self._schedule(entry, time.monotonic() + self.poll_interval)
+        self._ensure_running()
+        return entry
+
+    def resolve(self, task_id: str, result: Dict[str, Any]) -> bool:
+        """외부에서 받은 완료 결과로 대기자를 깨웁니다. 대기 중인 작업이었으면 True."""
+        entry = self._pending.pop(task_id, None)
+        if entry is None or entry.future.done():
+            return False
+        entry.future.set_result(result)
+        self.completed += 1
+        return True
+
+    def reject(self, task_id: str, exc: BaseException) -> bool:
+        """외부에서 받은 실패 통지로 대기자에게 예외를 전달합니다. 대기 중인 작업이었으면 True."""
+        entry = self._pending.pop(task_id, None)
+        if entry is None or entry.future.done():
+            return False
+        entry.future.set_exception(exc)
+        self.failed += 1
+        # 대기자가 없는 작업의 예외가 "never retrieved" 경고로 남지 않도록
+        entry.future.exception()
+        return True
+
+    def poll_now(self, task_id: str) -> bool:
+        """
+        다음 조회를 기다리지 않고 바로 조회합니다 (완료 콜백을 받았을 때).
+        결과는 콜백 본문이 아니라 record-info 조회로 확인합니다. 대기 중인 작업이었으면 True.
+        """
+        entry = self._pending.get(task_id)
+        if entry is None or entry.future.done():
+            return False
+        self._schedule(entry, time.monotonic())
+        self._wakeup.set()
+        return True
+
+    def is_pending(self, task_id: str) -> bool:
+        return task_id in self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "pending": len(self._pending),
+            "polls": self.polls,
+            "completed": self.completed,
+            "failed": self.failed,
+            "polls_per_song": round(self.polls / finished, 2) if finished else None,
+        }
+
+    async def close(self) -> None:
+        tasks = list(self._inflight)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        for entry in self._pending.values():
+            if not entry.future.done():
+                entry.future.cancel()
+        self._pending.clear()
+        self._queue.clear()
+
+    def _ensure_running(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run(), name="suno-poller")
+        self._wakeup.set()
+
+    def _schedule(self, entry: _PendingTask, due: float) -> None:
+        entry.due = due
+        heapq.heappush(self._queue, (due, next(self._seq), entry.task_id))
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._queue:
+                await self._wakeup.wait()
+                continue
+
+            due, _, task_id = self._queue[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                # 새 작업이 더 이른 시각으로 등록되면 깨어나 다시 계산
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            entry = self._pending.get(task_id)
+            if entry is None or entry.future.done() or due != entry.due:
+                continue
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._poll_once(entry))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _poll_once(self, entry: _PendingTask) -> None:
+        try:
+            entry.attempt += 1
+            entry.polls += 1
+            self.polls += 1
+            try:
+                state = await self._check_status(entry.task_id)
+            except Exception as exc:
+                self.reject(entry.task_id, exc)
+                return
+
+            if state is not None:
+                entry.last_status = state.get("status") or entry.last_status
+                if state.get("status") in SUCCESS_STATUSES and state.get("tracks"):
+                    self.resolve(entry.task_id, state)
+                    return
+
+            if entry.future.done():
+                return
+            now = time.monotonic()
+            if now >= entry.deadline:
+                self.reject(
+                    entry.task_id,
+                    TimeoutError(
+                        f"Suno 생성 대기 시간 초과 (마지막 status={entry.last_status}, task_id={entry.task_id})"
+                    ),
+                )
+                return
+            next_due = now + poll_delay(self.poll_interval, entry.attempt + 1, self.max_interval)
+            self._schedule(entry, min(next_due, entry.deadline))
+            self._wakeup.set()
+        finally:
+            self._semaphore.release()
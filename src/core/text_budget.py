@@ -0,0 +1,75 @@
+"""
+토큰 예산 계산과 텍스트 분할 (토크나이저 없이 쓰는 근사치)
+
+PDF 분량 예산, 요약 청크 크기처럼 "대략 몇 토큰인지"만 알면 되는 곳에서 씁니다.
+"""
+import hashlib
+from typing import List
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 대략적인 토큰 수.
+    영문/숫자는 약 4글자당 1토큰, 한글 등 비ASCII 문자는 글자당 약 1토큰으로 셉니다.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    """줄 하나가 예산보다 길 때 글자 단위로 자릅니다."""
+    pieces, start, cost = [], 0, 0.0
+    for i, ch in enumerate(text):
+        cost += 0.25 if ord(ch) < 128 else 1.0
+        if cost > max_tokens:
+            pieces.append(text[start:i])
+            start, cost = i, (0.25 if ord(ch) < 128 else 1.0)
+    pieces.append(text[start:])
+    return [p for p in pieces if p]
+
+
+def _is_boundary(unit: str) -> bool:
+    """문단 해시의 첫 바이트가 4의 배수이면 경계 후보 (평균 4문단마다 하나)"""
+    return hashlib.blake2b(unit.encode("utf-8"), digest_size=1).digest()[0] % 4 == 0
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    텍스트를 max_tokens 이하의 청크로 나눕니다.
+    문단(빈 줄) 경계를 우선 지키고, 문단이 너무 길면 줄 단위, 줄도 길면 글자 단위로 자릅니다.
+
+    청크 경계는 내용으로 정합니다: 예산의 절반을 넘긴 뒤 해시가 특정 값인 문단에서 끊습니다.
+    앞쪽에 문단이 추가/수정돼도 그 뒤 경계는 다시 같은 자리로 맞춰지므로,
+    청크 내용으로 만든 캐시 키가 바뀐 부분 근처에서만 달라집니다.
+    """
+    units: List[str] = []
+    for paragraph in text.split("\n\n"):
+        if not paragraph.strip():
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            if not line.strip():
+                continue
+            if estimate_tokens(line) <= max_tokens:
+                units.append(line)
+            else:
+                units.extend(_hard_split(line, max_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+        if current_tokens >= max_tokens // 2 and _is_boundary(unit):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,262 @@
+"""
+업로드 파일 스풀링 (파일 전체를 메모리에 올리지 않고 임시 파일로 받기)
+
+UploadFile.read()로 파일을 통째로 읽으면 요청마다 파일 크기만큼(이미지는 base64 사본까지)
+메모리가 늘어나, 큰 파일이 동시에 올라오면 RSS가 몇 배로 커집니다.
+
+spool_upload는 업로드를 청크 단위로 임시 파일에 옮기면서 SHA-256을 같이 계산하고,
+크기 한도를 넘는 순간 읽기를 멈춥니다. 처리 코드는 SpooledUpload.buffer()로
+임시 파일을 mmap한 읽기 전용 버퍼를 받아, 필요한 부분만 페이지 단위로 읽습니다.
+
+설정 (환경 변수):
+    UPLOAD_SPOOL_DIR     임시 파일 위치 (기본 시스템 임시 디렉터리)
+    UPLOAD_CHUNK_KB      한 번에 옮기는 크기 (기본 1024)
+    UPLOAD_MAX_PDF_MB    PDF 하나 최대 크기 (기본 50)
+    UPLOAD_MAX_IMAGE_MB  이미지 하나 최대 크기 (기본 20)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+from typing import Any, AsyncIterator, BinaryIO, List, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+_MB = 1024 * 1024
+
+
+def upload_limit_bytes(kind: str) -> int:
+    """kind("pdf" / "image")별 파일 하나 최대 크기"""
+    if kind == "pdf":
+        return int(float(os.getenv("UPLOAD_MAX_PDF_MB", "50")) * _MB)
+    return int(float(os.getenv("UPLOAD_MAX_IMAGE_MB", "20")) * _MB)
+
+
+class UploadTooLarge(ValueError):
+    """업로드 파일이 크기 한도를 넘음"""
+
+    def __init__(self, filename: str, limit: int) -> None:
+        super().__init__(f"파일이 너무 큽니다: {filename} (최대 {round(limit / _MB, 2):g}MB)")
+        self.filename = filename
+        self.limit = limit
+
+
+class BufferReader(io.RawIOBase):
+    """bytes/mmap/memoryview를 복사하지 않고 읽는 파일 객체 (읽을 때마다 필요한 만큼만 복사)"""
+
+    def __init__(self, data: Buffer) -> None:
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def open_buffer(data: Buffer) -> BinaryIO:
+    """버퍼를 읽는 새 파일 객체 (bytes는 BytesIO가 복사 없이 공유하므로 그대로 사용)"""
+    if isinstance(data, bytes):
+        return io.BytesIO(data)
+    return io.BufferedReader(BufferReader(data))
+
+
+class SpooledUpload:
+    """임시 파일로 받은 업로드 하나. close하면 임시 파일을 지웁니다."""
+
+    def __init__(self, filename: str, content_type: Optional[str], path: str, size: int, sha256: str) -> None:
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    def buffer(self) -> Buffer:
+        """임시 파일 내용을 mmap한 읽기 전용 버퍼 (빈 파일이면 b"")"""
+        if self.size == 0:
+            return b""
+        if self._mmap is None:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 아직 누가 버퍼를 참조 중이면 파일 객체가 정리될 때 함께 해제됨
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+async def spool_upload(
+    upload: Any,
+    max_bytes: int,
+    chunk_size: Optional[int] = None,
+    directory: Optional[str] = None,
+) -> SpooledUpload:
+    """
+    UploadFile을 청크 단위로 임시 파일에 옮기며 SHA-256을 계산합니다.
+    크기를 미리 알 수 있으면 읽기 전에, 아니면 읽는 도중 max_bytes를 넘는 순간 UploadTooLarge.
+    """
+    filename = upload.filename or "upload"
+    size_hint = getattr(upload, "size", None)
+    if size_hint is not None and size_hint > max_bytes:
+        raise UploadTooLarge(filename, max_bytes)
+    chunk_size = chunk_size or int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    return await spool_stream(
+        _chunks(), filename, getattr(upload, "content_type", None), max_bytes, directory=directory
+    )
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    content_type: Optional[str],
+    max_bytes: int,
+    directory: Optional[str] = None,
+) -> SpooledUpload:
+    """
+    비동기 청크 스트림(예: Request.stream())을 임시 파일에 옮기며 SHA-256을 계산합니다.
+    요청 본문을 직접 받으면 max_bytes를 넘는 순간 나머지 본문은 받지 않습니다.
+    """
+    directory = directory or os.getenv("UPLOAD_SPOOL_DIR") or None
+    suffix = os.path.splitext(filename)[1][:16]
+
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(filename, max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        raise
+    return SpooledUpload(filename, content_type, path, size, digest.hexdigest())
+
+
+def current_rss() -> int:
+    """현재 프로세스 RSS(바이트). /proc이 없으면 지금까지의 최고치(ru_maxrss)로 대신합니다."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            import sys
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+        except Exception:
+            return 0
+
+
+class MemoryProbe:
+    """
+    요청을 처리하는 동안 RSS를 주기적으로 재서 최고치를 기록합니다.
+    무거운 작업은 스테이지 스레드에서 돌아 이벤트 루프가 비어 있으므로 샘플링이 계속됩니다.
+    프로세스 전체 RSS라 동시에 처리 중인 다른 요청의 몫도 섞인 추정치입니다.
+    """
+
+    def __init__(self, interval: float = 0.02) -> None:
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self.marks: List[Tuple[str, int]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._start = 0.0
+
+    def sample(self, label: Optional[str] = None) -> int:
+        rss = current_rss()
+        self.peak = max(self.peak, rss)
+        if label:
+            self.marks.append((label, rss))
+        return rss
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> "MemoryProbe":
+        self._start = time.perf_counter()
+        self.baseline = self.peak = current_rss()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.sample()
+
+    def summary(self) -> str:
+        marks = ", ".join(f"{label} {rss / _MB:.0f}MB" for label, rss in self.marks)
+        text = (
+            f"RSS {self.baseline / _MB:.0f}MB → 최고 {self.peak / _MB:.0f}MB "
+            f"(+{(self.peak - self.baseline) / _MB:.1f}MB, {time.perf_counter() - self._start:.1f}s)"
+        )
+        return f"{text} [{marks}]" if marks else text
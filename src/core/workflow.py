@@ -1,19 +1,24 @@
 from __future__ import annotations
 
 import base64
+import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from openai import OpenAI
+from typing import Any, Callable, Dict, Optional, Tuple
 
 # 프로젝트 루트를 Python 경로에 추가
 project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from src.agents import build_mnemonic_plan
+from src.agents import build_mnemonic_plan, build_structured_plan, render_plan, stream_structured_plan
 from src.compose_prompt import build_suno_payload
+from src.core.openai_clients import get_openai_client
+from src.core.result_cache import make_cache_key
+from src.core.single_flight import run_coalesced
+from src.core.song_library import SongLibrary
 from src.suno_client import SunoClient
 from src.vision_to_query import image_bytes_to_study_text
 from src.lyrics_generator import generate_lyrics
@@ -48,10 +53,81 @@ def create_mnemonic_plan(
     final_lyrics: str = None,
     model: str = "gpt-4o-mini",
 ) -> str:
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     return build_mnemonic_plan(client, study_text, final_lyrics=final_lyrics, model=model)
 
 
+def mnemonic_plan_mode() -> str:
+    """MNEMONIC_PLAN_MODE: structured(가사+가이드 한 번에, 기본) 또는 two-call(가사 → 가이드 순서로 두 번)"""
+    return os.getenv("MNEMONIC_PLAN_MODE", "structured").strip().lower()
+
+
+def create_lyrics_and_plan(
+    study_text: str,
+    api_key: str,
+    model: str = "gpt-4o-mini",
+) -> Tuple[str, str]:
+    """
+    (멜로디 가이드, 최종 가사)를 만듭니다.
+    structured 모드는 JSON 스키마 응답 한 번으로 둘 다 받고, 호출이나 검사에 실패하면
+    기존 두 번 호출(generate_lyrics → create_mnemonic_plan)로 대체합니다.
+    """
+    if mnemonic_plan_mode() == "structured":
+        start = time.perf_counter()
+        try:
+            plan = build_structured_plan(get_openai_client(api_key), study_text, model=model)
+            print(f"[가이드] 구조화 호출 1회 ({time.perf_counter() - start:.1f}s)")
+            return render_plan(plan), "\n".join(plan["lyrics"])
+        except Exception as e:
+            print(f"[가이드] 구조화 호출 실패, 두 번 호출로 대체: {e}")
+    return _two_call_lyrics_and_plan(study_text, api_key, model)
+
+
+def _two_call_lyrics_and_plan(study_text: str, api_key: str, model: str) -> Tuple[str, str]:
+    final_lyrics = generate_lyrics(study_text, api_key, model=model)
+    plan_text = create_mnemonic_plan(study_text, api_key, final_lyrics=final_lyrics, model=model)
+    return plan_text, final_lyrics
+
+
+class PlanStreamCancelled(Exception):
+    """스트리밍 중 클라이언트가 연결을 끊음 (대체 경로로 넘어가지 않고 바로 중단)"""
+
+
+def stream_lyrics_and_plan(
+    study_text: str,
+    api_key: str,
+    on_section: Callable[[str, str], None],
+    model: str = "gpt-4o-mini",
+    on_reset: Optional[Callable[[], None]] = None,
+) -> Tuple[str, str]:
+    """
+    create_lyrics_and_plan의 스트리밍 버전. 구조화 응답을 스트리밍으로 받으며 항목이 끝날 때마다
+    on_section(키, 항목 텍스트)를 호출하고, 결과는 create_lyrics_and_plan과 같은 (가이드, 가사)입니다.
+    two-call 모드이거나 스트리밍이 실패하면 두 번 호출 결과를 그대로 반환합니다 (항목 통지 없음).
+    실패 전에 이미 통지한 항목은 최종 결과와 다르므로, 대체하기 전에 on_reset()으로 버리게 합니다.
+    """
+    if mnemonic_plan_mode() == "structured":
+        start = time.perf_counter()
+        sent = False
+
+        def _on_section(key: str, text: str) -> None:
+            nonlocal sent
+            on_section(key, text)
+            sent = True
+
+        try:
+            plan = stream_structured_plan(get_openai_client(api_key), study_text, _on_section, model=model)
+            print(f"[가이드] 구조화 스트리밍 1회 ({time.perf_counter() - start:.1f}s)")
+            return render_plan(plan), "\n".join(plan["lyrics"])
+        except PlanStreamCancelled:
+            raise
+        except Exception as e:
+            print(f"[가이드] 구조화 스트리밍 실패, 두 번 호출로 대체: {e}")
+            if sent and on_reset is not None:
+                on_reset()
+    return _two_call_lyrics_and_plan(study_text, api_key, model)
+
+
 def build_suno_request(study_text: str, mnemonic_plan: str, final_lyrics: str = None, api_key: Optional[str] = None) -> Dict[str, Any]:
     # 최종 가사가 제공되면 그걸 사용, 없으면 멜로디 가이드에서 추출
     if not final_lyrics:
@@ -62,6 +138,23 @@ def build_suno_request(study_text: str, mnemonic_plan: str, final_lyrics: str =
     return build_suno_payload(mnemonic_plan, study_text, final_lyrics=final_lyrics, api_key=api_key)
 
 
+def prepare_suno_payload(
+    study_text: str,
+    mnemonic_plan: str,
+    openai_key: Optional[str] = None,
+    final_lyrics: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    멜로디 가이드에서 최종 가사를 꺼내 Suno 요청 페이로드를 만듭니다.
+    final_lyrics(구조화 응답의 가사)를 주면 추출을 건너뜁니다.
+    가사 추출에 실패하면 OpenAI 키가 있을 때 가사를 다시 생성합니다.
+    """
+    final_lyrics = final_lyrics or extract_final_lyrics(mnemonic_plan)
+    if not final_lyrics and openai_key:
+        final_lyrics = generate_lyrics(study_text, openai_key)
+    return build_suno_request(study_text, mnemonic_plan, final_lyrics=final_lyrics, api_key=openai_key)
+
+
 def request_suno_song(
     payload: Dict[str, Any],
     api_key: str,
@@ -75,6 +168,34 @@ def request_suno_song(
     return {"id": task_id}
 
 
+def create_song_recorded(
+    payload: Dict[str, Any], api_key: str, library: Optional[SongLibrary] = None, library_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Suno 생성 요청을 보내고 (보관함 사용 시) 같은 스레드에서 바로 pending으로 기록"""
+    result = request_suno_song(payload, api_key, wait=False)
+    if library is not None:
+        library.mark_pending(library_key, payload, result["id"])
+    return result
+
+
+async def request_suno_song_coalesced(
+    payload: Dict[str, Any],
+    api_key: str,
+    library: Optional[SongLibrary] = None,
+    library_key: Optional[str] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    create_song_recorded를 "suno" 단계에서 실행하되, 같은 (API 키, 페이로드)로 진행 중인 생성 요청이 있으면
+    새로 만들지 않고 그 결과({"id": task_id})를 함께 받습니다 (/generate-song과 작업 워커가 같은 키를 씀).
+    요청이 모두 끊겨도 이미 만든 Suno 작업은 pending 기록이 남고, on_result는 작업이 끝난 뒤 불립니다.
+    """
+    key = make_cache_key("generate-song", api_key, json.dumps(payload, sort_keys=True, ensure_ascii=False))
+    return await run_coalesced(
+        "suno", key, create_song_recorded, payload, api_key, library, library_key, on_result=on_result
+    )
+
+
 def run_full_pipeline(
     image_bytes: bytes,
     openai_key: str,
@@ -3,22 +3,64 @@
 텍스트 이미지, 수식 이미지, 지도 이미지 등을 분석하여 학습용 내용을 생성
 """
 import base64
-from typing import Dict, List, Optional
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
 from openai import OpenAI
 
+from src.core.openai_clients import get_openai_client
+from src.core.result_cache import cached_call, make_cache_key
+from src.core.summarizer import summarize_long_text
+from src.image_dedup import dedup_enabled, get_recent_index, group_near_duplicates
+
+# 프롬프트를 바꾸면 올려서 이전 캐시 결과를 무효화
+ANALYSIS_PROMPT_VERSION = "edu-analysis-v1"
+
 
 def analyze_image_for_education(
     image_b64: str,
     client: OpenAI,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    mime_type: str = "image/png",
 ) -> str:
     """
     이미지를 교육용 관점에서 분석하여 학습용 텍스트를 생성합니다.
     - 텍스트가 포함된 이미지: 텍스트 추출
     - 수식 이미지: 수식을 설명하고 음으로 표현할 수 있는 방식으로 변환
     - 지도 이미지: 관련 역사/지리 정보를 요약하여 가사로 만들 수 있는 내용 생성
+
+    같은 이미지(바이트 기준) + 모델 + 프롬프트 버전이면 캐시된 결과를 반환합니다.
     """
-    
+    key = make_cache_key(base64.b64decode(image_b64), model, ANALYSIS_PROMPT_VERSION)
+    return cached_call("image-analysis", key, _request_image_analysis, image_b64, client, model, mime_type)
+
+
+def analyze_image_with_dedup(
+    image_b64: str,
+    client: OpenAI,
+    model: str = "gpt-4o-mini",
+    mime_type: str = "image/png",
+    image_hash: Optional[int] = None,
+) -> str:
+    """
+    최근에 분석한 이미지 중 지각 해시가 가까운 것이 있으면 그 분석 결과를 재사용하고,
+    없으면 analyze_image_for_education으로 분석한 뒤 색인에 기록합니다.
+    """
+    if image_hash is None or not dedup_enabled():
+        return analyze_image_for_education(image_b64, client, model, mime_type)
+    index = get_recent_index(f"image-analysis:{model}:{ANALYSIS_PROMPT_VERSION}")
+    reused = index.find(image_hash)
+    if reused is not None:
+        return reused
+    text = analyze_image_for_education(image_b64, client, model, mime_type)
+    if text:
+        index.add(image_hash, text)
+    return text
+
+
+def _request_image_analysis(image_b64: str, client: OpenAI, model: str, mime_type: str) -> str:
+    """Vision API로 교육용 분석을 요청합니다 (캐시 미스일 때만 호출)."""
     prompt = """이 이미지를 교육용 학습 자료로 분석해주세요.
 
 이미지 타입에 따라 다음과 같이 처리해주세요:
@@ -52,7 +94,7 @@ def analyze_image_for_education(
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64}"}},
+                        {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_b64}"}},
                     ],
                 },
             ],
@@ -63,52 +105,109 @@ def analyze_image_for_education(
         raise RuntimeError(f"이미지 분석 실패: {str(e)}")
 
 
+def _result_within(future: Future, started_at: Callable[[], Optional[float]], timeout: float) -> str:
+    """
+    실행을 시작한 뒤 timeout초 안에 끝난 결과를 반환합니다. 넘으면 TimeoutError.
+    풀 대기열에서 차례를 기다리는 시간은 세지 않습니다.
+    """
+    while True:
+        begun = started_at()
+        wait = 0.05 if begun is None else max(0.0, begun + timeout - time.monotonic())
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeoutError:
+            if begun is not None:
+                raise TimeoutError(f"{timeout:.0f}초 안에 분석이 끝나지 않음") from None
+
+
 def analyze_multiple_images(
     image_b64_list: List[str],
     api_key: str,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    max_concurrency: Optional[int] = None,
+    image_timeout: Optional[float] = None,
+    mime_types: Optional[List[str]] = None,
+    image_hashes: Optional[List[Optional[int]]] = None,
 ) -> str:
     """
     여러 이미지를 분석하고 종합하여 학습용 텍스트를 생성합니다.
+
+    이미지별 분석은 동시에 실행되며 (최대 max_concurrency개, 기본 IMAGE_ANALYSIS_CONCURRENCY=5),
+    각 이미지는 분석을 시작한 뒤 image_timeout초(기본 IMAGE_ANALYSIS_TIMEOUT=60) 안에 끝나야 하며,
+    넘으면 그 이미지만 분석 실패로 처리하고 나머지 결과로 진행합니다 (SDK 재시도 없이 한 번만 요청).
+    한 이미지가 실패해도 나머지 결과는 그대로 사용하고, [이미지 i] 순서는 업로드 순서를 따릅니다.
+    mime_types를 주면 이미지별 data URL에 실제 형식을 표시합니다 (기본 image/png).
+    image_hashes(지각 해시)를 주면 거의 같은 이미지는 한 번만 분석하고,
+    최근 요청에서 분석한 이미지와 같으면 그 결과를 재사용합니다.
     """
-    client = OpenAI(api_key=api_key)
-    
-    # 각 이미지 분석
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("IMAGE_ANALYSIS_CONCURRENCY", "5"))
+    if image_timeout is None:
+        image_timeout = float(os.getenv("IMAGE_ANALYSIS_TIMEOUT", "60"))
+
+    client = get_openai_client(api_key)
+    # 이미지별 타임아웃이 적용된 클라이언트 사본 (연결 풀은 공유)
+    # 재시도하면 요청마다 타임아웃이 다시 시작되므로 재시도하지 않음 (전체 시간은 아래 기한으로 제한)
+    timed_client = client.with_options(timeout=image_timeout, max_retries=0)
+
+    # 각 이미지 분석 (동시 실행, 결과는 입력 순서대로 수집)
+    if mime_types is None:
+        mime_types = ["image/png"] * len(image_b64_list)
+    if image_hashes is None or not dedup_enabled():
+        image_hashes = [None] * len(image_b64_list)
+    # 거의 같은 이미지는 앞쪽 대표 이미지 하나만 분석
+    representatives = group_near_duplicates(image_hashes)
+    unique = [i for i, rep in enumerate(representatives) if rep == i]
+    if len(unique) < len(image_b64_list):
+        print(f"[이미지] 유사 이미지 {len(image_b64_list) - len(unique)}장은 분석 생략")
+
     analyzed_texts = []
-    for i, image_b64 in enumerate(image_b64_list, 1):
-        try:
-            text = analyze_image_for_education(image_b64, client, model)
-            analyzed_texts.append(f"[이미지 {i}]\n{text}")
-        except Exception as e:
-            analyzed_texts.append(f"[이미지 {i}] 분석 실패: {str(e)}")
+    workers = max(1, min(max_concurrency, len(unique)))
+    started: Dict[int, float] = {}
+
+    def analyze(i: int) -> str:
+        started[i] = time.monotonic()
+        return analyze_image_with_dedup(image_b64_list[i], timed_client, model, mime_types[i], image_hashes[i])
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-analysis")
+    try:
+        futures = {i: pool.submit(analyze, i) for i in unique}
+        for i, rep in enumerate(representatives):
+            if rep != i:
+                analyzed_texts.append(f"[이미지 {i + 1}] (이미지 {rep + 1}와 같은 자료)")
+                continue
+            try:
+                text = _result_within(futures[i], lambda i=i: started.get(i), image_timeout)
+                analyzed_texts.append(f"[이미지 {i + 1}]\n{text}")
+            except Exception as e:
+                analyzed_texts.append(f"[이미지 {i + 1}] 분석 실패: {str(e)}")
+    finally:
+        # 기한을 넘긴 호출이 끝나기를 기다리지 않음 (스레드는 HTTP 타임아웃에 끝남)
+        pool.shutdown(wait=False, cancel_futures=True)
     
-    # 여러 이미지 내용을 종합하여 요약
+    # 여러 이미지 내용을 종합하여 요약 (길면 청크별로 나눠 요약한 뒤 종합)
     if len(analyzed_texts) > 1:
         combined_text = "\n\n".join(analyzed_texts)
-        
-        summary_prompt = f"""다음은 여러 학습 자료에서 추출한 내용입니다. 
+
+        def build_summary_prompt(material: str) -> str:
+            return f"""다음은 여러 학습 자료에서 추출한 내용입니다. 
 이 내용들을 종합하여 하나의 일관된 학습 자료로 정리해주세요.
 중복되는 내용은 제거하고, 핵심 내용만 간결하게 정리해주세요.
 노래 가사로 만들 수 있도록 자연스러운 문장으로 작성해주세요.
 
 [추출된 내용]
-{combined_text}
+{material}
 
 [요약된 학습 자료]"""
 
         try:
-            resp = client.chat.completions.create(
+            return summarize_long_text(
+                combined_text,
+                api_key,
+                build_summary_prompt,
+                "너는 교육 자료 요약 전문가입니다. 여러 자료를 종합하여 학습자가 쉽게 외울 수 있는 형태로 정리해줍니다.",
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "너는 교육 자료 요약 전문가입니다. 여러 자료를 종합하여 학습자가 쉽게 외울 수 있는 형태로 정리해줍니다."
-                    },
-                    {"role": "user", "content": summary_prompt},
-                ],
-                temperature=0.5,
             )
-            return resp.choices[0].message.content.strip()
         except Exception:
             # 요약 실패 시 원본 텍스트 반환
             return combined_text
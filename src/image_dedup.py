@@ -0,0 +1,125 @@
+"""
+지각 해시(dHash) 기반 유사 이미지 중복 제거 모듈
+같은 페이지를 두 번 올리거나 크롭/압축만 다른 캡처를 올린 경우,
+요청 안에서는 한 번만 분석하고 최근 요청들과도 비교해 분석 결과를 재사용합니다.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+PIL_AVAILABLE = False
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    pass
+
+# 32x32 dHash = 1024비트. 8x8/16x16은 글자만 다른 학습지 페이지끼리도 거리가 너무 가까움
+# (측정: 같은 페이지의 재압축/여백/축소본 ≤ 약 45비트, 다른 페이지 ≥ 약 280비트)
+HASH_SIZE = 32
+
+
+def dhash_image(img: "Image.Image", hash_size: int = HASH_SIZE) -> int:
+    """이미 열린 PIL 이미지의 dHash (가로 방향 밝기 변화)"""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def dedup_enabled() -> bool:
+    return PIL_AVAILABLE and os.getenv("IMAGE_DEDUP_ENABLED", "1") != "0"
+
+
+def dedup_threshold() -> int:
+    """같은 이미지로 볼 최대 해밍 거리 (IMAGE_DEDUP_THRESHOLD, 기본 64/1024비트)"""
+    return int(os.getenv("IMAGE_DEDUP_THRESHOLD", "64"))
+
+
+def group_near_duplicates(hashes: List[Optional[int]], threshold: Optional[int] = None) -> List[int]:
+    """
+    각 이미지가 대표로 삼을 이미지의 인덱스를 반환합니다.
+    앞쪽에 거리 threshold 이내의 이미지가 있으면 그 인덱스, 없으면 자기 자신.
+    해시가 없는 이미지(None)는 항상 자기 자신이 대표입니다.
+    """
+    threshold = dedup_threshold() if threshold is None else threshold
+    representatives: List[int] = []
+    for i, h in enumerate(hashes):
+        rep = i
+        if h is not None:
+            for j in range(i):
+                other = hashes[j]
+                if representatives[j] == j and other is not None and hamming_distance(h, other) <= threshold:
+                    rep = j
+                    break
+        representatives.append(rep)
+    return representatives
+
+
+class RecentHashIndex:
+    """
+    최근 분석한 이미지의 (해시 → 분석 결과) 색인. 크기가 제한된 LRU.
+    조회는 선형 탐색이지만 항목 수가 작고(기본 1024) 정수 XOR라 충분히 빠릅니다.
+    """
+
+    def __init__(self, max_items: int = 1024, threshold: Optional[int] = None) -> None:
+        self.max_items = max_items
+        self.threshold = dedup_threshold() if threshold is None else threshold
+        self._items: "OrderedDict[int, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, image_hash: int) -> Optional[str]:
+        with self._lock:
+            best_hash, best_distance = None, self.threshold + 1
+            for h in self._items:
+                distance = hamming_distance(h, image_hash)
+                if distance < best_distance:
+                    best_hash, best_distance = h, distance
+                    if distance == 0:
+                        break
+            if best_hash is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(best_hash)
+            self.hits += 1
+            return self._items[best_hash]
+
+    def add(self, image_hash: int, result: str) -> None:
+        with self._lock:
+            self._items[image_hash] = result
+            self._items.move_to_end(image_hash)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"items": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+_recent_indexes: Dict[str, RecentHashIndex] = {}
+_recent_lock = threading.Lock()
+
+
+def get_recent_index(name: str) -> RecentHashIndex:
+    """분석 종류(프롬프트)별 공유 색인 (IMAGE_DEDUP_RECENT 항목까지 유지)"""
+    with _recent_lock:
+        index = _recent_indexes.get(name)
+        if index is None:
+            index = RecentHashIndex(max_items=int(os.getenv("IMAGE_DEDUP_RECENT", "1024")))
+            _recent_indexes[name] = index
+        return index
+
+
+def recent_index_stats() -> Dict[str, Dict[str, int]]:
+    return {name: index.stats() for name, index in _recent_indexes.items()}
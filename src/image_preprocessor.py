@@ -0,0 +1,192 @@
+"""
+Vision 호출 전 이미지 전처리 모듈
+업로드된 이미지의 실제 형식을 판별하고, 긴 변을 제한해 축소한 뒤
+단색 여백을 잘라내고 크기 제한이 있는 JPEG/WebP로 다시 압축합니다.
+"""
+import io
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.core.upload_spool import Buffer, open_buffer
+from src.image_dedup import dhash_image
+
+# Pillow가 없으면 원본을 그대로 보내고 MIME 타입만 바로잡음
+PIL_AVAILABLE = False
+try:
+    from PIL import Image, ImageChops, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    pass
+
+# 매직 바이트 → MIME 타입
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+# OpenAI Vision이 그대로 받는 형식
+VISION_MIME_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+
+@dataclass
+class PreparedImage:
+    """전처리 결과와 절감량 통계"""
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    elapsed_ms: float
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # 유사 이미지 판별용 dHash (Pillow가 없거나 열 수 없는 파일이면 None)
+    phash: Optional[int] = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.original_bytes - len(self.data))
+
+    @property
+    def upload_ms_saved(self) -> float:
+        """줄어든 바이트를 IMAGE_UPLOAD_MBPS 대역폭으로 환산한 업로드 시간에서 전처리 시간을 뺀 값"""
+        mbps = float(os.getenv("IMAGE_UPLOAD_MBPS", "10"))
+        return self.bytes_saved * 8 / (mbps * 1000) - self.elapsed_ms
+
+
+def detect_image_mime(data: Buffer) -> Optional[str]:
+    """파일 앞부분의 시그니처로 실제 이미지 형식을 판별합니다. 알 수 없으면 None."""
+    data = bytes(data[:16])
+    for signature, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1", b"ftypmsf1"):
+        return "image/heic"
+    return None
+
+
+def prepare_image_for_vision(
+    data: Buffer,
+    max_edge: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    output_format: Optional[str] = None,
+) -> PreparedImage:
+    """
+    이미지를 Vision 호출에 맞게 줄입니다.
+
+    Args:
+        data: 원본 이미지 바이트 (업로드 임시 파일의 mmap도 가능, 필요한 부분만 읽음)
+        max_edge: 긴 변 최대 픽셀 (기본 IMAGE_MAX_EDGE=1536)
+        max_bytes: 결과 최대 크기 (기본 IMAGE_MAX_BYTES=1000000)
+        output_format: "jpeg" 또는 "webp" (기본 IMAGE_OUTPUT_FORMAT=jpeg)
+
+    이미 충분히 작고 Vision이 받는 형식이면 원본을 그대로 사용합니다.
+    """
+    start = time.perf_counter()
+    max_edge = max_edge or int(os.getenv("IMAGE_MAX_EDGE", "1536"))
+    max_bytes = max_bytes or int(os.getenv("IMAGE_MAX_BYTES", "1000000"))
+    output_format = (output_format or os.getenv("IMAGE_OUTPUT_FORMAT", "jpeg")).lower()
+    detected = detect_image_mime(data)
+
+    def _result(payload: Buffer, mime: str, size: Optional[tuple] = None, phash: Optional[int] = None) -> PreparedImage:
+        return PreparedImage(
+            # 원본을 그대로 쓸 때만 복사 (버퍼는 요청이 끝나면 닫힘)
+            data=payload if isinstance(payload, bytes) else bytes(payload),
+            mime_type=mime,
+            original_bytes=len(data),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            width=size[0] if size else None,
+            height=size[1] if size else None,
+            phash=phash,
+        )
+
+    if not PIL_AVAILABLE:
+        return _result(data, detected or "image/png")
+
+    try:
+        img = Image.open(open_buffer(data))
+        original_size = img.size
+        # JPEG는 디코딩 단계에서 바로 축소 (큰 사진의 디코딩 시간/메모리 절약)
+        if img.format == "JPEG":
+            img.draft("RGB", (max_edge, max_edge))
+        img.load()
+    except Exception:
+        # 열 수 없는 파일은 그대로 보내 업스트림이 판단하게 함
+        return _result(data, detected or "image/png")
+
+    img = ImageOps.exif_transpose(img)
+    img = _flatten(img)
+    if max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    # 여백 판별은 축소된 이미지에서 (픽셀 수가 적어 빠름)
+    img = _crop_uniform_border(img)
+    # 여백을 잘라낸 뒤 해시해야 크롭/여백만 다른 캡처끼리 같은 이미지로 묶임
+    phash = dhash_image(img)
+
+    # 축소/크롭이 없었고 원본이 이미 작으며 Vision 지원 형식이면 재압축하지 않음
+    if detected in VISION_MIME_TYPES and len(data) <= max_bytes and img.size == original_size:
+        return _result(data, detected, img.size, phash)
+
+    encoded, mime = _encode_bounded(img, output_format, max_bytes)
+    if len(encoded) >= len(data) and detected in VISION_MIME_TYPES:
+        return _result(data, detected, img.size, phash)
+    return _result(encoded, mime, img.size, phash)
+
+
+def summarize_preparation(images: List[PreparedImage]) -> Dict[str, float]:
+    """요청 하나에서 처리한 이미지들의 절감량 합계"""
+    original = sum(im.original_bytes for im in images)
+    processed = sum(len(im.data) for im in images)
+    return {
+        "images": len(images),
+        "original_bytes": original,
+        "processed_bytes": processed,
+        "bytes_saved": original - processed,
+        "preprocess_ms": round(sum(im.elapsed_ms for im in images), 1),
+        "upload_ms_saved": round(sum(im.upload_ms_saved for im in images), 1),
+    }
+
+
+def _flatten(img: "Image.Image") -> "Image.Image":
+    """투명 배경은 흰색으로 합성하고 RGB로 통일"""
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def _crop_uniform_border(img: "Image.Image", tolerance: int = 16, margin: int = 8) -> "Image.Image":
+    """왼쪽 위 픽셀과 같은 색(허용 오차 내)의 가장자리 여백을 잘라냅니다."""
+    background = Image.new("RGB", img.size, img.getpixel((0, 0)))
+    diff = ImageChops.difference(img, background).convert("L")
+    bbox = diff.point(lambda p: 255 if p > tolerance else 0).getbbox()
+    if not bbox:
+        return img
+    left, top, right, bottom = bbox
+    left, top = max(0, left - margin), max(0, top - margin)
+    right, bottom = min(img.width, right + margin), min(img.height, bottom + margin)
+    # 잘라낼 여백이 거의 없으면 원본 유지
+    if (right - left) * (bottom - top) > img.width * img.height * 0.95:
+        return img
+    return img.crop((left, top, right, bottom))
+
+
+def _encode_bounded(img: "Image.Image", output_format: str, max_bytes: int) -> tuple:
+    """품질을 낮춰 가며 max_bytes 이하가 될 때까지 압축합니다. 마지막 시도 결과를 반환."""
+    pil_format, mime = ("WEBP", "image/webp") if output_format == "webp" else ("JPEG", "image/jpeg")
+    encoded = b""
+    for quality in (85, 75, 65, 55, 45):
+        buffer = io.BytesIO()
+        img.save(buffer, format=pil_format, quality=quality, optimize=True)
+        encoded = buffer.getvalue()
+        if len(encoded) <= max_bytes:
+            break
+    return encoded, mime
@@ -2,7 +2,11 @@
 노래 가사 생성 모듈
 학습 텍스트로부터 노래 가사를 먼저 생성합니다.
 """
-from openai import OpenAI
+from src.core.completion_cache import cached_completion
+from src.core.openai_clients import get_openai_client
+
+# 프롬프트를 바꾸면 올려서 이전 캐시 결과를 무효화
+LYRICS_PROMPT_VERSION = "lyrics-v1"
 
 
 def generate_lyrics(study_text: str, api_key: str, model: str = "gpt-4o-mini") -> str:
@@ -17,7 +21,7 @@ def generate_lyrics(study_text: str, api_key: str, model: str = "gpt-4o-mini") -
     Returns:
         생성된 가사
     """
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     
     prompt = f"""다음 학습용 텍스트를 노래 가사로 변환해주세요.
 
@@ -34,6 +38,14 @@ def generate_lyrics(study_text: str, api_key: str, model: str = "gpt-4o-mini") -
 
 [생성된 가사]"""
 
+    params = {"temperature": 0.7, "max_tokens": 1000}
+    return cached_completion(
+        "lyrics", LYRICS_PROMPT_VERSION, model, params, [study_text],
+        lambda: _request_lyrics(client, model, prompt, params),
+    )
+
+
+def _request_lyrics(client, model: str, prompt: str, params: dict) -> str:
     resp = client.chat.completions.create(
         model=model,
         messages=[
@@ -43,8 +55,7 @@ def generate_lyrics(study_text: str, api_key: str, model: str = "gpt-4o-mini") -
             },
             {"role": "user", "content": prompt},
         ],
-        temperature=0.7,
-        max_tokens=1000,
+        **params,
     )
     
     lyrics = resp.choices[0].message.content.strip()
@@ -1,9 +1,10 @@
 import time
 from typing import Any, Dict
 
-import requests
 from requests import HTTPError
 
+from src.core.http_transport import get_session
+
 
 class MurekaClient:
     """
@@ -45,7 +46,7 @@ class MurekaClient:
         backoff = self.retry_backoff
         while True:
             try:
-                resp = requests.post(url, json=payload, headers=self._headers(), timeout=30)
+                resp = get_session().post(url, json=payload, headers=self._headers(), timeout=30)
                 resp.raise_for_status()
                 data = resp.json()
                 task_id = data.get("id")
@@ -68,7 +69,7 @@ class MurekaClient:
         url = f"{self.base_url}/song/tasks/{task_id}"
         elapsed = 0.0
         while elapsed <= self.timeout_seconds:
-            resp = requests.get(url, headers=self._headers(), timeout=30)
+            resp = get_session().get(url, headers=self._headers(), timeout=30)
             resp.raise_for_status()
             data = resp.json()
             status = data.get("status")
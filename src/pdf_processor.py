@@ -1,37 +1,683 @@
 """
 PDF 파일 처리 모듈
+
+추출 전에 PyPDF2로 페이지별 콘텐츠 스트림만 훑어(사전 검사) 텍스트 연산자가 있는 페이지와
+이미지만 있는 페이지를 구분합니다. 이미지 전용 페이지는 추출기를 돌리지 않고 표시만 해 두며,
+텍스트 페이지는 PDF_BACKENDS 순서대로 추출기를 시도해 결과가 정상인 첫 추출기를 씁니다.
+(기본: 기존과 같은 pdfplumber → 글자가 깨지거나 비면 그 페이지만 PyPDF2.
+ 추출 결과의 줄바꿈/띄어쓰기가 달라지므로, 더 빠른 PyPDF2를 먼저 쓰려면 PDF_BACKENDS로 직접 바꿈)
+
+추출할 페이지가 PDF_POOL_MIN_PAGES 이상이면 프로세스 풀 워커에서 추출하고, 페이지 수가 많으면
+페이지 구간을 나눠 병렬로 추출합니다. 워커에는 PDF 바이트 대신 파일 경로만 넘기며(업로드 임시 파일,
+없으면 한 번만 써 둔 임시 파일), 워커는 그 파일을 mmap으로 엽니다.
+(pdfplumber 레이아웃 분석은 CPU를 많이 쓰고 GIL을 잡고 있어 스레드로는 빨라지지 않으며,
+페이지 타임아웃에 쓰는 SIGALRM은 워커 프로세스의 메인 스레드에서만 걸 수 있음)
+페이지가 그보다 적은 작은 PDF는 프로세스 생성/import/전달 비용이 추출보다 크므로 요청 스레드에서 바로 추출하고,
+풀 워커가 비정상 종료된 경우에도 서버 스레드에서 순차 추출로 대체합니다 (둘 다 페이지 타임아웃 없음).
+
+설정 (환경 변수):
+    PDF_BACKENDS            페이지별로 시도할 추출기 순서 (기본 "pdfplumber,pypdf2")
+    PDF_WORKERS             추출 프로세스 수 (기본 min(4, CPU 수), 1이면 병렬 추출 안 함)
+    PDF_POOL_MIN_PAGES      추출할 페이지가 이 수 이상일 때만 프로세스 풀 사용 (기본 4)
+    PDF_PARALLEL_MIN_PAGES  한 번에 추출할 페이지가 이 수 이상일 때만 구간을 나눔 (기본 16)
+    PDF_PAGE_TIMEOUT        페이지 하나 추출 타임아웃(초, 기본 20). 넘으면 그 페이지는 건너뜀
+
+추출 결과는 PDF SHA-256 + 추출기 버전으로 디스크에 캐시되며(src.core.pdf_text_cache),
+캐시에 있는 페이지는 PDF 라이브러리를 import하지도 않고 바로 돌려줍니다.
+
+이미지 전용 페이지(스캔본)는 OpenAI 키가 주어지면 페이지를 이미지로 렌더링해
+이미지 분석 경로(image_analyzer)로 동시에 보냅니다 ("vision" 단계 한도 STAGE_LIMIT_VISION 안에서).
+페이지 수와 픽셀 수에 상한을 둡니다.
+    PDF_OCR_DPI              렌더링 해상도 상한 (기본 150)
+    PDF_OCR_MAX_PAGE_PIXELS  페이지 하나의 최대 픽셀 수 (기본 2500000, 넘으면 DPI를 낮춤)
+    PDF_OCR_MAX_PAGES        문서 하나에서 OCR할 최대 페이지 수 (기본 10)
+    PDF_OCR_MAX_PIXELS       문서 하나에서 렌더링할 전체 픽셀 상한 (기본 25000000, A4 150dpi 약 10쪽)
+
+분량 예산(max_chars/max_tokens)이 주어지면 앞에서부터 워커 수에 맞춘 페이지 묶음 단위로 병렬 추출하다가
+필요한 만큼 모이면 나머지 페이지는 파싱하지 않습니다.
 """
+import base64
+import hashlib
+import importlib.util
 import io
+import mmap
+import multiprocessing
+import os
+import re
+import signal
 import sys
-from typing import List, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.core.pdf_text_cache import (
+    PAGE_BLANK,
+    PAGE_IMAGE,
+    PAGE_PENDING,
+    PAGE_TEXT,
+    get_pdf_text_cache,
+    pdf_cache_enabled,
+)
+from src.core.result_cache import make_cache_key
+from src.core.text_budget import estimate_tokens
+from src.core.upload_spool import Buffer, open_buffer
+
+# 추출 방식이 바뀌면 올려서 이전 캐시 결과를 무효화
+PDF_EXTRACTOR_VERSION = "pdf-extract-v1"
+
+
+def _module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-# 라이브러리 import 시도 (에러 메시지 개선)
-PDFPLUMBER_AVAILABLE = False
-PYPDF2_AVAILABLE = False
-_import_errors = []
 
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError as e:
-    _import_errors.append(f"pdfplumber: {str(e)}")
+# 라이브러리 설치 여부만 확인하고, 실제 import는 처음 쓸 때 함
+# (pdfplumber는 import만으로 수백 ms가 걸리는데 캐시가 적중하면 필요 없음)
+PDFPLUMBER_AVAILABLE = _module_available("pdfplumber")
+PYPDF2_AVAILABLE = _module_available("PyPDF2")
+# 이미지 전용 페이지 렌더링용 (pdfplumber 의존성으로 함께 설치됨)
+PDFIUM_AVAILABLE = _module_available("pypdfium2")
+_import_errors = [
+    f"{name}: 모듈을 찾을 수 없습니다"
+    for name, available in (("pdfplumber", PDFPLUMBER_AVAILABLE), ("PyPDF2", PYPDF2_AVAILABLE))
+    if not available
+]
 
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError as e:
-    _import_errors.append(f"PyPDF2: {str(e)}")
 
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+
+def pdf_workers() -> int:
+    return max(1, int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1)))))
+
+
+def pdf_pool_min_pages() -> int:
+    return int(os.getenv("PDF_POOL_MIN_PAGES", "4"))
+
+
+def pdf_page_timeout() -> float:
+    return float(os.getenv("PDF_PAGE_TIMEOUT", "20"))
+
+
+def pdf_backends() -> List[str]:
+    """설치된 추출기만 남긴 시도 순서"""
+    available = {"pypdf2": PYPDF2_AVAILABLE, "pdfplumber": PDFPLUMBER_AVAILABLE}
+    order = [b.strip().lower() for b in os.getenv("PDF_BACKENDS", "pdfplumber,pypdf2").split(",")]
+    return [b for b in order if available.get(b)]
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
     """
-    PDF 파일에서 텍스트를 추출합니다.
-    pdfplumber를 우선 사용하고, 실패 시 PyPDF2를 사용합니다.
+    페이지 추출용 공유 프로세스 풀.
+    서버는 여러 스레드가 도는 중이라 fork 대신 spawn으로 워커를 띄웁니다.
     """
-    if not pdf_bytes or len(pdf_bytes) == 0:
-        raise ValueError("PDF 파일이 비어있습니다.")
-    
-    # 라이브러리 확인
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=pdf_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pdf_process_pool(wait: bool = False) -> None:
+    """서버 종료 시 (또는 워커가 죽었을 때) 프로세스 풀을 정리합니다."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class _PageTimeout(Exception):
+    pass
+
+
+def _raise_page_timeout(signum, frame):
+    raise _PageTimeout()
+
+
+@contextmanager
+def _page_alarm(page_timeout: Optional[float]):
+    """
+    프로세스 풀 워커(메인 스레드)에서만 SIGALRM으로 페이지 타임아웃을 겁니다.
+    풀을 쓸 수 없어 서버 스레드에서 순차 추출할 때는 시그널을 쓸 수 없으므로 제한 없이 실행합니다.
+    """
+    use_alarm = (
+        bool(page_timeout)
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if not use_alarm:
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@dataclass
+class PdfExtractionReport:
+    """문서 하나의 사전 검사 결과와 추출기별 소요 시간"""
+    page_count: int = 0
+    text_pages: List[int] = field(default_factory=list)
+    image_only_pages: List[int] = field(default_factory=list)
+    blank_pages: List[int] = field(default_factory=list)
+    scan_ms: float = 0.0
+    backend_ms: Dict[str, float] = field(default_factory=dict)
+    backend_pages: Dict[str, int] = field(default_factory=dict)
+    ocr_pages: List[int] = field(default_factory=list)
+    ocr_skipped_pages: List[int] = field(default_factory=list)
+    ocr_ms: float = 0.0
+    cache_hit: bool = False
+    cached_pages: int = 0
+
+    def add_timings(self, backend_ms: Dict[str, float], backend_pages: Dict[str, int]) -> None:
+        for backend, ms in backend_ms.items():
+            self.backend_ms[backend] = self.backend_ms.get(backend, 0.0) + ms
+        for backend, pages in backend_pages.items():
+            self.backend_pages[backend] = self.backend_pages.get(backend, 0) + pages
+
+    def summary(self) -> str:
+        backends = ", ".join(
+            f"{b} {self.backend_ms[b]:.0f}ms/{self.backend_pages.get(b, 0)}쪽" for b in self.backend_ms
+        ) or "추출 없음"
+        summary = (
+            f"{self.page_count}쪽 (텍스트 {len(self.text_pages)}, 이미지 전용 {len(self.image_only_pages)}, "
+            f"빈 페이지 {len(self.blank_pages)}) "
+            f"{'캐시 조회' if self.cache_hit else '사전 검사'} {self.scan_ms:.0f}ms | {backends}"
+        )
+        if self.cached_pages:
+            summary += f" | 캐시 {self.cached_pages}쪽"
+        if self.ocr_pages or self.ocr_skipped_pages:
+            summary += (
+                f" | OCR {len(self.ocr_pages)}쪽 {self.ocr_ms:.0f}ms"
+                f" (한도 초과로 생략 {len(self.ocr_skipped_pages)}쪽)"
+            )
+        return summary
+
+
+# 텍스트 표시 연산자: Tj, TJ, 그리고 문자열 뒤의 ' / "
+_TEXT_OPERATOR = re.compile(rb"\bT[jJ]\b|\)\s*['\"]")
+_INLINE_IMAGE = re.compile(rb"\bBI\b")
+
+
+def _classify_xobjects(resources, depth: int = 0) -> Tuple[bool, bool]:
+    """리소스의 XObject를 훑어 (텍스트 있음, 이미지 있음)을 반환 (Form XObject는 두 단계까지)"""
+    has_text = has_image = False
+    xobjects = resources.get("/XObject") if resources else None
+    if not xobjects:
+        return False, False
+    for ref in xobjects.get_object().values():
+        obj = ref.get_object()
+        subtype = obj.get("/Subtype")
+        if subtype == "/Image":
+            has_image = True
+        elif subtype == "/Form" and depth < 2:
+            if _TEXT_OPERATOR.search(obj.get_data()):
+                return True, has_image
+            inner = obj.get("/Resources")
+            text, image = _classify_xobjects(inner.get_object() if inner else None, depth + 1)
+            if text:
+                return True, has_image
+            has_image = has_image or image
+    return has_text, has_image
+
+
+def _scan_page(page) -> str:
+    """
+    페이지 하나를 "text" / "image" / "blank"로 분류합니다.
+    콘텐츠 스트림의 압축만 풀고 레이아웃 분석은 하지 않아 추출보다 훨씬 빠릅니다.
+    판단할 수 없으면 "text"로 보고 추출을 시도합니다.
+    """
+    try:
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources else None
+        content = page.get_contents()
+        data = content.get_data() if content is not None else b""
+        if _TEXT_OPERATOR.search(data):
+            return "text"
+        has_text, has_image = _classify_xobjects(resources)
+        if has_text:
+            return "text"
+        if has_image or _INLINE_IMAGE.search(data):
+            return "image"
+        return "blank"
+    except Exception:
+        return "text"
+
+
+def scan_pdf_pages(pdf_bytes: Buffer, report: PdfExtractionReport):
+    """
+    모든 페이지를 사전 검사해 report를 채우고, 이어서 추출에 재사용할 PyPDF2 reader를 반환합니다.
+    PyPDF2가 없거나 열 수 없으면 모든 페이지를 텍스트 페이지로 보고 None을 반환합니다.
+    """
+    start = time.perf_counter()
+    reader = None
+    if PYPDF2_AVAILABLE:
+        import PyPDF2
+
+        try:
+            reader = PyPDF2.PdfReader(open_buffer(pdf_bytes))
+            kinds = [_scan_page(page) for page in reader.pages]
+        except Exception as e:
+            print(f"[PDF] 사전 검사 실패, 모든 페이지 추출 시도: {e}")
+            reader = None
+    if reader is None:
+        import pdfplumber
+
+        with pdfplumber.open(open_buffer(pdf_bytes)) as pdf:
+            kinds = ["text"] * len(pdf.pages)
+    report.page_count = len(kinds)
+    report.text_pages = [i + 1 for i, kind in enumerate(kinds) if kind == "text"]
+    report.image_only_pages = [i + 1 for i, kind in enumerate(kinds) if kind == "image"]
+    report.blank_pages = [i + 1 for i, kind in enumerate(kinds) if kind == "blank"]
+    report.scan_ms = (time.perf_counter() - start) * 1000
+    return reader
+
+
+def pdf_cache_key(pdf_bytes: Buffer, backends: List[str], content_hash: Optional[str] = None) -> str:
+    """PDF 내용 + 추출기 버전 + 추출기 순서로 만든 캐시 키 (content_hash: 이미 계산한 SHA-256)"""
+    content_hash = content_hash or hashlib.sha256(pdf_bytes).hexdigest()
+    return make_cache_key(content_hash, PDF_EXTRACTOR_VERSION, ",".join(backends))
+
+
+class _PageSource:
+    """
+    디스크 캐시와 추출기를 합친 페이지 공급원.
+
+    캐시 파일이 있으면 사전 검사 없이 페이지 종류를 캐시에서 읽고, 이미 추출한 페이지는
+    mmap에서 그 페이지만 꺼내 줍니다. 추출한 적 없는 페이지만 PDF 라이브러리로 추출하며,
+    close 때 새로 추출한 페이지를 합쳐 캐시 파일을 다시 씁니다.
+    """
+
+    def __init__(self, pdf_bytes: Buffer, report: PdfExtractionReport, content_hash: Optional[str] = None) -> None:
+        self.pdf_bytes = pdf_bytes
+        self.report = report
+        self.backends = pdf_backends()
+        self._cache = get_pdf_text_cache() if pdf_cache_enabled() else None
+        self._key = pdf_cache_key(pdf_bytes, self.backends, content_hash) if self._cache else ""
+        self._cached = None
+        self._fresh: Dict[int, str] = {}
+        self._extractor: Optional[_PageExtractor] = None
+        self._reader = None
+
+        start = time.perf_counter()
+        if self._cache is not None:
+            self._cached = self._cache.open(self._key)
+        if self._cached is not None:
+            self.kinds = list(self._cached.kinds)
+            report.cache_hit = True
+            report.page_count = len(self.kinds)
+            report.text_pages = [i + 1 for i, kind in enumerate(self.kinds) if kind in (PAGE_PENDING, PAGE_TEXT)]
+            report.image_only_pages = [i + 1 for i, kind in enumerate(self.kinds) if kind == PAGE_IMAGE]
+            report.blank_pages = [i + 1 for i, kind in enumerate(self.kinds) if kind == PAGE_BLANK]
+            report.scan_ms = (time.perf_counter() - start) * 1000
+        else:
+            self._reader = scan_pdf_pages(pdf_bytes, report)
+            self.kinds = [PAGE_PENDING] * report.page_count
+            for page in report.image_only_pages:
+                self.kinds[page - 1] = PAGE_IMAGE
+            for page in report.blank_pages:
+                self.kinds[page - 1] = PAGE_BLANK
+
+    def is_pending(self, page: int) -> bool:
+        """1부터 세는 텍스트 페이지를 아직 추출하지 않았는지 (캐시에도 없음)"""
+        return self.kinds[page - 1] == PAGE_PENDING
+
+    def get(self, page: int, extract: bool = True) -> str:
+        """1부터 세는 페이지의 텍스트. 캐시에 없으면 extract일 때만 추출합니다."""
+        if self.kinds[page - 1] == PAGE_TEXT:
+            self.report.cached_pages += page not in self._fresh
+            return self._fresh[page] if page in self._fresh else self._cached.text(page)
+        if not extract:
+            return ""
+        if self._extractor is None:
+            self._extractor = _PageExtractor(self.pdf_bytes, self.backends, reader=self._reader)
+        text = self._extractor.extract(page - 1)
+        if page - 1 not in self._extractor.failed:
+            self.record([(page, text)])
+        return text
+
+    def record(self, pages: List[Tuple[int, str]]) -> None:
+        """다른 곳(프로세스 풀)에서 추출한 결과를 캐시에 넣을 페이지로 기록"""
+        for page, text in pages:
+            self.kinds[page - 1] = PAGE_TEXT
+            self._fresh[page] = text
+
+    def close(self) -> None:
+        if self._extractor is not None:
+            self._extractor.close()
+            self.report.add_timings(self._extractor.backend_ms, self._extractor.backend_pages)
+            self._extractor = None
+        try:
+            if self._fresh and self._cache is not None:
+                texts = dict(self._fresh)
+                if self._cached is not None:
+                    for i, kind in enumerate(self._cached.kinds):
+                        if kind == PAGE_TEXT and i + 1 not in texts:
+                            texts[i + 1] = self._cached.text(i + 1)
+                self._cache.write(self._key, self.kinds, texts)
+        except OSError as e:
+            print(f"[PDF 캐시] 저장 실패 (무시): {e}")
+        finally:
+            if self._cached is not None:
+                self._cached.close()
+                self._cached = None
+            self._fresh = {}
+
+
+def _looks_garbled(text: str) -> bool:
+    """글꼴 매핑이 없어 깨진 추출 결과 (cid 코드, 대체 문자, 사용자 정의 영역 문자가 많음)"""
+    if "(cid:" in text:
+        return True
+    bad = sum(1 for ch in text if ch == "\ufffd" or "\ue000" <= ch <= "\uf8ff" or (ord(ch) < 32 and ch not in "\n\r\t"))
+    return bad > len(text) * 0.05
+
+
+class _PageExtractor:
+    """
+    페이지별로 추출기를 순서대로 시도합니다.
+    각 추출기 문서는 처음 필요할 때 한 번만 엽니다 (PyPDF2 reader는 사전 검사 것을 재사용).
+    """
+
+    def __init__(self, pdf_bytes: Buffer, backends: List[str], reader=None, page_timeout: Optional[float] = None):
+        self.pdf_bytes = pdf_bytes
+        self.backends = backends
+        self.page_timeout = page_timeout
+        self.backend_ms: Dict[str, float] = {}
+        self.backend_pages: Dict[str, int] = {}
+        self._reader = reader
+        self._plumber = None
+        self._broken: set = set()
+        # 시간 초과/오류로 결과를 못 얻은 페이지 (빈 페이지와 달리 캐시하지 않음)
+        self.failed: set = set()
+
+    def extract(self, index: int) -> str:
+        fallback = ""
+        errored = False
+        for backend in self.backends:
+            if backend in self._broken:
+                continue
+            start = time.perf_counter()
+            try:
+                with _page_alarm(self.page_timeout):
+                    text = (self._run(backend, index) or "").strip()
+            except _PageTimeout:
+                print(f"[PDF] {index + 1}페이지 {backend} 추출 시간 초과 ({self.page_timeout}s)")
+                text, errored = "", True
+            except Exception:
+                # 특정 페이지 추출 실패는 무시하고 다음 추출기로
+                text, errored = "", True
+            self.backend_ms[backend] = self.backend_ms.get(backend, 0.0) + (time.perf_counter() - start) * 1000
+            if not text:
+                continue
+            if not _looks_garbled(text):
+                self.backend_pages[backend] = self.backend_pages.get(backend, 0) + 1
+                return text
+            fallback = fallback or text
+        if not fallback and errored:
+            self.failed.add(index)
+        return fallback
+
+    def _run(self, backend: str, index: int) -> str:
+        if backend == "pypdf2":
+            if self._reader is None:
+                import PyPDF2
+
+                self._reader = self._open(backend, lambda: PyPDF2.PdfReader(open_buffer(self.pdf_bytes)))
+            return self._reader.pages[index].extract_text()
+        if self._plumber is None:
+            import pdfplumber
+
+            self._plumber = self._open(backend, lambda: pdfplumber.open(open_buffer(self.pdf_bytes)))
+        page = self._plumber.pages[index]
+        try:
+            return page.extract_text()
+        finally:
+            # 다 쓴 페이지의 레이아웃 캐시 해제 (메모리 절약)
+            page.close()
+
+    def _open(self, backend: str, opener):
+        try:
+            return opener()
+        except Exception:
+            self._broken.add(backend)
+            raise
+
+    def close(self) -> None:
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+
+
+def _extract_pages(
+    pdf_bytes: Buffer,
+    indexes: List[int],
+    page_timeout: Optional[float] = None,
+    backends: Optional[List[str]] = None,
+    reader=None,
+) -> Tuple[List[Tuple[int, str]], Dict[str, float], Dict[str, int]]:
+    """
+    지정한 페이지(0부터)의 텍스트를 추출해 ((페이지 번호, 텍스트) 목록, 추출기별 ms, 추출기별 페이지 수)를 반환합니다.
+    목록에는 결과가 빈 페이지도 ""로 들어가고, 시간 초과/오류로 실패한 페이지만 빠집니다.
+    프로세스 풀 워커에서 실행될 때는 SIGALRM으로 페이지별 타임아웃을 겁니다.
+    """
+    extractor = _PageExtractor(pdf_bytes, backends or pdf_backends(), reader=reader, page_timeout=page_timeout)
+    results = []
+    try:
+        for index in indexes:
+            text = extractor.extract(index)
+            if index not in extractor.failed:
+                results.append((index + 1, text))
+    finally:
+        extractor.close()
+    return results, extractor.backend_ms, extractor.backend_pages
+
+
+def _extract_pages_from_file(
+    pdf_path: str,
+    indexes: List[int],
+    page_timeout: Optional[float] = None,
+    backends: Optional[List[str]] = None,
+) -> Tuple[List[Tuple[int, str]], Dict[str, float], Dict[str, int]]:
+    """프로세스 풀 워커용 _extract_pages: PDF를 피클로 받지 않고 파일을 mmap으로 엶"""
+    with open(pdf_path, "rb") as f:
+        # 닫힌 파일에서도 매핑은 유효하며, 추출기가 버퍼를 다 놓으면 함께 해제됨
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _extract_pages(view, indexes, page_timeout, backends)
+
+
+@contextmanager
+def _shared_pdf_file(pdf_bytes: Buffer) -> Iterator[str]:
+    """워커가 열 수 있게 PDF를 임시 파일로 한 번 써 두고 경로를 줍니다 (끝나면 삭제)."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="pdf-", dir=os.getenv("UPLOAD_SPOOL_DIR") or None)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def _shard(indexes: List[int], shards: int) -> List[List[int]]:
+    """페이지 목록을 연속된 구간 shards개로 고르게 나눕니다."""
+    shards = max(1, min(shards, len(indexes)))
+    size, extra = divmod(len(indexes), shards)
+    chunks, start = [], 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(indexes[start:end])
+        start = end
+    return chunks
+
+
+def extract_pages_parallel(
+    pdf_path: str,
+    indexes: List[int],
+    workers: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    report: Optional[PdfExtractionReport] = None,
+    shards: Optional[int] = None,
+) -> List[Tuple[int, str]]:
+    """
+    pdf_path 파일의 페이지 구간을 프로세스 풀에 나눠 추출하고 페이지 순서대로 합칩니다 (빈 페이지는 ""로 포함).
+    구간마다 PDF 전체를 피클해 보내지 않도록 워커에는 파일 경로만 넘깁니다.
+    구간은 기본으로 워커 수의 2배로 나눠 느린 페이지가 몰린 구간 때문에 다른 워커가 노는 시간을 줄입니다.
+    구간 전체가 제한 시간(페이지 수 × page_timeout + 여유)을 넘기면 그 구간은 비워 둡니다.
+    """
+    workers = workers or pdf_workers()
+    page_timeout = pdf_page_timeout() if page_timeout is None else page_timeout
+    backends = pdf_backends()
+    pool = get_pdf_process_pool()
+    futures = [
+        (chunk, pool.submit(_extract_pages_from_file, pdf_path, chunk, page_timeout, backends))
+        for chunk in _shard(indexes, shards or workers * 2)
+    ]
+    results: List[Tuple[int, str]] = []
+    for chunk, future in futures:
+        try:
+            # 앞 구간을 기다리는 동안 뒤 구간도 돌고 있으므로 여유를 넉넉히 줌
+            timeout = page_timeout * len(chunk) * len(backends) + 30 if page_timeout else None
+            pages, backend_ms, backend_pages = future.result(timeout=timeout)
+            results.extend(pages)
+            if report is not None:
+                report.add_timings(backend_ms, backend_pages)
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"[PDF] {chunk[0] + 1}-{chunk[-1] + 1}페이지 구간 시간 초과, 건너뜀")
+        except BrokenProcessPool:
+            # 워커가 죽으면 풀을 새로 만들 수 있게 정리하고 호출자가 순차 추출로 대체하게 함
+            shutdown_pdf_process_pool()
+            raise
+    results.sort(key=lambda item: item[0])
+    return results
+
+
+def _render_dpi(width_pt: float, height_pt: float, dpi: float, max_page_pixels: int) -> float:
+    """페이지 픽셀 수가 max_page_pixels를 넘지 않도록 낮춘 DPI (크기 단위는 포인트 = 1/72인치)"""
+    pixels = (width_pt * dpi / 72) * (height_pt * dpi / 72)
+    if pixels <= max_page_pixels:
+        return dpi
+    return dpi * (max_page_pixels / pixels) ** 0.5
+
+
+def rasterize_pdf_pages(
+    pdf_bytes: Buffer,
+    pages: List[int],
+    dpi: Optional[float] = None,
+    max_page_pixels: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    max_total_pixels: Optional[int] = None,
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    페이지(1부터)를 차례로 렌더링해 (페이지 번호, JPEG 바이트)로 내보냅니다.
+    페이지 수나 전체 픽셀 한도에 닿으면 남은 페이지는 렌더링하지 않습니다.
+    """
+    if not PDFIUM_AVAILABLE:
+        raise ImportError("PDF 페이지 렌더링에 pypdfium2가 필요합니다: pip install pypdfium2")
+    import pypdfium2
+
+    dpi = dpi or float(os.getenv("PDF_OCR_DPI", "150"))
+    max_page_pixels = max_page_pixels or int(os.getenv("PDF_OCR_MAX_PAGE_PIXELS", "2500000"))
+    max_pages = max_pages or int(os.getenv("PDF_OCR_MAX_PAGES", "10"))
+    max_total_pixels = max_total_pixels or int(os.getenv("PDF_OCR_MAX_PIXELS", "25000000"))
+
+    document = pypdfium2.PdfDocument(pdf_bytes if isinstance(pdf_bytes, bytes) else open_buffer(pdf_bytes))
+    used_pixels = 0
+    try:
+        for number in pages[:max_pages]:
+            page = document[number - 1]
+            try:
+                width_pt, height_pt = page.get_size()
+                scale = _render_dpi(width_pt, height_pt, dpi, max_page_pixels) / 72
+                pixels = int(width_pt * scale) * int(height_pt * scale)
+                if used_pixels + pixels > max_total_pixels:
+                    return
+                used_pixels += pixels
+                img = page.render(scale=scale).to_pil()
+            finally:
+                page.close()
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=85)
+            yield number, buffer.getvalue()
+    finally:
+        document.close()
+
+
+def ocr_image_only_pages(
+    pdf_bytes: Buffer,
+    pages: List[int],
+    api_key: str,
+    model: str = "gpt-4o-mini",
+    report: Optional[PdfExtractionReport] = None,
+) -> List[Tuple[int, str]]:
+    """
+    이미지 전용 페이지를 렌더링해 이미지 분석(analyze_image_with_dedup)으로 동시에 보냅니다.
+    렌더링은 한 페이지씩 하면서 끝난 페이지부터 바로 분석을 시작하고,
+    결과는 페이지 순서로 돌려줍니다. 같은 페이지를 다시 올리면 이미지 분석 캐시가 그대로 적중합니다.
+    분석 호출은 "vision" 단계 스레드 풀로 보내므로 이미지 업로드 분석과 같은 동시 요청 한도를 나눠 씁니다.
+    """
+    # OpenAI/이미지 모듈은 필요할 때만 (프로세스 풀 워커가 불필요하게 import하지 않도록)
+    from src.core.openai_clients import get_openai_client
+    from src.core.stage_executor import get_stage_executor
+    from src.image_analyzer import analyze_image_with_dedup
+    from src.image_preprocessor import prepare_image_for_vision
+
+    start = time.perf_counter()
+    client = get_openai_client(api_key).with_options(timeout=float(os.getenv("IMAGE_ANALYSIS_TIMEOUT", "60")))
+
+    def _analyze(jpeg: bytes) -> str:
+        prepared = prepare_image_for_vision(jpeg)
+        image_b64 = base64.b64encode(prepared.data).decode("utf-8")
+        return analyze_image_with_dedup(image_b64, client, model, prepared.mime_type, prepared.phash)
+
+    # 이 함수는 "pdf" 단계 스레드에서 돌고 분석은 "vision" 단계 풀에서 돌므로 서로를 기다리며 막히지 않음
+    vision = get_stage_executor("vision")
+    futures = []
+    results = []
+    try:
+        for number, jpeg in rasterize_pdf_pages(pdf_bytes, pages):
+            futures.append((number, vision.submit(_analyze, jpeg)))
+        for number, future in futures:
+            try:
+                text = future.result().strip()
+            except Exception as e:
+                print(f"[PDF] {number}페이지 OCR 실패: {e}")
+                continue
+            if text:
+                results.append((number, text))
+    finally:
+        # 렌더링 도중 실패하면 아직 시작하지 않은 분석은 공유 풀에서 빼 둠
+        for _, future in futures:
+            future.cancel()
+
+    if report is not None:
+        rendered = {number for number, _ in futures}
+        report.ocr_pages.extend(number for number, _ in results)
+        report.ocr_skipped_pages.extend(p for p in pages if p not in rendered)
+        report.ocr_ms += (time.perf_counter() - start) * 1000
+    return results
+
+
+def _check_pdf_libraries() -> None:
+    """PDF 라이브러리가 하나도 없으면 설치 안내와 함께 ImportError"""
     if not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
         error_msg = (
             "PDF 처리 라이브러리가 설치되지 않았습니다.\n"
@@ -43,52 +689,191 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
         error_msg += "다음 명령어로 설치해주세요:\n"
         error_msg += f"  {sys.executable} -m pip install pdfplumber PyPDF2"
         raise ImportError(error_msg)
-    
-    text_parts = []
-    last_error = None
-    
-    # pdfplumber 시도 (더 정확함)
-    if PDFPLUMBER_AVAILABLE:
-        try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text and page_text.strip():
-                            text_parts.append(page_text.strip())
-                    except Exception as e:
-                        # 특정 페이지 추출 실패는 무시하고 계속 진행
-                        continue
-            if text_parts:
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            last_error = f"pdfplumber 오류: {str(e)}"
-    
-    # PyPDF2 폴백
-    if PYPDF2_AVAILABLE:
-        try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-            for page_num, page in enumerate(pdf_reader.pages, 1):
+
+
+def _in_range(page: int, start_page: Optional[int], end_page: Optional[int]) -> bool:
+    """1부터 세는 페이지가 [start_page, end_page] 안에 있는지"""
+    return (start_page is None or page >= start_page) and (end_page is None or page <= end_page)
+
+
+# 예산이 있을 때 첫 묶음에서 워커 하나가 맡는 페이지 수 (페이지당 분량을 아직 모를 때)
+_BUDGET_PAGES_PER_WORKER = 2
+
+
+def _pages_needed(used: int, budget: Optional[int], pages_read: int) -> Optional[int]:
+    """지금까지 읽은 페이지의 평균 분량으로 추정한, 예산을 채우는 데 더 필요한 페이지 수 (모르면 None)"""
+    if budget is None or used <= 0 or pages_read <= 0:
+        return None
+    return max(1, -(-(budget - used) * pages_read // used))
+
+
+def _batch_pages(pending: List[int], budgeted: bool, workers: int, needed: Optional[int] = None) -> Tuple[List[int], int]:
+    """
+    한 번에 프로세스 풀로 보낼 페이지 묶음(앞에서부터)과 나눌 구간 수.
+    예산이 없으면 전부 보내고 PDF_PARALLEL_MIN_PAGES 이상일 때만 나눕니다.
+    예산이 있으면 예산을 채울 만큼(needed, 모르면 워커마다 몇 쪽)만 워커 수로 나눠 보내,
+    예산이 차면 나머지는 파싱하지 않게 합니다. 예산을 넘겨 추출하는 양은 묶음 하나를 넘지 않습니다.
+    """
+    if budgeted:
+        size = max(workers, needed) if needed is not None else workers * _BUDGET_PAGES_PER_WORKER
+        batch = pending[:size]
+        return batch, min(len(batch), workers)
+    if workers > 1 and len(pending) >= int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16")):
+        return pending, workers * 2
+    # 페이지가 적으면 구간을 나누지 않고 워커 하나에서 (타임아웃은 똑같이 적용)
+    return pending, 1
+
+
+def iter_pdf_pages(
+    pdf_bytes: Buffer,
+    start_page: Optional[int] = None,
+    end_page: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    report: Optional[PdfExtractionReport] = None,
+    content_hash: Optional[str] = None,
+    pdf_path: Optional[str] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    PDF 페이지 텍스트를 (페이지 번호, 텍스트)로 페이지 순서대로 하나씩 내보냅니다.
+
+    Args:
+        start_page, end_page: 읽을 페이지 범위 (1부터, 양 끝 포함)
+        max_chars: 누적 글자 수가 이 값에 도달하면 그 페이지까지 내보내고 멈춤
+        max_tokens: 누적 추정 토큰 수(estimate_tokens) 기준 예산
+        report: 주면 사전 검사 결과와 추출기별 시간을 기록
+        content_hash: 업로드를 받으며 이미 계산한 SHA-256 (캐시 키에 사용, 없으면 여기서 계산)
+        pdf_path: pdf_bytes와 내용이 같은 파일 (업로드 임시 파일 등). 주면 워커에 이 경로를 넘기고,
+            없으면 풀을 쓸 때 임시 파일을 한 번 만듭니다.
+
+    사전 검사에서 텍스트가 있는 페이지만 프로세스 풀 워커에서 추출합니다 (페이지 타임아웃 적용).
+    추출할 페이지가 PDF_POOL_MIN_PAGES보다 적으면 풀 없이 이 스레드에서 추출합니다.
+    예산이 없으면 남은 페이지를 한 번에 나눠 병렬로 추출합니다. 예산이 있으면 앞에서부터 묶음씩
+    병렬로 추출하고, 둘째 묶음부터는 읽은 페이지의 평균 분량으로 예산을 채울 만큼만 보내므로
+    예산이 일찍 차면 뒤쪽 페이지는 파싱하지 않습니다 (예산을 넘겨 추출하는 양은 묶음 하나 이내).
+    디스크 캐시에 있는 페이지는 추출 없이 캐시에서 바로 읽습니다.
+    """
+    if not pdf_bytes:
+        raise ValueError("PDF 파일이 비어있습니다.")
+    _check_pdf_libraries()
+    report = report if report is not None else PdfExtractionReport()
+    source = _PageSource(pdf_bytes, report, content_hash)
+    wanted = [page for page in report.text_pages if _in_range(page, start_page, end_page)]
+    budgeted = max_chars is not None or max_tokens is not None
+    workers = pdf_workers()
+    # 작은 PDF는 프로세스 생성/전달 비용이 추출보다 커서 풀을 쓰지 않음
+    use_pool = sum(1 for page in wanted if source.is_pending(page)) >= pdf_pool_min_pages()
+    # 워커가 열 파일은 처음 필요할 때 한 번만 만듦
+    files = ExitStack()
+    attempted: set = set()
+
+    used_chars = 0
+    used_tokens = 0
+    pages_read = 0
+    try:
+        for position, page in enumerate(wanted):
+            if use_pool and source.is_pending(page) and page not in attempted:
+                needed = [
+                    n for n in (
+                        _pages_needed(used_chars, max_chars, pages_read),
+                        _pages_needed(used_tokens, max_tokens, pages_read),
+                    ) if n is not None
+                ]
+                batch, shards = _batch_pages(
+                    [p for p in wanted[position:] if source.is_pending(p) and p not in attempted],
+                    budgeted,
+                    workers,
+                    min(needed) if needed else None,
+                )
+                attempted.update(batch)
+                if pdf_path is None:
+                    pdf_path = files.enter_context(_shared_pdf_file(pdf_bytes))
                 try:
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        text_parts.append(page_text.strip())
-                except Exception as e:
-                    # 특정 페이지 추출 실패는 무시하고 계속 진행
-                    continue
-            if text_parts:
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            if not last_error:
-                last_error = f"PyPDF2 오류: {str(e)}"
-    
-    # 두 방법 모두 실패
+                    # 시간 초과/오류로 실패한 페이지는 다시 시도하지 않음
+                    source.record(
+                        extract_pages_parallel(pdf_path, [p - 1 for p in batch], workers, report=report, shards=shards)
+                    )
+                except BrokenProcessPool:
+                    print("[PDF] 추출 프로세스가 비정상 종료되어 순차 추출로 전환")
+                    use_pool = False
+                    attempted.clear()
+            page_text = source.get(page, extract=not use_pool)
+            pages_read += 1
+            if not page_text:
+                continue
+            used_chars += len(page_text)
+            if max_tokens is not None:
+                used_tokens += estimate_tokens(page_text)
+            yield page, page_text
+            if max_chars is not None and used_chars >= max_chars:
+                return
+            if max_tokens is not None and used_tokens >= max_tokens:
+                return
+    finally:
+        source.close()
+        files.close()
+
+
+def _budget_reached(pages: List[Tuple[int, str]], max_chars: Optional[int], max_tokens: Optional[int]) -> bool:
+    if max_chars is not None and sum(len(text) for _, text in pages) >= max_chars:
+        return True
+    if max_tokens is not None and sum(estimate_tokens(text) for _, text in pages) >= max_tokens:
+        return True
+    return False
+
+
+def extract_text_from_pdf(
+    pdf_bytes: Buffer,
+    start_page: Optional[int] = None,
+    end_page: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    report: Optional[PdfExtractionReport] = None,
+    ocr_api_key: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    pdf_path: Optional[str] = None,
+) -> str:
+    """
+    PDF 파일에서 텍스트를 추출합니다.
+    사전 검사로 텍스트 페이지만 골라 페이지마다 PDF_BACKENDS 순서로 추출기를 시도합니다.
+    추출은 iter_pdf_pages로 하며 (작은 PDF는 이 스레드, 그 외는 프로세스 풀),
+    페이지가 PDF_PARALLEL_MIN_PAGES 이상이면 구간을 나눠 병렬로 합니다.
+    pdf_path(내용이 같은 파일)를 주면 워커에 그 경로를 넘겨 임시 파일을 따로 만들지 않습니다.
+    같은 PDF를 다시 받으면 디스크 캐시에서 읽어 PDF 라이브러리를 쓰지 않습니다.
+
+    페이지 범위나 분량 예산을 주면 필요한 페이지까지만 읽습니다 (예산이 있으면 묶음 단위로 병렬 추출).
+    ocr_api_key를 주면 이미지 전용 페이지는 Vision 분석으로 읽어 페이지 순서대로 끼워 넣습니다
+    (텍스트 페이지만으로 예산이 이미 찼으면 생략).
+
+    pdf_bytes는 bytes 외에 mmap/memoryview도 받으며, 복사하지 않고 필요한 부분만 읽습니다.
+    """
+    if not pdf_bytes or len(pdf_bytes) == 0:
+        raise ValueError("PDF 파일이 비어있습니다.")
+    _check_pdf_libraries()
+    report = report if report is not None else PdfExtractionReport()
+
+    pages = list(iter_pdf_pages(pdf_bytes, start_page, end_page, max_chars, max_tokens, report, content_hash, pdf_path))
+
+    image_pages = [p for p in report.image_only_pages if _in_range(p, start_page, end_page)]
+    if ocr_api_key and image_pages and not _budget_reached(pages, max_chars, max_tokens):
+        if PDFIUM_AVAILABLE:
+            pages = sorted(pages + ocr_image_only_pages(pdf_bytes, image_pages, ocr_api_key, report=report))
+        else:
+            print("[PDF] pypdfium2가 없어 이미지 전용 페이지 OCR을 건너뜀")
+    print(f"[PDF] {report.summary()}")
+
+    if pages:
+        return "\n\n".join(text for _, text in pages)
+
     error_msg = "PDF에서 텍스트를 추출할 수 없습니다."
-    if last_error:
-        error_msg += f" ({last_error})"
-    if not text_parts:
+    if report.image_only_pages and not report.text_pages:
+        error_msg += " PDF가 이미지로만 구성되어 있습니다 (스캔본)."
+        if ocr_api_key:
+            error_msg += " 페이지 이미지 분석에서도 내용을 얻지 못했습니다."
+    elif start_page is not None or end_page is not None:
+        error_msg += " 지정한 페이지에 텍스트가 없습니다."
+    else:
         error_msg += " PDF 파일이 텍스트를 포함하지 않거나 이미지로만 구성되어 있을 수 있습니다."
-    
     raise RuntimeError(error_msg)
 
 
@@ -11,26 +11,84 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+import asyncio
 import base64
+import hmac
+import json
+import threading
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List
 
-from src.core.mureka_utils import find_audio_urls
+from src.core.audio_response import AudioFileResponse, audio_serve_stats
+from src.core.completion_cache import completion_cache_stats, normalize_text
+from src.core.http_transport import aclose_async_client
+from src.core.job_store import JobStore
+from src.core.openai_clients import aclose_openai_clients, close_openai_clients, get_openai_client
+from src.core.pdf_text_cache import get_pdf_text_cache
+from src.core.result_cache import all_cache_stats, make_cache_key
+from src.core.job_worker import JobWorker
+from src.core.mureka_utils import collect_track_audio_urls
+from src.core.single_flight import run_coalesced, single_flight_stats
+from src.core.song_library import SongLibrary, archive_when_done, audio_digest, open_song_library, song_key
+from src.core.stage_executor import run_in_stage, shutdown_stage_executors
+from src.core.summarizer import summarize_long_text
+from src.core.suno_poller import SunoPoller
+from src.core.upload_spool import MemoryProbe, UploadTooLarge, spool_stream, spool_upload, upload_limit_bytes
 from src.core.workflow import (
-    build_suno_request,
-    create_mnemonic_plan,
+    PlanStreamCancelled,
+    create_lyrics_and_plan,
+    extract_study_text,
     extract_study_text_from_base64,
-    request_suno_song,
+    mnemonic_plan_mode,
+    prepare_suno_payload,
+    request_suno_song_coalesced,
+    stream_lyrics_and_plan,
 )
 from src.image_analyzer import analyze_multiple_images
-from src.pdf_processor import extract_text_from_pdf, is_pdf_file
+from src.image_dedup import recent_index_stats
+from src.image_preprocessor import prepare_image_for_vision, summarize_preparation
+from src.pdf_processor import extract_text_from_pdf, is_pdf_file, shutdown_pdf_process_pool
+from src.compose_prompt import MAX_LYRICS_LENGTH, callbacks_enabled
+from src.suno_client import parse_callback
 
 load_dotenv()
 
-app = FastAPI(title="학습용 멜로디 생성 API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 진행 중인 Suno 작업을 하나의 루프에서 조회하는 폴러
+    app.state.suno_poller = SunoPoller.from_env()
+    # 작업 저장소와 백그라운드 워커 (JOB_WORKER_ENABLED=0이면 API만 제공)
+    app.state.job_store = JobStore()
+    # 생성한 노래 보관함 (SONG_LIBRARY_ENABLED=0이면 None)와 보관(오디오 내려받기) 중인 작업
+    app.state.song_library = open_song_library()
+    app.state.library_tasks = {}
+    app.state.job_worker = None
+    if os.getenv("JOB_WORKER_ENABLED", "1") != "0":
+        app.state.job_worker = JobWorker(app.state.job_store, app.state.suno_poller, library=app.state.song_library)
+        app.state.job_worker.start()
+    yield
+    if app.state.job_worker is not None:
+        await app.state.job_worker.stop()
+    archive_tasks = list(app.state.library_tasks.values())
+    for task in archive_tasks:
+        task.cancel()
+    await asyncio.gather(*archive_tasks, return_exceptions=True)
+    await app.state.suno_poller.close()
+    await aclose_async_client()
+    await aclose_openai_clients()
+    close_openai_clients()
+    # 단계별 스레드 풀과 PDF 추출 프로세스 정리
+    shutdown_stage_executors()
+    shutdown_pdf_process_pool()
+
+
+app = FastAPI(title="학습용 멜로디 생성 API", lifespan=lifespan)
 
 # CORS 설정: 웹 프론트엔드에서 접근 가능하도록
 app.add_middleware(
@@ -42,6 +100,23 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Content-Length가 업로드 한도 합계(PDF 1개 + 이미지 5장)를 넘으면 본문을 받기 전에 413.
+    파일별 한도는 extract_from_files에서 임시 파일로 받으며 다시 확인합니다.
+    """
+    if request.url.path == "/extract-from-files":
+        limit = upload_limit_bytes("pdf") + 5 * upload_limit_bytes("image") + 1024 * 1024
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > limit:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"업로드가 너무 큽니다 (최대 {limit // (1024 * 1024)}MB)"},
+            )
+    return await call_next(request)
+
+
 class ExtractTextRequest(BaseModel):
     image_base64: str
 
@@ -56,11 +131,13 @@ class MnemonicPlanRequest(BaseModel):
 
 class MnemonicPlanResponse(BaseModel):
     mnemonic_plan: str
+    final_lyrics: Optional[str] = None
 
 
 class GenerateSongRequest(BaseModel):
     study_text: str
     mnemonic_plan: str
+    final_lyrics: Optional[str] = None
     wait_for_audio: bool = True
 
 
@@ -70,6 +147,39 @@ class GenerateSongResponse(BaseModel):
     status: str = "completed"
 
 
+class CreateJobRequest(BaseModel):
+    study_text: str
+    mnemonic_plan: str
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    task_id: Optional[str] = None
+    audio_urls: list[str] = []
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+def _job_audio_url(request: Request, url: str) -> str:
+    """작업 결과에 저장된 보관함 경로(/audio/{digest})를 /generate-song과 같은 절대 URL로"""
+    digest = audio_digest(url)
+    return str(request.url_for("get_audio", digest=digest)) if digest else url
+
+
+def _job_response(job: Dict[str, Any], request: Request) -> JobResponse:
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        task_id=job["task_id"],
+        audio_urls=[_job_audio_url(request, url) for url in job["audio_urls"]],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+    )
+
+
 def get_openai_key() -> str:
     key = os.getenv("OPENAI_API_KEY")
     if not key:
@@ -86,7 +196,9 @@ async def extract_text(req: ExtractTextRequest) -> ExtractTextResponse:
     """이미지(base64)에서 학습용 텍스트 추출"""
     try:
         api_key = get_openai_key()
-        study_text = extract_study_text_from_base64(req.image_base64, api_key)
+        # 같은 이미지로 동시에 들어온 요청은 Vision 호출 하나를 함께 기다림
+        key = make_cache_key("extract-text", api_key, req.image_base64)
+        study_text = await run_coalesced("vision", key, extract_study_text_from_base64, req.image_base64, api_key)
         if not study_text.strip():
             raise HTTPException(status_code=400, detail="텍스트를 추출하지 못했습니다.")
         return ExtractTextResponse(study_text=study_text)
@@ -94,11 +206,85 @@ async def extract_text(req: ExtractTextRequest) -> ExtractTextResponse:
         raise HTTPException(status_code=500, detail=f"텍스트 추출 실패: {str(e)}")
 
 
+@app.post("/extract-text/raw", response_model=ExtractTextResponse)
+async def extract_text_raw(request: Request) -> ExtractTextResponse:
+    """
+    이미지 원본 바이트(요청 본문 그대로, Content-Type: image/*)에서 학습용 텍스트 추출.
+    JSON + base64인 /extract-text보다 본문이 약 1/3 작고, 본문을 임시 파일로 받아
+    디코딩/재인코딩 사본 없이 Vision 호출 직전에 한 번만 base64로 바꿉니다.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type and not (content_type.startswith("image/") or content_type == "application/octet-stream"):
+        raise HTTPException(status_code=415, detail=f"이미지 본문이 아닙니다: {content_type}")
+    limit = upload_limit_bytes("image")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413, detail=str(UploadTooLarge("image", limit)))
+
+    try:
+        upload = await spool_stream(request.stream(), "image", content_type or None, limit)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    handed_over = False
+    try:
+        if upload.size == 0:
+            raise HTTPException(status_code=400, detail="이미지 본문이 비어있습니다.")
+        api_key = get_openai_key()
+        # 임시 파일은 이 요청이 취소돼도 Vision 호출이 끝난 뒤에 정리 (release)
+        handed_over = True
+        study_text = await run_coalesced(
+            "vision",
+            make_cache_key("extract-text", api_key, upload.sha256),
+            extract_study_text,
+            upload.buffer(),
+            api_key,
+            release=upload.close,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"텍스트 추출 실패: {str(e)}")
+    finally:
+        if not handed_over:
+            upload.close()
+    if not study_text.strip():
+        raise HTTPException(status_code=400, detail="텍스트를 추출하지 못했습니다.")
+    return ExtractTextResponse(study_text=study_text)
+
+
+def parse_page_range(value: Optional[str]) -> tuple:
+    """페이지 범위 문자열("3-12", "5", "10-")을 (시작, 끝)으로 변환 (비어 있으면 None)"""
+    if not value or not value.strip():
+        return None, None
+    start, sep, end = value.strip().partition("-")
+    try:
+        start_page = int(start) if start.strip() else None
+        end_page = (int(end) if end.strip() else None) if sep else start_page
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"잘못된 페이지 범위입니다: {value} (예: 3-12)")
+    if start_page is not None and end_page is not None and start_page > end_page:
+        raise HTTPException(status_code=400, detail=f"잘못된 페이지 범위입니다: {value} (예: 3-12)")
+    return start_page, end_page
+
+
+def pdf_text_budget() -> int:
+    """PDF에서 읽을 최대 글자 수 (PDF_TEXT_BUDGET, 기본 가사 한도의 4배)"""
+    return int(os.getenv("PDF_TEXT_BUDGET", str(MAX_LYRICS_LENGTH * 4)))
+
+
 @app.post("/extract-from-files", response_model=ExtractTextResponse)
-async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractTextResponse:
+async def extract_from_files(
+    files: List[UploadFile] = File(...),
+    pdf_pages: Optional[str] = Form(None),
+) -> ExtractTextResponse:
     """
     다중 파일(이미지 최대 5장, PDF 1개)에서 학습용 텍스트 추출 및 종합
+    pdf_pages(예: "3-12")를 주면 PDF는 그 범위만 읽습니다.
+    PDF는 PDF_TEXT_BUDGET 글자가 모이면 나머지 페이지를 파싱하지 않습니다.
+    업로드는 임시 파일로 받아 mmap으로 읽고, 요청 동안의 최고 RSS를 로그로 남깁니다.
     """
+    probe = MemoryProbe().start()
+    spooled = []
     try:
         if not files:
             raise HTTPException(status_code=400, detail="파일이 업로드되지 않았습니다.")
@@ -126,18 +312,34 @@ async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractText
         
         api_key = get_openai_key()
         all_texts = []
+        start_page, end_page = parse_page_range(pdf_pages)
+
+        # 업로드를 청크 단위로 임시 파일에 받기 (한도를 넘으면 읽는 도중 중단)
+        try:
+            for kind, group in (("pdf", pdfs), ("image", images)):
+                for file in group:
+                    spooled.append(await spool_upload(file, upload_limit_bytes(kind)))
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        pdf_uploads = spooled[:len(pdfs)]
+        image_uploads = spooled[len(pdfs):]
+        probe.sample("수신")
         
         # PDF 처리
-        for pdf_file in pdfs:
+        for pdf_file, pdf_upload in zip(pdfs, pdf_uploads):
             try:
-                pdf_bytes = await pdf_file.read()
-                if not pdf_bytes or len(pdf_bytes) == 0:
+                if pdf_upload.size == 0:
                     raise HTTPException(
                         status_code=400,
                         detail=f"PDF 파일이 비어있습니다: {pdf_file.filename}"
                     )
                 
-                pdf_text = extract_text_from_pdf(pdf_bytes)
+                pdf_text = await run_in_stage(
+                    "pdf", extract_text_from_pdf, pdf_upload.buffer(),
+                    start_page=start_page, end_page=end_page, max_chars=pdf_text_budget(),
+                    ocr_api_key=api_key, content_hash=pdf_upload.sha256, pdf_path=pdf_upload.path,
+                )
+                probe.sample("PDF")
                 if pdf_text.strip():
                     all_texts.append(f"[PDF: {pdf_file.filename}]\n{pdf_text}")
                 else:
@@ -146,6 +348,8 @@ async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractText
                         detail=f"PDF 파일에서 텍스트를 추출하지 못했습니다: {pdf_file.filename}. "
                                "이미지로만 구성된 PDF이거나 텍스트가 없는 PDF일 수 있습니다."
                     )
+            except HTTPException:
+                raise
             except ImportError as e:
                 raise HTTPException(
                     status_code=500,
@@ -167,24 +371,36 @@ async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractText
         
         # 이미지 처리
         if images:
-            image_b64_list = []
-            for img_file in images:
-                img_bytes = await img_file.read()
-                img_b64 = base64.b64encode(img_bytes).decode("utf-8")
-                image_b64_list.append(img_b64)
+            # 실제 형식 판별 + 축소/재압축 (이미지별 병렬, 원본은 임시 파일 mmap에서 읽음)
+            prepared = await asyncio.gather(
+                *(run_in_stage("vision", prepare_image_for_vision, up.buffer()) for up in image_uploads)
+            )
+            probe.sample("이미지 전처리")
+            report = summarize_preparation(prepared)
+            print(
+                f"[이미지] {report['images']}장 {report['original_bytes']:,}B → {report['processed_bytes']:,}B "
+                f"(전처리 {report['preprocess_ms']}ms, 업로드 약 {report['upload_ms_saved']}ms 절약)"
+            )
+            image_b64_list = [base64.b64encode(im.data).decode("utf-8") for im in prepared]
+            mime_types = [im.mime_type for im in prepared]
             
             # 여러 이미지 분석 및 종합
             if len(image_b64_list) == 1:
                 # 단일 이미지: 간단한 분석
-                from src.image_analyzer import analyze_image_for_education
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                img_text = analyze_image_for_education(image_b64_list[0], client)
+                from src.image_analyzer import analyze_image_with_dedup
+                client = get_openai_client(api_key)
+                img_text = await run_in_stage(
+                    "vision", analyze_image_with_dedup, image_b64_list[0], client,
+                    mime_type=mime_types[0], image_hash=prepared[0].phash,
+                )
                 if img_text.strip():
                     all_texts.append(f"[이미지: {images[0].filename}]\n{img_text}")
             else:
                 # 다중 이미지: 종합 분석
-                img_text = analyze_multiple_images(image_b64_list, api_key)
+                img_text = await run_in_stage(
+                    "vision", analyze_multiple_images, image_b64_list, api_key,
+                    mime_types=mime_types, image_hashes=[im.phash for im in prepared],
+                )
                 if img_text.strip():
                     all_texts.append(f"[이미지 {len(images)}장 종합]\n{img_text}")
         
@@ -195,35 +411,29 @@ async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractText
         if len(all_texts) == 1:
             study_text = all_texts[0]
         else:
-            # 여러 파일 내용을 종합하여 요약
+            # 여러 파일 내용을 종합하여 요약 (길면 청크별로 나눠 요약한 뒤 종합)
             combined_text = "\n\n".join(all_texts)
-            
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-            
-            summary_prompt = f"""다음은 여러 학습 자료(이미지, PDF)에서 추출한 내용입니다.
+
+            def build_summary_prompt(material: str) -> str:
+                return f"""다음은 여러 학습 자료(이미지, PDF)에서 추출한 내용입니다.
 이 내용들을 종합하여 하나의 일관된 학습 자료로 정리해주세요.
 중복되는 내용은 제거하고, 핵심 내용만 간결하게 정리해주세요.
 노래 가사로 만들 수 있도록 자연스러운 문장으로 작성해주세요.
 
 [추출된 내용]
-{combined_text}
+{material}
 
 [요약된 학습 자료]"""
 
             try:
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "너는 교육 자료 요약 전문가입니다. 여러 자료를 종합하여 학습자가 쉽게 외울 수 있는 형태로 정리해줍니다."
-                        },
-                        {"role": "user", "content": summary_prompt},
-                    ],
-                    temperature=0.5,
+                study_text = await run_in_stage(
+                    "llm",
+                    summarize_long_text,
+                    combined_text,
+                    api_key,
+                    build_summary_prompt,
+                    "너는 교육 자료 요약 전문가입니다. 여러 자료를 종합하여 학습자가 쉽게 외울 수 있는 형태로 정리해줍니다.",
                 )
-                study_text = resp.choices[0].message.content.strip()
             except Exception:
                 # 요약 실패 시 원본 텍스트 반환
                 study_text = combined_text
@@ -237,29 +447,107 @@ async def extract_from_files(files: List[UploadFile] = File(...)) -> ExtractText
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 처리 실패: {str(e)}")
+    finally:
+        for upload in spooled:
+            upload.close()
+        probe.stop()
+        received = sum(upload.size for upload in spooled)
+        print(f"[업로드] 파일 {len(spooled)}개 {received:,}B, {probe.summary()}")
 
 
 @app.post("/mnemonic-plan", response_model=MnemonicPlanResponse)
 async def mnemonic_plan(req: MnemonicPlanRequest) -> MnemonicPlanResponse:
-    """학습 텍스트로부터 가사를 먼저 생성하고, 그 가사를 포함한 멜로디 가이드 생성"""
+    """
+    학습 텍스트로부터 가사와 그 가사를 포함한 멜로디 가이드 생성.
+    기본은 JSON 스키마 응답 한 번으로 둘 다 받고, 실패하면 가사 → 가이드 두 번 호출로 대체합니다.
+    final_lyrics를 /generate-song에 그대로 넘기면 가이드에서 가사를 다시 추출하지 않습니다.
+    """
     try:
         api_key = get_openai_key()
-        
-        # 1. 가사를 먼저 생성
-        from src.lyrics_generator import generate_lyrics
-        final_lyrics = generate_lyrics(req.study_text, api_key)
-        
-        # 2. 생성된 가사를 포함하여 멜로디 가이드 생성
-        plan = create_mnemonic_plan(req.study_text, api_key, final_lyrics=final_lyrics)
-        
-        return MnemonicPlanResponse(mnemonic_plan=plan)
+        key = make_cache_key("mnemonic-plan", mnemonic_plan_mode(), api_key, normalize_text(req.study_text))
+        plan, final_lyrics = await run_coalesced("llm", key, create_lyrics_and_plan, req.study_text, api_key)
+        return MnemonicPlanResponse(mnemonic_plan=plan, final_lyrics=final_lyrics)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"멜로디 가이드 생성 실패: {str(e)}")
 
 
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+@app.post("/mnemonic-plan/stream")
+async def mnemonic_plan_stream(req: MnemonicPlanRequest) -> StreamingResponse:
+    """
+    /mnemonic-plan의 Server-Sent Events 버전.
+    항목(요약 포인트, 리듬, 음 높이, ...)이 완성될 때마다 `section` 이벤트를 보내고,
+    마지막 `done` 이벤트에는 /mnemonic-plan과 같은 mnemonic_plan/final_lyrics가 들어 있습니다.
+    스트리밍 도중 실패해 두 번 호출로 대체하면 `reset` 이벤트를 먼저 보냅니다 (이미 받은 항목은 버려야 함).
+    실패하면 `error` 이벤트(detail)로 끝납니다.
+    """
+    api_key = get_openai_key()
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    disconnected = threading.Event()
+
+    def on_section(key: str, text: str) -> None:
+        if disconnected.is_set():
+            raise PlanStreamCancelled()
+        loop.call_soon_threadsafe(queue.put_nowait, ("section", {"key": key, "text": text}))
+
+    def on_reset() -> None:
+        if disconnected.is_set():
+            raise PlanStreamCancelled()
+        loop.call_soon_threadsafe(queue.put_nowait, ("reset", {}))
+
+    async def produce() -> None:
+        try:
+            plan, final_lyrics = await run_in_stage(
+                "llm", stream_lyrics_and_plan, req.study_text, api_key, on_section, on_reset=on_reset
+            )
+            await queue.put(("done", {"mnemonic_plan": plan, "final_lyrics": final_lyrics}))
+        except PlanStreamCancelled:
+            pass
+        except Exception as e:
+            await queue.put(("error", {"detail": f"멜로디 가이드 생성 실패: {str(e)}"}))
+
+    async def events():
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield _sse(event, data)
+                if event in ("done", "error"):
+                    break
+        finally:
+            # 클라이언트가 끊으면 다음 항목에서 스트리밍을 멈추게 함
+            disconnected.set()
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _schedule_archive(library: SongLibrary, key: str, payload: Dict[str, Any], task_id: str) -> asyncio.Task:
+    """task_id가 완료되면 트랙 오디오를 보관함에 내려받는 백그라운드 작업 (task_id마다 하나)"""
+    tasks: Dict[str, asyncio.Task] = app.state.library_tasks
+    if task_id in tasks:
+        return tasks[task_id]
+    task = asyncio.create_task(archive_when_done(library, app.state.suno_poller, key, payload, task_id))
+    tasks[task_id] = task
+    task.add_done_callback(lambda _: tasks.pop(task_id, None))
+    return task
+
+
 @app.post("/generate-song", response_model=GenerateSongResponse)
-async def generate_song(req: GenerateSongRequest) -> GenerateSongResponse:
-    """Suno API를 사용해 노래 생성"""
+async def generate_song(req: GenerateSongRequest, request: Request) -> GenerateSongResponse:
+    """
+    Suno API를 사용해 노래 생성.
+    같은 가사로 만든 곡이 노래 보관함에 있으면 생성하지 않고 보관된 오디오(/audio/{digest}) 주소를 바로 반환합니다.
+    """
     suno_key = get_suno_key()
     if not suno_key:
         raise HTTPException(status_code=500, detail="SUNO_API_KEY가 설정되지 않았습니다.")
@@ -268,26 +556,54 @@ async def generate_song(req: GenerateSongRequest) -> GenerateSongResponse:
         # OpenAI API 키를 가져와서 가사 길이 제한 시 요약에 사용
         openai_key = get_openai_key()
         
-        # 멜로디 가이드에서 최종 가사 추출
-        from src.lyrics_extractor import extract_final_lyrics
-        final_lyrics = extract_final_lyrics(req.mnemonic_plan)
-        if not final_lyrics:
-            # 추출 실패 시 가사를 다시 생성
-            from src.lyrics_generator import generate_lyrics
-            final_lyrics = generate_lyrics(req.study_text, openai_key)
-        
-        payload = build_suno_request(req.study_text, req.mnemonic_plan, final_lyrics=final_lyrics, api_key=openai_key)
-        result = request_suno_song(payload, suno_key, wait=req.wait_for_audio)
-
-        # Suno 응답에서 오디오 URL 추출
-        audio_urls = []
-        if "tracks" in result:
-            for track in result["tracks"]:
-                if "audioUrl" in track and track["audioUrl"]:
-                    audio_urls.append(track["audioUrl"])
-        # fallback: 기존 find_audio_urls도 시도
-        if not audio_urls:
-            audio_urls = find_audio_urls(result)
+        # 멜로디 가이드에서 최종 가사 추출 (실패 시 재생성, 길면 요약) 후 페이로드 구성
+        payload = await run_in_stage(
+            "llm", prepare_suno_payload, req.study_text, req.mnemonic_plan, openai_key, req.final_lyrics
+        )
+        # 같은 가사(정규화 지문) + 스타일 + 모델로 만든 곡이 보관함에 있으면 생성하지 않음
+        library: Optional[SongLibrary] = app.state.song_library
+        entry = None
+        library_key = None
+        if library is not None:
+            library_key = song_key(payload)
+            entry = await run_in_stage("library", library.lookup, library_key)
+            if entry is not None and entry["status"] == "ready":
+                print(f"[보관함] 보관된 곡 재사용 (task {entry['task_id']})")
+                return GenerateSongResponse(
+                    task_id=entry["task_id"],
+                    audio_urls=[str(request.url_for("get_audio", digest=t["digest"])) for t in entry["tracks"]],
+                    status="completed",
+                )
+
+        if entry is not None:
+            # 같은 곡을 생성 중: 새로 요청하지 않고 그 작업의 완료를 함께 기다림
+            result = {"id": entry["task_id"]}
+        else:
+            # 생성 요청만 스레드에서 보내고, 완료 대기는 통합 폴러에 맡김
+            # 같은 페이로드의 동시 요청(작업 워커 포함)은 Suno 작업 하나를 함께 받음 (완료 대기는 폴러가 task_id별로 공유)
+            # 요청이 모두 끊겨도 Suno 작업은 이미 만들어졌을 수 있으므로, 보관 예약은 작업이 끝난 뒤 on_result에서 해
+            # 생성된 곡을 잃지 않음
+            result = await request_suno_song_coalesced(
+                payload,
+                suno_key,
+                library,
+                library_key,
+                on_result=(lambda created: _schedule_archive(library, library_key, payload, created["id"]))
+                if library is not None
+                else None,
+            )
+        archive_task = _schedule_archive(library, library_key, payload, result["id"]) if library is not None else None
+        if req.wait_for_audio:
+            result = await app.state.suno_poller.wait(result["id"])
+
+        # Suno 응답에서 오디오 URL 추출 (tracks 우선, 실패 시 전체 탐색)
+        audio_urls = collect_track_audio_urls(result)
+        if req.wait_for_audio and archive_task is not None:
+            # 보관이 끝나면 만료되는 업스트림 URL 대신 로컬 오디오 주소로 응답 (보관 실패 시 업스트림 URL 그대로)
+            # shield: 이 요청이 끊겨도 보관은 계속
+            tracks = await asyncio.shield(archive_task)
+            if tracks:
+                audio_urls = [str(request.url_for("get_audio", digest=t["digest"])) for t in tracks]
 
         if req.wait_for_audio:
             return GenerateSongResponse(
@@ -305,6 +621,84 @@ async def generate_song(req: GenerateSongRequest) -> GenerateSongResponse:
         raise HTTPException(status_code=500, detail=f"노래 생성 실패: {str(e)}")
 
 
+@app.api_route("/audio/{digest}", methods=["GET", "HEAD"], name="get_audio")
+async def get_audio(digest: str) -> AudioFileResponse:
+    """
+    노래 보관함에 내려받아 둔 오디오 (내용 SHA-256 주소라 내용이 바뀌지 않음).
+    Range(탐색), If-None-Match(304)를 지원하고, 본문은 zero-copy 또는 mmap으로 보냅니다 (audio_response 참고).
+    """
+    library: Optional[SongLibrary] = app.state.song_library
+    if library is None:
+        raise HTTPException(status_code=404, detail=f"보관된 오디오가 없습니다: {digest}")
+    # 같은 파일의 Range 요청이 잇따르므로 한 번 찾은 정보는 스레드를 거치지 않고 바로 사용
+    blob = library.cached_blob(digest) or await run_in_stage("library", library.blob, digest)
+    if blob is None:
+        raise HTTPException(status_code=404, detail=f"보관된 오디오가 없습니다: {digest}")
+    return AudioFileResponse(
+        blob["path"],
+        digest,
+        media_type=blob["content_type"],
+        cache_control="public, max-age=31536000, immutable",
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(req: CreateJobRequest, request: Request) -> JobResponse:
+    """노래 생성 작업을 등록하고 즉시 반환 (진행 상황은 GET /jobs/{job_id}로 확인)"""
+    if not get_suno_key():
+        raise HTTPException(status_code=500, detail="SUNO_API_KEY가 설정되지 않았습니다.")
+
+    job = await run_in_stage("jobs", app.state.job_store.create_job, req.study_text, req.mnemonic_plan)
+    if app.state.job_worker is not None:
+        app.state.job_worker.notify()
+    return _job_response(job, request)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, request: Request) -> JobResponse:
+    """노래 생성 작업의 상태와 오디오 URL 조회"""
+    job = await run_in_stage("jobs", app.state.job_store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return _job_response(job, request)
+
+
+@app.post("/callbacks/suno")
+async def suno_callback(request: Request, token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Suno 완료 통지(callBackUrl) 수신
+    SUNO_CALLBACK_URL을 이 주소로, SUNO_CALLBACK_TOKEN을 ?token= 값으로 설정하면
+    폴링 주기를 기다리지 않고 대기 중인 요청/작업을 바로 깨웁니다 (토큰이 없으면 콜백을 받지 않음).
+    콜백 본문은 깨우는 신호로만 쓰고, 결과는 record-info를 다시 조회해 확인합니다.
+    """
+    if not callbacks_enabled():
+        raise HTTPException(status_code=404, detail="완료 콜백이 설정되어 있지 않습니다.")
+    if not hmac.compare_digest((token or "").encode(), os.getenv("SUNO_CALLBACK_TOKEN", "").encode()):
+        raise HTTPException(status_code=403, detail="콜백 토큰이 일치하지 않습니다.")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="콜백 본문이 JSON이 아닙니다.")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="콜백 본문 형식이 올바르지 않습니다.")
+
+    task_id, status, _ = parse_callback(body)
+    if not task_id:
+        raise HTTPException(status_code=400, detail="콜백에서 task_id를 찾지 못했습니다.")
+
+    # 이 서버가 요청한 작업인지 확인 (대기 중인 요청 또는 작업 저장소)
+    poller: SunoPoller = app.state.suno_poller
+    if not poller.is_pending(task_id):
+        job = await run_in_stage("jobs", app.state.job_store.find_by_task_id, task_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 작업입니다: {task_id}")
+
+    # 작업은 기다리는 워커(다른 프로세스일 수 있음)가 조회 결과로 직접 완료/실패 처리
+    woken = status in ("SUCCESS", "FAILED") and poller.poll_now(task_id)
+    return {"status": "ok", "task_id": task_id, "callback_status": status, "woken": woken}
+
+
 @app.get("/")
 async def root() -> Dict[str, Any]:
     """루트 엔드포인트: API 정보 제공"""
@@ -313,15 +707,41 @@ async def root() -> Dict[str, Any]:
         "version": "1.0.0",
         "endpoints": {
             "POST /extract-text": "이미지에서 텍스트 추출",
+            "POST /extract-text/raw": "이미지 원본 바이트(본문 그대로)에서 텍스트 추출",
             "POST /extract-from-files": "다중 파일(이미지/PDF)에서 텍스트 추출 및 종합",
             "POST /mnemonic-plan": "멜로디 가이드 생성",
-            "POST /generate-song": "Suno 노래 생성",
+            "POST /mnemonic-plan/stream": "멜로디 가이드 생성 (SSE, 항목별로 전송)",
+            "POST /generate-song": "Suno 노래 생성 (같은 가사로 만든 곡은 보관함에서 재사용)",
+            "GET /audio/{digest}": "노래 보관함에 보관된 오디오 (Range/ETag 지원)",
+            "POST /jobs": "노래 생성 작업 등록 (비동기)",
+            "GET /jobs/{job_id}": "노래 생성 작업 상태 조회",
+            "POST /callbacks/suno": "Suno 완료 통지 수신",
+            "GET /cache-stats": "결과 캐시/유사 이미지 색인/PDF 추출/LLM 응답 캐시/동시 요청 합치기/노래 보관함/오디오 전송 통계",
             "GET /health": "헬스 체크",
         },
         "docs": "/docs",
     }
 
 
+@app.get("/cache-stats")
+async def cache_stats() -> Dict[str, Any]:
+    """
+    결과 캐시(OCR, 이미지 분석 등), 유사 이미지 색인, PDF 추출 캐시, LLM 응답 캐시(사용 시)의 적중/실패 통계와
+    단계별 동시 요청 합치기(업스트림 호출 1회가 응답한 요청 수) 통계, 노래 보관함(사용 시) 재사용 통계,
+    /audio 응답(상태 코드별, 전송 방식별) 통계
+    """
+    library: Optional[SongLibrary] = app.state.song_library
+    return {
+        **all_cache_stats(),
+        "image-dedup": recent_index_stats(),
+        "pdf-text": get_pdf_text_cache().stats(),
+        "llm-completion": completion_cache_stats(),
+        "single-flight": single_flight_stats(),
+        "song-library": await run_in_stage("library", library.stats) if library is not None else None,
+        "audio-serving": audio_serve_stats(),
+    }
+
+
 @app.get("/health")
 async def health() -> Dict[str, str]:
     """헬스 체크 엔드포인트"""
@@ -1,8 +1,92 @@
+import os
 import time
 from typing import Any, Dict, Tuple, Optional, List
 
+import httpx
 import requests
 
+from src.core.http_transport import async_request, get_session
+
+DEFAULT_SUNO_BASE_URL = "https://api.sunoapi.org/api/v1"
+
+SUCCESS_STATUSES = {"SUCCESS", "DONE", "COMPLETED"}
+FAILED_STATUSES = {"FAILED", "ERROR"}
+
+
+def poll_delay(poll_interval: float, attempt: int, max_delay: float = 8.0) -> float:
+    """점진적 백오프 (기본 최대 8초)"""
+    return min(poll_interval * (1 + attempt * 0.25), max_delay)
+
+
+def parse_record_info(st: dict) -> Tuple[Optional[str], Optional[List[dict]]]:
+    """
+    상태 문자열과 결과 아이템 리스트를 다양한 스키마에서 추출.
+    """
+    data_field = st.get("data") or {}
+
+    # 상태 문자열 후보
+    status = (
+        data_field.get("status")
+        or st.get("status")
+        or data_field.get("taskStatus")
+        or st.get("taskStatus")
+    )
+
+    # 결과 blob
+    resp = data_field.get("response")  # dict 또는 None
+    raw = None
+    if isinstance(resp, dict):
+        raw = resp.get("sunoData") or resp.get("data") or resp.get("songs")
+    if raw is None:
+        raw = data_field.get("sunoData") or data_field.get("data") or st.get("result")
+
+    # raw 정규화: list로
+    if isinstance(raw, dict):
+        raw = [raw]
+    if raw is not None and not isinstance(raw, list):
+        raw = None
+
+    # 아이템 정규화: 공통 키로 맞춤
+    items = None
+    if raw:
+        items = []
+        for it in raw:
+            if not isinstance(it, dict):
+                continue
+            items.append({
+                "id": it.get("id") or it.get("musicId") or it.get("songId"),
+                "title": it.get("title") or data_field.get("title") or "Learning Song",
+                "audioUrl": (
+                    it.get("audioUrl") or it.get("sourceAudioUrl") or it.get("streamAudioUrl")
+                    or it.get("audio_url") or it.get("source_audio_url") or it.get("stream_audio_url")
+                ),
+                "imageUrl": it.get("imageUrl") or it.get("coverUrl") or it.get("image_url"),
+                "raw": it,
+            })
+        if not items:
+            items = None
+
+    return status, items
+
+
+def parse_callback(body: dict) -> Tuple[Optional[str], Optional[str], Optional[List[dict]]]:
+    """
+    callBackUrl로 들어온 Suno 콜백 본문에서 (task_id, 상태, 트랙 목록)을 추출.
+    callbackType: text(가사 완료) → TEXT_SUCCESS, first(첫 곡 완료) → FIRST_SUCCESS,
+    complete(전체 완료) → SUCCESS, error 또는 code != 200 → FAILED
+    """
+    data_field = body.get("data") or {}
+    task_id = data_field.get("task_id") or data_field.get("taskId") or body.get("task_id") or body.get("taskId")
+
+    callback_type = (data_field.get("callbackType") or data_field.get("callback_type") or "").lower()
+    if callback_type == "error" or (body.get("code") and body["code"] != 200):
+        status = "FAILED"
+    else:
+        status = {"text": "TEXT_SUCCESS", "first": "FIRST_SUCCESS", "complete": "SUCCESS"}.get(callback_type)
+
+    _, items = parse_record_info(body)
+    return (str(task_id) if task_id else None), status, items
+
 
 class SunoClient:
     """
@@ -14,13 +98,13 @@ class SunoClient:
     def __init__(
         self,
         api_key: str,
-        base_url: str = "https://api.sunoapi.org/api/v1",
+        base_url: Optional[str] = None,
         poll_interval: float = 2.5,
         timeout_seconds: float = 600.0,
         verbose: bool = True,
     ) -> None:
         self.api_key = api_key
-        self.base_url = base_url.rstrip("/")
+        self.base_url = (base_url or os.getenv("SUNO_BASE_URL") or DEFAULT_SUNO_BASE_URL).rstrip("/")
         self.poll_interval = poll_interval
         self.timeout_seconds = timeout_seconds
         self.verbose = verbose
@@ -30,8 +114,6 @@ class SunoClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json",
-            "User-Agent": "melody-learning/1.0 (+requests)",
-            "Connection": "close",
         }
 
     def create_song(self, payload: Dict[str, Any]) -> str:
@@ -45,7 +127,7 @@ class SunoClient:
         if self.verbose:
             print(f"[Suno] POST {url_generate}")
 
-        r = requests.post(url_generate, headers=self._headers(), json=payload, timeout=(10, 45))
+        r = get_session().post(url_generate, headers=self._headers(), json=payload, timeout=(10, 45))
         try:
             r.raise_for_status()
         except Exception:
@@ -80,139 +162,104 @@ class SunoClient:
 
         return str(task_id)
 
+    def check_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        record-info를 한 번 조회해 현재 상태를 반환합니다.
+        GET을 먼저 시도하고, GET이 응답을 주지 못한 경우에만 POST로 폴백합니다.
+
+        반환값: {"task_id", "status", "tracks"} (tracks는 완료 전이면 None),
+                두 요청 모두 응답을 받지 못하면 None
+        실패 상태나 에러 코드를 받으면 RuntimeError를 발생시킵니다.
+        """
+        url_record = f"{self.base_url}/generate/record-info"
+        ids = self._record_ids(task_id)
+        session = get_session()
+
+        for method in ("GET", "POST"):
+            try:
+                if method == "GET":
+                    s = session.get(url_record, headers=self._headers(), params=ids, timeout=(10, 45))
+                else:
+                    s = session.post(url_record, headers=self._headers(), json=ids, timeout=(10, 45))
+            except requests.exceptions.RequestException:
+                continue
+            state = self._interpret_record_info(task_id, method, s.status_code, s)
+            if state is not None:
+                return state
+
+        return None
+
+    async def acheck_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """check_status의 비동기 버전 (서버 경로에서 공유 httpx 클라이언트 사용)"""
+        url_record = f"{self.base_url}/generate/record-info"
+        ids = self._record_ids(task_id)
+
+        for method in ("GET", "POST"):
+            try:
+                if method == "GET":
+                    s = await async_request("GET", url_record, headers=self._headers(), params=ids)
+                else:
+                    s = await async_request("POST", url_record, headers=self._headers(), json=ids)
+            except httpx.HTTPError:
+                continue
+            state = self._interpret_record_info(task_id, method, s.status_code, s)
+            if state is not None:
+                return state
+
+        return None
+
+    @staticmethod
+    def _record_ids(task_id: str) -> Dict[str, str]:
+        return {"taskId": task_id, "task_id": task_id, "workId": task_id}
+
+    def _interpret_record_info(
+        self, task_id: str, method: str, status_code: int, response: Any
+    ) -> Optional[Dict[str, Any]]:
+        """record-info 응답(requests/httpx 공통)을 상태 dict로 변환. 쓸 수 없는 응답이면 None."""
+        if status_code != 200:
+            return None
+        try:
+            st = response.json()
+        except ValueError:
+            st = None
+        if not st:
+            return None
+
+        if self.verbose:
+            print(f"[Suno][{method}] 응답:", str(st)[:800])
+        if st.get("code") and st["code"] != 200:
+            raise RuntimeError(
+                f"Suno record-info 에러 {method} code={st.get('code')}, "
+                f"msg={st.get('msg') or st.get('message') or st}"
+            )
+        status, items = parse_record_info(st)
+        if status in FAILED_STATUSES:
+            raise RuntimeError(f"Suno 생성 실패 상태 수신({method}): {st}")
+        return {"task_id": task_id, "status": status, "tracks": items}
+
     def poll_result(self, task_id: str) -> Dict[str, Any]:
         """
         작업이 완료될 때까지 폴링합니다.
         """
-        url_record = f"{self.base_url}/generate/record-info"
         start = time.time()
         attempt = 0
         last_status = None
 
-        def parse_items(st: dict) -> Tuple[Optional[str], Optional[List[dict]]]:
-            """
-            상태 문자열과 결과 아이템 리스트를 다양한 스키마에서 추출.
-            """
-            data_field = st.get("data") or {}
-
-            # 상태 문자열 후보
-            status = (
-                data_field.get("status")
-                or st.get("status")
-                or data_field.get("taskStatus")
-                or st.get("taskStatus")
-            )
-
-            # 결과 blob
-            resp = data_field.get("response")  # dict 또는 None
-            raw = None
-            if isinstance(resp, dict):
-                raw = resp.get("sunoData") or resp.get("data") or resp.get("songs")
-            if raw is None:
-                raw = data_field.get("sunoData") or data_field.get("data") or st.get("result")
-
-            # raw 정규화: list로
-            if isinstance(raw, dict):
-                raw = [raw]
-            if raw is not None and not isinstance(raw, list):
-                raw = None
-
-            # 아이템 정규화: 공통 키로 맞춤
-            items = None
-            if raw:
-                items = []
-                for it in raw:
-                    if not isinstance(it, dict):
-                        continue
-                    items.append({
-                        "id": it.get("id") or it.get("musicId") or it.get("songId"),
-                        "title": it.get("title") or data_field.get("title") or "Learning Song",
-                        "audioUrl": it.get("audioUrl") or it.get("sourceAudioUrl") or it.get("streamAudioUrl"),
-                        "imageUrl": it.get("imageUrl") or it.get("coverUrl"),
-                        "raw": it,
-                    })
-                if not items:
-                    items = None
-
-            return status, items
-
         while time.time() - start < self.timeout_seconds:
             attempt += 1
             if attempt > 1:
-                # 점진적 백오프(최대 8초)
-                time.sleep(min(self.poll_interval * (1 + attempt * 0.25), 8.0))
+                time.sleep(poll_delay(self.poll_interval, attempt))
 
-            # --- GET 시도 ---
-            try:
-                s = requests.get(
-                    url_record,
-                    headers=self._headers(),
-                    params={"taskId": task_id, "task_id": task_id, "workId": task_id},
-                    timeout=(10, 45),
-                )
-                if s.status_code == 200:
-                    try:
-                        st = s.json()
-                    except ValueError:
-                        st = None
-                    if st:
-                        if self.verbose and (attempt % 3 == 1):
-                            print("[Suno][GET] 응답:", str(st)[:800])
-                        if st.get("code") and st["code"] != 200:
-                            raise RuntimeError(
-                                f"Suno record-info 에러 GET code={st.get('code')}, "
-                                f"msg={st.get('msg') or st.get('message') or st}"
-                            )
-                        status, items = parse_items(st)
-                        if status and status != last_status:
-                            last_status = status
-                            if self.verbose:
-                                print(f"[Suno] status={status} (attempt {attempt})")
-                        if status in {"SUCCESS", "DONE", "COMPLETED"}:
-                            if items:
-                                return {"task_id": task_id, "tracks": items, "status": status}
-                            continue
-                        if status in {"FAILED", "ERROR"}:
-                            raise RuntimeError(f"Suno 생성 실패 상태 수신(GET): {st}")
-                        continue
-            except requests.exceptions.RequestException:
-                pass
-
-            # --- POST 폴백 ---
-            try:
-                s = requests.post(
-                    url_record,
-                    headers=self._headers(),
-                    json={"taskId": task_id, "task_id": task_id, "workId": task_id},
-                    timeout=(10, 45),
-                )
-                if s.status_code == 200:
-                    try:
-                        st = s.json()
-                    except ValueError:
-                        st = None
-                    if st:
-                        if self.verbose and (attempt % 3 == 1):
-                            print("[Suno][POST] 응답:", str(st)[:800])
-                        if st.get("code") and st["code"] != 200:
-                            raise RuntimeError(
-                                f"Suno record-info 에러 POST code={st.get('code')}, "
-                                f"msg={st.get('msg') or st.get('message') or st}"
-                            )
-                        status, items = parse_items(st)
-                        if status and status != last_status:
-                            last_status = status
-                            if self.verbose:
-                                print(f"[Suno] status={status} (attempt {attempt})")
-                        if status in {"SUCCESS", "DONE", "COMPLETED"}:
-                            if items:
-                                return {"task_id": task_id, "tracks": items, "status": status}
-                            continue
-                        if status in {"FAILED", "ERROR"}:
-                            raise RuntimeError(f"Suno 생성 실패 상태 수신(POST): {st}")
-                        continue
-            except requests.exceptions.RequestException:
+            state = self.check_status(task_id)
+            if state is None:
                 continue
+            status = state["status"]
+            if status and status != last_status:
+                last_status = status
+                if self.verbose:
+                    print(f"[Suno] status={status} (attempt {attempt})")
+            if status in SUCCESS_STATUSES and state["tracks"]:
+                return state
 
         # 타임아웃 시 마지막 상태라도 알리기
         raise TimeoutError(
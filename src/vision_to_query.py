@@ -2,6 +2,13 @@
 import base64
 from openai import OpenAI
 
+from src.core.openai_clients import get_openai_client
+from src.core.result_cache import cached_call, make_cache_key
+from src.image_preprocessor import prepare_image_for_vision
+
+# 프롬프트를 바꾸면 올려서 이전 캐시 결과를 무효화
+OCR_PROMPT_VERSION = "ocr-v1"
+
 
 def encode_image(path):
     with open(path, "rb") as f:
@@ -11,10 +18,11 @@ def encode_image(path):
 def image_bytes_to_study_text(image_bytes, api_key, model="gpt-4o-mini"):
     """
     OCR-like helper that extracts readable text from raw image bytes.
+    The image is downscaled/recompressed first and sent with its real MIME type.
     """
-    client = OpenAI(api_key=api_key)
-    b64 = base64.b64encode(image_bytes).decode("utf-8")
-    return _image_b64_to_study_text(b64, client, model=model)
+    client = get_openai_client(api_key)
+    prepared = prepare_image_for_vision(image_bytes)
+    return _image_data_to_study_text(prepared.data, client, model=model, mime_type=prepared.mime_type)
 
 
 def image_to_study_text(image_path, api_key, model="gpt-4o-mini"):
@@ -22,12 +30,22 @@ def image_to_study_text(image_path, api_key, model="gpt-4o-mini"):
     Convenience wrapper that loads the image from disk before delegating to the
     byte-processing helper.
     """
-    b64 = encode_image(image_path)
-    client = OpenAI(api_key=api_key)
-    return _image_b64_to_study_text(b64, client, model=model)
+    with open(image_path, "rb") as f:
+        return image_bytes_to_study_text(f.read(), api_key, model=model)
+
+
+def _image_data_to_study_text(image_data, client: OpenAI, model="gpt-4o-mini", mime_type="image/png"):
+    """
+    Cached OCR call: identical image bytes with the same model and prompt
+    version are answered from the result cache instead of the vision API.
+    """
+    key = make_cache_key(image_data, model, OCR_PROMPT_VERSION)
+    return cached_call("ocr", key, _request_study_text, image_data, client, model, mime_type)
 
 
-def _image_b64_to_study_text(image_b64, client: OpenAI, model="gpt-4o-mini"):
+def _request_study_text(image_data, client: OpenAI, model, mime_type):
+    # base64는 캐시에 없을 때 호출 직전에 한 번만 만듦
+    image_b64 = base64.b64encode(image_data).decode("utf-8")
     prompt = (
         "이미지 안에서 읽을 수 있는 문자만 정확히 추출해줘. "
         "가능하면 줄바꿈을 유지하고, 장식 표현은 빼고 글자 그대로 돌려줘. "
@@ -41,7 +59,7 @@ def _image_b64_to_study_text(image_b64, client: OpenAI, model="gpt-4o-mini"):
                 "role": "user",
                 "content": [
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64}"}},
+                    {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_b64}"}},
                 ],
             },
         ],
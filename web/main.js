@@ -62,6 +62,8 @@ function renderAudio(urls) {
     
     const audio = document.createElement("audio");
     audio.controls = true;
+    // 보관된 오디오(/audio/...)는 Range 요청을 지원하므로 길이 정보만 먼저 받고 탐색 시 필요한 부분만 받음
+    audio.preload = "metadata";
     audio.src = url;
     audio.style.width = "100%";
     audio.style.marginBottom = "8px";
@@ -194,15 +196,6 @@ function enableControls() {
   textInput.disabled = false;
 }
 
-function fileToDataURL(file) {
-  return new Promise((resolve, reject) => {
-    const reader = new FileReader();
-    reader.onload = () => resolve(reader.result);
-    reader.onerror = () => reject(new Error("파일을 읽을 수 없습니다."));
-    reader.readAsDataURL(file);
-  });
-}
-
 async function postJSON(path, payload) {
   const resp = await fetch(`${backendBase}${path}`, {
     method: "POST",
@@ -232,6 +225,55 @@ async function postFormData(path, formData) {
   return resp.json();
 }
 
+// /mnemonic-plan/stream(SSE)을 읽으며 완성된 항목부터 onSection으로 전달하고, 완료(done) 데이터를 반환
+// 서버가 두 번 호출로 대체하면 reset이 오므로 onReset에서 지금까지 받은 항목을 버림
+async function streamPlan(studyText, onSection, onReset) {
+  const resp = await fetch(`${backendBase}/mnemonic-plan/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ study_text: studyText }),
+  });
+
+  if (!resp.ok || !resp.body) {
+    const text = await resp.text();
+    throw new Error(`/mnemonic-plan/stream 요청 실패 (${resp.status}): ${text}`);
+  }
+
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // 이벤트는 빈 줄로 구분됨
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      block.split("\n").forEach((line) => {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      });
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === "section") {
+        onSection(payload);
+      } else if (event === "reset") {
+        onReset();
+      } else if (event === "done") {
+        return payload;
+      } else if (event === "error") {
+        throw new Error(payload.detail || "멜로디 가이드 생성 실패");
+      }
+    }
+  }
+  throw new Error("멜로디 가이드 스트림이 완료 전에 끊겼습니다.");
+}
+
 async function handleGenerate() {
   try {
     disableControls();
@@ -283,7 +325,25 @@ async function handleGenerate() {
     }
 
     setStatus("가사 및 멜로디 가이드 생성 중...");
-    const planResp = await postJSON("/mnemonic-plan", { study_text: studyText });
+    // 완성된 항목부터 바로 표시 (스트리밍이 안 되면 일반 요청으로 대체)
+    let sections = [];
+    let planResp;
+    try {
+      planResp = await streamPlan(
+        studyText,
+        (section) => {
+          sections.push(section.text);
+          setPre(planTextEl, sections.join("\n\n"));
+        },
+        () => {
+          sections = [];
+          setPre(planTextEl, "-");
+        }
+      );
+    } catch (streamError) {
+      console.warn(streamError);
+      planResp = await postJSON("/mnemonic-plan", { study_text: studyText });
+    }
     const mnemonicPlan = planResp.mnemonic_plan || "";
     setPre(planTextEl, mnemonicPlan);
 
@@ -291,6 +351,7 @@ async function handleGenerate() {
     const songResp = await postJSON("/generate-song", {
       study_text: studyText,
       mnemonic_plan: mnemonicPlan,
+      final_lyrics: planResp.final_lyrics || null,
       wait_for_audio: Boolean(waitCheckbox.checked),
     });
     renderAudio(songResp.audio_urls || []);